@@ -0,0 +1,59 @@
+"""Micro-benchmarks of `Arguments`: access latency against its frozen snapshot, and pickling.
+
+Run it from the root of the repository with `python -m benchmarks.bench_arguments`.
+"""
+import pickle
+import timeit
+
+from mlsuite.experiments.arguments import ArgumentsHeader
+
+
+def access(number=200000):
+    args = ArgumentsHeader({
+        'variable': 4,
+        'model': {'num clusters': '${variable}', 'optimizer': {'lr': 1e-3}},
+    })
+    frozen = args.freeze()
+
+    class Plain:
+        pass
+
+    plain = Plain()
+    plain.model = Plain()
+    plain.model.optimizer = Plain()
+    plain.model.optimizer.lr = 1e-3
+
+    cases = {
+        'plain object   model.optimizer.lr': lambda: plain.model.optimizer.lr,
+        'Arguments      model.optimizer.lr': lambda: args.model.optimizer.lr,
+        'frozen         model.optimizer.lr': lambda: frozen.model.optimizer.lr,
+        'Arguments      str(model.num_clusters)': lambda: str(args.model.num_clusters),
+        'frozen         model.num_clusters': lambda: frozen.model.num_clusters,
+    }
+
+    for name, stmt in cases.items():
+        elapsed = min(timeit.repeat(stmt, number=number, repeat=5))
+        print(f'{name:<45} {elapsed / number * 1e9:8.1f} ns/access')
+
+
+def pickling(number=20):
+    args = ArgumentsHeader({
+        f'section{i}': {f'key{j}': f'value ${{section0.key{j}}}' if i > 0 else j for j in range(20)} for i in range(50)
+    })
+    data = pickle.dumps(args)
+
+    cases = {
+        'dumps': lambda: pickle.dumps(args),
+        'loads': lambda: pickle.loads(data),
+        'loads + first access': lambda: pickle.loads(data).section3.key4,
+    }
+
+    print(f'{"pickled size":<45} {len(data):8d} bytes')
+    for name, stmt in cases.items():
+        elapsed = min(timeit.repeat(stmt, number=number, repeat=5))
+        print(f'{name:<45} {elapsed / number * 1e3:8.3f} ms')
+
+
+if __name__ == '__main__':
+    access()
+    pickling()
@@ -0,0 +1,76 @@
+""" Cost of saving a large object again after a small change, rewriting it whole against chunked checkpoints, and time
+to restore it (until its small attributes can be used) loading it eagerly against lazily.
+
+Run it from the root of the repository with `python -m benchmarks.bench_checkpoints`.
+"""
+import os
+import time
+import tempfile
+
+import numpy as np
+
+from mlsuite.failsafe.serializers import dump, load
+
+
+class State:
+    def __init__(self, size):
+        self.step = 0
+        self.cache = np.random.rand(size // 8)
+        self.history = list(range(1000))
+
+
+def _files(folder: str) -> dict:
+    return {entry.path: (entry.stat().st_mtime_ns, entry.stat().st_size)
+            for root, _, files in os.walk(folder) for entry in os.scandir(root) if entry.is_file()}
+
+
+def resave(size=512 << 20, repeat=5):
+    state = State(size)
+
+    with tempfile.TemporaryDirectory() as folder:
+        for serializer in ['dill', 'pickle5', 'chunked']:
+            path = os.path.join(folder, serializer, 'state.pickle')
+            os.makedirs(os.path.dirname(path))
+            dump(state, path, serializer=serializer)
+
+            elapsed, written = [], []
+            for _ in range(repeat):
+                state.step += 1
+                state.cache[state.step] = 0  # only one chunk changes
+
+                before = _files(os.path.dirname(path))
+                start = time.perf_counter()
+                dump(state, path, serializer=serializer)
+                elapsed.append(time.perf_counter() - start)
+                written.append(sum(size for name, (mtime, size) in _files(os.path.dirname(path)).items()
+                                   if before.get(name) != (mtime, size)))
+
+            print(f'{serializer:<10} save after a change {min(elapsed) * 1e3:8.1f} ms {max(written) / 2 ** 20:8.1f} MiB '
+                  f'written')
+
+
+def restore(sizes=(64 << 20, 256 << 20, 1 << 30), repeat=5):
+    with tempfile.TemporaryDirectory() as folder:
+        for size in sizes:
+            state = State(size)
+            for serializer in ['pickle5', 'chunked']:
+                path = os.path.join(folder, f'{serializer}_{size}.pickle')
+                dump(state, path, serializer=serializer)
+
+                for lazy in [False, True]:
+                    elapsed = []
+                    for _ in range(repeat):
+                        start = time.perf_counter()
+                        loaded = load(path, mmap_mode=lazy, lazy=lazy)
+                        loaded.step += 1
+                        elapsed.append(time.perf_counter() - start)
+                        del loaded
+
+                    print(f'{serializer:<10} {size / 2 ** 20:6.0f} MiB {"lazy" if lazy else "eager":<6} restore '
+                          f'{min(elapsed) * 1e3:8.2f} ms')
+            del state
+
+
+if __name__ == '__main__':
+    resave()
+    restore()
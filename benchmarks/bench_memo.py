@@ -0,0 +1,41 @@
+"""Cost of a memoized dataset preprocessing: computing it against reusing it from disk (another run) or from memory.
+
+Run it from the root of the repository with `python -m benchmarks.bench_memo`.
+"""
+import time
+import tempfile
+
+import numpy as np
+
+from mlsuite.failsafe.memo import Memo, key
+
+
+def preprocess(data, mean=0., std=1.):
+    return {'features': np.sort((data - mean) / std, axis=0), 'labels': np.argsort(data[:, 0])}
+
+
+def _time(func, repeat=5) -> float:
+    elapsed = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed.append(time.perf_counter() - start)
+    return min(elapsed)
+
+
+def main(size=256 << 20):
+    data = np.random.rand(size // 8 // 64, 64)
+
+    with tempfile.TemporaryDirectory() as folder:
+        Memo(folder).call(preprocess, (data,), {'std': 2.})
+
+        print(f'{"compute":<12} {_time(lambda: preprocess(data, std=2.)) * 1e3:8.1f} ms')
+        print(f'{"key":<12} {_time(lambda: key(preprocess, (data,), {"std": 2.})) * 1e3:8.1f} ms')
+        print(f'{"disk hit":<12} {_time(lambda: Memo(folder).call(preprocess, (data,), {"std": 2.})) * 1e3:8.1f} ms')
+        memo = Memo(folder)
+        memo.call(preprocess, (data,), {'std': 2.})
+        print(f'{"memory hit":<12} {_time(lambda: memo.call(preprocess, (data,), {"std": 2.})) * 1e3:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
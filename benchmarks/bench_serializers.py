@@ -0,0 +1,38 @@
+"""Throughput of the FailSafe serializers saving and loading a state dominated by NumPy arrays.
+
+Run it from the root of the repository with `python -m benchmarks.bench_serializers`.
+"""
+import os
+import time
+import tempfile
+
+import numpy as np
+
+from mlsuite.failsafe.serializers import dump, load
+
+
+def throughput(size=256 << 20, arrays=4, repeat=3):
+    state = {'step': 1000, 'arrays': [np.random.rand(size // arrays // 8) for _ in range(arrays)]}
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'state.pickle')
+        cases = {
+            'dill          save': lambda: dump(state, path, serializer='dill'),
+            'dill          load': lambda: load(path, serializer='dill'),
+            'pickle5       save': lambda: dump(state, path),
+            'pickle5       load': lambda: load(path),
+            'pickle5 mmap  load': lambda: load(path, mmap_mode=True),
+            'pickle5 mmap  load + sum': lambda: sum(a.sum() for a in load(path, mmap_mode=True)['arrays']),
+        }
+
+        for name, stmt in cases.items():
+            elapsed = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                stmt()
+                elapsed.append(time.perf_counter() - start)
+            print(f'{name:<30} {min(elapsed) * 1e3:8.1f} ms {size / min(elapsed) / 2 ** 20:8.0f} MiB/s')
+
+
+if __name__ == '__main__':
+    throughput()
@@ -0,0 +1,51 @@
+"""Time the program is paused to save a large object, synchronously against the snapshots of both modes.
+
+Run it from the root of the repository with `python -m benchmarks.bench_snapshots`.
+"""
+import os
+import time
+import tempfile
+
+import numpy as np
+
+from mlsuite.failsafe import serializers
+from mlsuite.failsafe.snapshots import snapshot
+
+
+class State:
+    def __init__(self, path, size):
+        self.path = path
+        self.step = 0
+        self.cache = np.random.rand(size // 8)
+
+    @property
+    def __path__(self):
+        return self.path
+
+    def save(self, path):
+        serializers.dump(self, path)
+
+
+def pause(size=512 << 20, repeat=3):
+    with tempfile.TemporaryDirectory() as folder:
+        state = State(os.path.join(folder, 'state.pickle'), size)
+        cases = {
+            'synchronous save': lambda: state.save(state.path),
+            'snapshot (thread)': lambda: snapshot([state], mode='thread'),
+            'snapshot (fork)': lambda: snapshot([state], mode='fork'),
+        }
+
+        for name, stmt in cases.items():
+            paused, total = [], []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                future = stmt()
+                paused.append(time.perf_counter() - start)
+                if future is not None:
+                    future.result()
+                total.append(time.perf_counter() - start)
+            print(f'{name:<20} paused {min(paused) * 1e3:8.1f} ms, saved after {min(total) * 1e3:8.1f} ms')
+
+
+if __name__ == '__main__':
+    pause()
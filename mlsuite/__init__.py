@@ -1,6 +1,15 @@
-from .experiments import Arguments, YAMLConfig, experiment, experiment_wrapper, CLIConfig, command
-from .options import GlobalOptions
+from ._lazy import lazy_exports
 
+# everything is imported on first use, so that `import mlsuite` does not pull in the whole experiments stack
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'Arguments': '.experiments',
+    'YAMLConfig': '.experiments',
+    'experiment': '.experiments',
+    'experiment_wrapper': '.experiments',
+    'CLIConfig': '.experiments',
+    'command': '.experiments',
+    'GlobalOptions': '.options',
+}, submodules=['experiments', 'failsafe', 'pytorch', 'utils', 'options'])
 
-__all__ = ['Arguments', 'YAMLConfig', 'experiment', 'experiment_wrapper', 'CLIConfig', 'command', 'GlobalOptions']
 
+__all__ = ['Arguments', 'YAMLConfig', 'experiment', 'experiment_wrapper', 'CLIConfig', 'command', 'GlobalOptions']
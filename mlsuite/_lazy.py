@@ -0,0 +1,40 @@
+import sys
+import types
+import importlib
+
+
+class _LazyPackage(types.ModuleType):
+    def __setattr__(self, name, value):
+        # importing a submodule sets it as an attribute of the package, which must not hide the export with its name
+        # (e.g. the function `experiment` of the module `mlsuite.experiments.experiment`)
+        if isinstance(value, types.ModuleType) and value.__name__ == f'{self.__name__}.{name}' and \
+                name in vars(self).get('_exports', {}):
+            return
+        super().__setattr__(name, value)
+
+
+def lazy_exports(package: str, exports: dict, submodules=()):
+    """ Returns the `__getattr__` and `__dir__` functions of a package whose `exports` (name -> relative module, or
+    `module:attribute` if it has another name there) and `submodules` are only imported the first time they are
+    accessed, so that importing the package is almost free.
+    """
+    module = sys.modules[package]
+    module.__class__ = _LazyPackage
+    module._exports = exports
+
+    def __getattr__(name):
+        if name in exports:
+            source, _, attribute = exports[name].partition(':')
+            value = getattr(importlib.import_module(source, package), attribute or name)
+        elif name in submodules:
+            value = importlib.import_module(f'.{name}', package)
+        else:
+            raise AttributeError(f'module {package!r} has no attribute {name!r}')
+
+        vars(module)[name] = value  # next accesses do not go through __getattr__
+        return value
+
+    def __dir__():
+        return sorted(set(vars(module)) | set(exports) | set(submodules))
+
+    return __getattr__, __dir__
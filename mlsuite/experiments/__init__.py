@@ -1,5 +1,13 @@
-from .arguments import ArgumentsHeader as Arguments
-from .experiment import experiment, experiment_wrapper, CLIConfig, command
-from .yaml_handlers import YAMLConfig, read_yaml_click
+from mlsuite._lazy import lazy_exports
 
-__all__ = ['Arguments', 'experiment', 'experiment_wrapper', 'YAMLConfig', 'CLIConfig', 'read_yaml_click', 'command']
\ No newline at end of file
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'Arguments': '.arguments:ArgumentsHeader',
+    'experiment': '.experiment',
+    'experiment_wrapper': '.experiment',
+    'CLIConfig': '.experiment',
+    'command': '.experiment',
+    'YAMLConfig': '.yaml_handlers',
+    'read_yaml_click': '.yaml_handlers',
+})
+
+__all__ = ['Arguments', 'experiment', 'experiment_wrapper', 'YAMLConfig', 'CLIConfig', 'read_yaml_click', 'command']
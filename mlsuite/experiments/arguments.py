@@ -1,21 +1,53 @@
 import re
+import sys
+import pickle
+import keyword
+import hashlib
+from functools import lru_cache
+from contextlib import contextmanager
+from contextvars import ContextVar
+from collections import OrderedDict
 
 from dotmap import DotMap
 
 from mlsuite.options import GlobalOptions
 
 
+_PLACEHOLDER = re.compile(r'\$\{.*?\}')
+
+# Root of the arguments for the current context (thread or asyncio task), see `LazyString.root`
+_context_root = ContextVar('root')
+
+# Attributes that DotMap stores on the instance itself instead of in the map
+_INTERNALS = {'_map', '_dynamic', '_prevent_method_masking', '_ipython_canary_method_should_not_exist_'}
+
+
 def _parse(x):
     return x.replace(' ', '_')
 
 
 class LazyString(str):
     """Wrapper class to replace placeholders in the argument's strings"""
-    _root = None
+    _root = None  # last root created in any context, used by contexts that have not created their own
+
+    @classmethod
+    def root(cls) -> 'ArgumentsHeader':
+        """Returns the arguments used to replace the placeholders in the current context."""
+        return _context_root.get(cls._root)
+
+    @classmethod
+    def set_root(cls, root: 'ArgumentsHeader'):
+        cls._root = root
+        return _context_root.set(root)
 
     def __str__(self):
         if GlobalOptions.replace_placeholders.value():
-            return type(self)._root.replace_placeholders(self, recurse=True)
+            root = _context_root.get(LazyString._root)
+            if root is None:
+                return str.__str__(self)
+
+            resolved = root._resolved.get(self)
+            return resolved if resolved is not None else root.replace_placeholders(self, recurse=True)
 
         return self
 
@@ -24,26 +56,103 @@ class LazyString(str):
         return str(self)
 
 
+class Deferred(object):
+    """Base class for values that are only loaded the first time they are accessed (e.g. YAML's `!include`)."""
+    def load(self) -> object:
+        raise NotImplementedError
+
+
 class Arguments(DotMap):
-    """ Class to handle arguments with dot notation."""
+    """ Class to handle arguments with dot notation.
+
+    The root of the tree keeps a cache of resolved placeholders together with the (transitive) keys each of them
+    depends on, so that modifying a key only invalidates the strings that actually use it.
+    """
+    _parent = None
+    _key = None
+    _index = None  # dotted path -> (node, key), only maintained by the root of the arguments (see ArgumentsHeader)
+    _holders = None  # pattern -> dotted paths holding it, only maintained by the root of the arguments
+    _digest = None  # cached content hash of this section, see `content_hash`
+
     def __init__(self, *args, **kwargs):
+        object.__setattr__(self, '_resolved', {})  # pattern -> resolved string
+        object.__setattr__(self, '_dependencies', {})  # pattern -> set of dotted keys it depends on
+        object.__setattr__(self, '_dependents', {})  # dotted key (and its prefixes) -> set of patterns
         super(Arguments, self).__init__(_dynamic=False)
         self.update(*args, **kwargs)
 
     def __setattr__(self, key, value):
+        if key in _INTERNALS:
+            return super(Arguments, self).__setattr__(key, value)
+
         super(Arguments, self).__setattr__(_parse(key), value if not isinstance(value, str) else LazyString(value))
 
     def __getattr__(self, item: str) -> object:
+        if item == '_map' and '_wire' in self.__dict__:
+            self._materialize()
+            return self._map
+
         item = _parse(item)
         try:
             return super(Arguments, self).__getattr__(item)
         except KeyError as exc:
             raise AttributeError(*exc.args) from exc
 
+    def __getitem__(self, key):
+        value = super(Arguments, self).__getitem__(key)
+        if isinstance(value, Deferred):
+            value = _wrap(value.load())
+            self[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        old = self._map.get(key)
+        value = self._adopt(key, value)
+        super(Arguments, self).__setitem__(key, value)
+        self._changed(key, old)
+
+    def __delitem__(self, key):
+        old = self._map.get(key)
+        super(Arguments, self).__delitem__(key)
+        self._changed(key, old)
+
+    def __delattr__(self, key):
+        self.__delitem__(_parse(key))
+
+    def pop(self, key, default=None):
+        result = super(Arguments, self).pop(key, default)
+        self._changed(key, result)
+        return result
+
+    def popitem(self):
+        key, value = self._map.popitem()
+        self._changed(key, value)
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if key not in self._map:
+            self[key] = default
+        return self[key]
+
+    def clear(self):
+        for key in list(self._map):
+            del self[key]
+
+    def get(self, key, default=None):
+        return self[key] if key in self._map else default
+
+    def items(self):
+        self._load_deferred()
+        return super(Arguments, self).items()
+
+    def values(self):
+        self._load_deferred()
+        return super(Arguments, self).values()
+
     @GlobalOptions.replace_placeholders(False)
     def update(self, *args, **kwargs):
         for item in args:
-            self.update(**item)
+            self.update(**(item._map if isinstance(item, Arguments) else item))  # without loading deferred values
 
         new_kwargs = {}
         for k, v in kwargs.items():
@@ -52,46 +161,470 @@ class Arguments(DotMap):
             if isinstance(v, (Arguments, dict)) and isinstance(getattr(self, parsed_k, None), Arguments):
                 getattr(self, parsed_k).update(v)
             else:
-                if isinstance(v, dict):
-                    v = Arguments(v)
-                elif isinstance(v, str):
-                    v = LazyString(v)
-
+                v = self._adopt(parsed_k, _wrap(v))
                 new_kwargs[parsed_k] = v
 
+        old = {k: self._map.get(k) for k in new_kwargs}
         super(Arguments, self).update(**new_kwargs)
+        for k in new_kwargs:
+            self._changed(k, old[k])
 
     def to_dict(self) -> dict:
         return self.toDict()
 
+    def __reduce__(self):
+        return _from_wire, (type(self),) + self._to_wire()
+
+    @GlobalOptions.replace_placeholders(True)
+    def _to_wire(self) -> tuple:
+        """ Returns the compact form used to pickle the arguments: a flat table with the path of every key, the positions
+        in it of the sections, and a single pickled buffer with the (resolved) values of the leaves.
+        """
+        if '_wire' in self.__dict__:  # not even unpacked since it was received
+            return self.__dict__['_wire']
+
+        paths, sections, values = [], [], []
+
+        def visit(node, prefix):
+            for key, value in node._map.items():
+                path = prefix + (key,)
+                if isinstance(value, Arguments):
+                    sections.append(len(paths))
+                    paths.append(path)
+                    visit(value, path)
+                else:
+                    paths.append(path)
+                    values.append(_resolve(value) if isinstance(value, LazyString) else value)
+
+        with self._own_root():
+            visit(self, ())
+        return tuple(paths), tuple(sections), pickle.dumps(values, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _materialize(self) -> None:
+        """Builds the content of arguments received in their compact form (see `_to_wire`)."""
+        paths, sections, buffer = self.__dict__.pop('_wire')
+        object.__setattr__(self, '_map', OrderedDict())
+
+        values, sections = iter(pickle.loads(buffer)), set(sections)
+        nodes = {(): self}
+        for i, path in enumerate(paths):
+            parent, key = nodes[path[:-1]], path[-1]
+            if i in sections:
+                value = nodes[path] = _empty(Arguments)
+                object.__setattr__(value, '_map', OrderedDict())
+                parent._adopt(key, value)
+            else:
+                value = next(values)
+                if isinstance(value, str):
+                    value = LazyString(value)
+            parent._map[key] = value
+
+        if isinstance(self, ArgumentsHeader):
+            object.__setattr__(self, '_index', {path: (node, key) for path, node, key, _ in self._walk()})
+            object.__setattr__(self, '_holders', {})
+
+    @GlobalOptions.replace_placeholders(True)
+    def content_hash(self, exclude=()) -> str:
+        """ Returns a hash of the resolved arguments, stable across processes and independent of the order of the keys.
+        The keys in `exclude` (e.g. `options`) are left out.
+
+        The hash of every section is cached, so that after modifying a value only the sections containing it (and the
+        ones holding placeholders that depend on it) are rehashed. Lists are hashed as a whole and in-place
+        modifications of them are not tracked, assign a new list instead.
+        """
+        with self._own_root():
+            return self._content_digest(exclude).hex()
+
+    @contextmanager
+    def _own_root(self):
+        """Replaces the placeholders in the with statement with the root of this tree, whatever the current one is."""
+        node = self
+        while node._parent is not None:
+            node = node._parent
+
+        if isinstance(node, ArgumentsHeader):
+            with node.as_root():
+                yield
+        else:
+            yield
+
+    def _content_digest(self, exclude=()) -> bytes:
+        if self._digest is None or exclude:
+            digest = hashlib.blake2b(b'd', digest_size=16)
+            for key in sorted(self._map):
+                if key not in exclude:
+                    digest.update(_digest(key))
+                    digest.update(_digest(self[key]))
+            if exclude:
+                return digest.digest()
+            object.__setattr__(self, '_digest', digest.digest())
+        return self._digest
+
+    def freeze(self) -> 'FrozenArguments':
+        """Returns an immutable snapshot of the arguments with all the placeholders already replaced."""
+        with self._own_root():
+            return _freeze(self)
+
+    def get_path(self, path: str) -> object:
+        """Returns the value stored at a dotted path, e.g., `args.get_path('model.optimizer.lr')`."""
+        path = _parse(path)
+        if self._index is not None:
+            try:
+                node, key = self._index[path]
+            except KeyError:
+                return self._get_path_deferred(path)
+            return node[key]
+
+        return self._get_path_deferred(path)
+
+    def _get_path_deferred(self, path: str) -> object:
+        value = self
+        for item in path.split('.'):
+            value = getattr(value, item)  # loads deferred values on the way
+        return value
+
+    def set_paths(self, values: dict) -> None:
+        """Sets the values of several dotted paths at once, creating the intermediate levels if needed."""
+        for path, value in values.items():
+            *parents, key = _parse(path).split('.')
+
+            node = self
+            if len(parents) > 0:
+                try:
+                    node = self.get_path('.'.join(parents))
+                except AttributeError:
+                    for item in parents:
+                        if item not in node._map:
+                            node[item] = Arguments()
+                        node = node[item]
+                        assert isinstance(node, Arguments), f'{path} cannot be set, {item} is not a section.'
+
+            assert isinstance(node, Arguments), f'{path} cannot be set, {".".join(parents)} is not a section.'
+            node.update({key: value})
+
+    def flat_items(self) -> list:
+        """Returns the (dotted path, value) pairs of all the leaves of the arguments."""
+        self._load_deferred(recursive=True)
+        if self._index is not None:
+            items = ((path, node._map[key]) for path, (node, key) in self._index.items())
+        else:
+            items = ((path, value) for path, _, _, value in self._walk())
+        return [(path, value) for path, value in items if not isinstance(value, Arguments)]
+
+    def _walk(self, prefix=''):
+        for key, value in self._map.items():
+            path = f'{prefix}.{key}' if prefix else key
+            yield path, self, key, value
+            if isinstance(value, Arguments):
+                yield from value._walk(path)
+
+    def _load_deferred(self, recursive=False) -> None:
+        for key in [k for k, v in self._map.items() if isinstance(v, Deferred)]:
+            self[key]
+
+        if recursive:
+            for value in self._map.values():
+                if isinstance(value, Arguments):
+                    value._load_deferred(recursive=True)
+
+    def _adopt(self, key, value):
+        """ Returns `value` as the section `key` of this node. A section can only be in one place, so it is copied if it
+        is still in another one.
+        """
+        if isinstance(value, Arguments):
+            if value._parent is not None and (value._parent is not self or value._key != key):
+                value = Arguments(value._map)  # without loading its deferred values
+            object.__setattr__(value, '_parent', self)
+            object.__setattr__(value, '_key', key)
+        return value
+
+    def _changed(self, key, old=None) -> None:
+        """Notifies the root of the tree that `key` (relative to this node) has been modified, `old` was its value."""
+        # deleted or replaced, it is not part of this tree anymore
+        if isinstance(old, Arguments) and old._parent is self and old._key == key and self._map.get(key) is not old:
+            object.__setattr__(old, '_parent', None)
+            object.__setattr__(old, '_key', None)
+
+        self._dirty()
+        node, path = self, [key]
+        while node._parent is not None:
+            path.append(node._key)
+            node = node._parent
+
+        path = '.'.join(reversed(path))
+        node._invalidate(path)
+        if node._index is not None:
+            node._reindex(path, self, key, old)
+
+    def _dirty(self) -> None:
+        """Discards the cached content hash of this section and all its ancestors."""
+        node = self
+        while node is not None and node._digest is not None:
+            object.__setattr__(node, '_digest', None)
+            node = node._parent
+
+    def _reindex(self, path: str, parent: 'Arguments', key: str, old) -> None:
+        self._unhold(path, old)
+        if isinstance(old, Arguments):
+            for sub_path, _, _, value in old._walk(path):
+                self._index.pop(sub_path, None)
+                self._unhold(sub_path, value)
+
+        if key not in parent._map:
+            self._index.pop(path, None)
+            return
+
+        self._index[path] = (parent, key)
+        value = parent._map[key]
+        self._hold(path, value)
+        if isinstance(value, Arguments):
+            for sub_path, node, sub_key, sub_value in value._walk(path):
+                self._index[sub_path] = (node, sub_key)
+                self._hold(sub_path, sub_value)
+
+    def _hold(self, path: str, value) -> None:
+        if isinstance(value, LazyString) and '${' in value:
+            self._holders.setdefault(value, set()).add(path)
+
+    def _unhold(self, path: str, value) -> None:
+        if isinstance(value, LazyString) and value in self._holders:
+            self._holders[value].discard(path)
+
+    def _invalidate(self, path: str) -> None:
+        for pattern in self._dependents.pop(path, ()):
+            self._resolved.pop(pattern, None)
+            self._dependencies.pop(pattern, None)
+
+            # the sections holding the pattern have to be rehashed as well
+            for holder in self._holders.get(pattern, ()) if self._holders is not None else ():
+                self._index[holder][0]._dirty()
+
+    def _cache(self, pattern: str, result: str, dependencies: set) -> None:
+        self._resolved[pattern] = result
+        self._dependencies[pattern] = dependencies
+        for path in dependencies:
+            parts = path.split('.')
+            for i in range(1, len(parts) + 1):
+                self._dependents.setdefault('.'.join(parts[:i]), set()).add(pattern)
+
     def replace_placeholders(self, pattern: str, recurse=True) -> str:
         """ Returns project string where placeholders of the form `${nested.key}` replaced by their value.
 
+        Recursive replacements done from the root of the arguments are cached until one of the keys they depend on
+        changes.
+
         :param pattern: string with the placeholders
         :param recurse: whether or not to keep replacing the string until exhausted
         :return: project string like pattern with the proper value of the placeholders.
         """
+        return self._replace_placeholders(pattern, recurse, [])[0]
 
-        result, pos = '', 0
-        for match in re.finditer(r'\$\{.*?\}', pattern):
-            request = match.group()[2:-1].split(sep='.')
-            value = self
-            for item in request:
-                value = getattr(value, item)
+    def _replace_placeholders(self, pattern: str, recurse: bool, stack: list):
+        cacheable = recurse and self._parent is None
+        if cacheable and pattern in self._resolved:
+            return self._resolved[pattern], self._dependencies[pattern]
+
+        result, pos, dependencies = '', 0, set()
+        for match in _PLACEHOLDER.finditer(pattern):
+            request = [_parse(item) for item in match.group()[2:-1].split(sep='.')]
+            path = '.'.join(request)
+
+            value = self.get_path(path)
             assert not isinstance(value, Arguments), f'pattern {match.group()} failed.'
 
-            result += pattern[pos:match.start()] + (self.replace_placeholders(value) if recurse and isinstance(value, str) else str(value))
+            dependencies.add(path)
+            if recurse and isinstance(value, str):
+                if path in stack:
+                    raise ValueError(f'Circular placeholder: {" -> ".join(stack + [path])}.')
+                value, value_dependencies = self._replace_placeholders(value, recurse, stack + [path])
+                dependencies.update(value_dependencies)
+
+            result += pattern[pos:match.start()] + str(value)
             pos = match.end()
 
         result += pattern[pos:]
-        return result
+
+        if cacheable:
+            self._cache(pattern, result, dependencies)
+        return result, dependencies
+
+
+class FrozenArguments(object):
+    """ Immutable and fully resolved snapshot of some arguments (see `Arguments.freeze`).
+
+    Each node is an instance of a class with one slot per key, so reading `frozen.x.y` costs the same as reading the
+    attributes of a plain object. Lists are stored as tuples.
+    """
+    __slots__ = ('_items',)
+    _fields = ()
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f'{type(self).__name__} is frozen, cannot set "{key}".')
+
+    def __delattr__(self, key):
+        raise AttributeError(f'{type(self).__name__} is frozen, cannot delete "{key}".')
+
+    def __getitem__(self, item):
+        return self._items[_parse(item)]
+
+    def __contains__(self, item):
+        return _parse(item) in self._items
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __eq__(self, other):
+        if isinstance(other, FrozenArguments):
+            return self._items == other._items
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(tuple(self._items.items()))
+
+    def __repr__(self):
+        return f'{type(self).__name__}({", ".join(f"{k}={v!r}" for k, v in self._items.items())})'
+
+    def __reduce__(self):
+        return _frozen_node, (tuple(self._items.items()),)
+
+    def keys(self):
+        return self._items.keys()
+
+    def values(self):
+        return self._items.values()
+
+    def items(self):
+        return self._items.items()
+
+    def get(self, key, default=None):
+        return self._items.get(_parse(key), default)
+
+    def to_dict(self) -> dict:
+        return {k: _thaw(v) for k, v in self._items.items()}
+
+
+@lru_cache(maxsize=None)
+def _frozen_type(fields: tuple) -> type:
+    slots = tuple(k for k in fields if k.isidentifier() and not keyword.iskeyword(k) and not hasattr(FrozenArguments, k))
+    namespace = {'__slots__': slots, '_fields': fields}
+
+    # Keys that are not valid identifiers or that clash with a method are reached through `__getattr__`, which is only
+    # defined when needed since its mere presence slows down every attribute access
+    if len(slots) != len(fields):
+        namespace['__getattr__'] = _frozen_getattr
+
+    return type(FrozenArguments.__name__, (FrozenArguments,), namespace)
+
+
+def _frozen_getattr(self, item):
+    if item == '_items':
+        raise AttributeError(item)
+    try:
+        return self._items[_parse(item)]
+    except KeyError:
+        raise AttributeError(f'{type(self).__name__} has no attribute "{item}".') from None
+
+
+def _frozen_node(items: tuple) -> FrozenArguments:
+    node = object.__new__(_frozen_type(tuple(k for k, _ in items)))
+    object.__setattr__(node, '_items', dict(items))
+    for k, v in items:
+        if k in node.__slots__:
+            object.__setattr__(node, k, v)
+    return node
+
+
+def _freeze(value):
+    if isinstance(value, (Arguments, dict, FrozenArguments)):
+        return _frozen_node(tuple((_parse(k), _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, LazyString):
+        return str.__str__(str(value))
+    return value
+
+
+def _wrap(value):
+    """Converts the values as they are stored in the arguments."""
+    if isinstance(value, dict):
+        return Arguments(value)
+    elif isinstance(value, str):
+        return LazyString(value)
+    return value
+
+
+def _empty(cls) -> Arguments:
+    """Creates arguments bypassing `__init__`, the caller is in charge of setting `_map`."""
+    self = cls.__new__(cls)
+    for name in ('_resolved', '_dependencies', '_dependents'):
+        object.__setattr__(self, name, {})
+    object.__setattr__(self, '_dynamic', False)
+    object.__setattr__(self, '_prevent_method_masking', False)
+    return self
+
+
+def _resolve(value: LazyString) -> str:
+    try:
+        return str.__str__(str(value))
+    except AttributeError:  # it cannot be resolved yet (e.g., `${pwd}` before running), sent as it is
+        return str.__str__(value)
+
+
+def _from_wire(cls, paths: tuple, sections: tuple, buffer: bytes) -> Arguments:
+    """Unpickles arguments from their compact form, which is not unpacked until the content is first accessed."""
+    self = _empty(cls)
+    object.__setattr__(self, '_wire', (paths, sections, buffer))
+
+    if issubclass(cls, ArgumentsHeader):
+        LazyString.set_root(self)
+    return self
+
+
+def _digest(value) -> bytes:
+    if isinstance(value, Arguments):
+        return value._content_digest()
+    if isinstance(value, str):
+        data = b's' + str(value).encode()
+    elif isinstance(value, dict):
+        data = b'd' + b''.join(_digest(str(k)) + _digest(v) for k, v in sorted(value.items(), key=lambda x: str(x[0])))
+    elif isinstance(value, (list, tuple)):
+        data = b'l' + b''.join(_digest(v) for v in value)
+    elif 'numpy' in sys.modules and isinstance(value, sys.modules['numpy'].ndarray):
+        digest = hashlib.blake2b(f'a{value.dtype.str}{value.shape}'.encode(), digest_size=16)
+        digest.update(sys.modules['numpy'].ascontiguousarray(value).data)
+        return digest.digest()
+    else:
+        data = f'{type(value).__name__}:{value!r}'.encode()
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _thaw(value):
+    if isinstance(value, FrozenArguments):
+        return value.to_dict()
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
 
 
 class ArgumentsHeader(Arguments):
-    """Dummy class for the root of the arguments"""
+    """Dummy class for the root of the arguments. It keeps a flat index of all the dotted paths of the arguments."""
     def __init__(self, *args, **kwargs):
+        object.__setattr__(self, '_index', {})
+        object.__setattr__(self, '_holders', {})
         super(ArgumentsHeader, self).__init__(*args, **kwargs)
-        LazyString._root = self
+        LazyString.set_root(self)
+
+    @contextmanager
+    def as_root(self):
+        """Uses these arguments to replace the placeholders within the with statement (only in the current context)."""
+        token = _context_root.set(self)
+        try:
+            yield self
+        finally:
+            _context_root.reset(token)
 
 
 if __name__ == '__main__':
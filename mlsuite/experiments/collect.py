@@ -0,0 +1,187 @@
+""" Collects the results of many runs into a single flat table, with one row per run and one column per dotted key of
+their configuration (`config.yml`) and metrics (`metrics.yml`, written by the experiment), e.g.:
+
+    python -m mlsuite.experiments.collect results -o results.csv -j 8
+
+The configurations are parsed by a pool of processes, and a manifest next to the table (`results.csv.manifest`) keeps
+the rows already parsed together with the modification times of their files, so that later invocations only parse the
+runs that are new or have changed.
+"""
+import os
+import sys
+import csv
+import pickle
+import tempfile
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+import click
+
+from mlsuite.experiments.arguments import _parse
+from mlsuite.experiments.yaml_handlers import read_yaml, Include
+
+_MANIFEST_VERSION = 1
+_SCALARS = (str, int, float, bool, type(None))
+
+
+def find_runs(roots, config_file='config.yml') -> list:
+    """Returns the folders inside `roots` (recursively, hidden ones excluded) containing a `config_file`."""
+    runs = []
+    for root in roots:
+        for folder, subfolders, files in os.walk(root):
+            subfolders[:] = sorted(f for f in subfolders if not f.startswith('.'))
+            if config_file in files:
+                runs.append(folder)
+    return runs
+
+
+def _signature(files: list) -> tuple:
+    """Modification time and size of each file (None if it does not exist), a row is parsed again if they change."""
+    signature = []
+    for filename in files:
+        try:
+            stat = os.stat(filename)
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+
+def _flatten(content: dict, prefix='', row=None) -> dict:
+    """ Same dotted paths as `Arguments.flat_items`, without building the arguments (several times slower, and it
+    would replace the root of the placeholders of the process). Values that do not fit in a cell are written as text,
+    and the arrays of `!npy` tags are not even read.
+    """
+    row = {} if row is None else row
+    for key, value in content.items():
+        path = f'{prefix}{_parse(str(key))}'
+        if isinstance(value, dict):  # empty sections are not leaves either
+            _flatten(value, f'{path}.', row)
+        elif isinstance(value, Include):
+            _flatten(value.load(), f'{path}.', row)
+        else:
+            row[path] = value if isinstance(value, _SCALARS) else str(value)
+    return row
+
+
+def parse_run(folder, config_file='config.yml', metrics=('metrics.yml',)) -> dict:
+    """Returns the row of the run in `folder`: its flattened configuration followed by its metrics (`metrics.` prefix)."""
+    row = {'run': str(folder)}
+    _flatten(read_yaml(Path(folder, config_file), cache=False), row=row)
+    for filename in metrics:
+        path = Path(folder, filename)
+        if path.is_file():
+            _flatten(read_yaml(path, cache=False), prefix='metrics.', row=row)
+    return row
+
+
+def _parse_job(job) -> tuple:
+    folder, config_file, metrics = job
+    try:
+        return parse_run(folder, config_file, metrics), None
+    except Exception as e:  # a single broken run must not spoil the rest
+        return {'run': str(folder)}, f'{type(e).__name__}: {e}'
+
+
+def _read_manifest(filename: Path, config_file: str, metrics: tuple) -> dict:
+    try:
+        with filename.open('rb') as file:
+            manifest = pickle.load(file)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return {}
+
+    # rows parsed with other files are not valid any more
+    if manifest.get('version') != _MANIFEST_VERSION or manifest.get('files') != (config_file, tuple(metrics)):
+        return {}
+    return manifest['runs']
+
+
+def _write_manifest(filename: Path, runs: dict, config_file: str, metrics: tuple) -> None:
+    filename.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=filename.parent, delete=False) as file:
+        pickle.dump({'version': _MANIFEST_VERSION, 'files': (config_file, tuple(metrics)), 'runs': runs}, file,
+                    protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(file.name, filename)
+
+
+def collect(roots, manifest=None, config_file='config.yml', metrics=('metrics.yml',), jobs=None,
+            verbose=False) -> list:
+    """ Returns the rows (dictionaries) of all the runs inside the folders `roots`, see `parse_run`.
+
+    If `manifest` is given, the rows are cached there and only the runs whose files changed since are parsed again.
+    Parsing is done by `jobs` processes (as many as CPUs by default), or in this process if there are few runs.
+    """
+    metrics = tuple(metrics)
+    manifest = Path(manifest) if manifest is not None else None
+    cached = _read_manifest(manifest, config_file, metrics) if manifest is not None else {}
+
+    runs, pending = {}, []
+    for folder in find_runs(roots, config_file):
+        key = str(Path(folder).absolute())
+        signature = _signature([os.path.join(folder, f) for f in (config_file, *metrics)])
+        if key in cached and cached[key][0] == signature:
+            runs[key] = cached[key]
+        else:
+            runs[key] = (signature, None)
+            pending.append((key, folder))
+
+    jobs = jobs or os.cpu_count() or 1
+    arguments = [(folder, config_file, metrics) for _, folder in pending]
+    if jobs == 1 or len(pending) < 2 * jobs:  # not worth starting the processes
+        results = list(map(_parse_job, arguments))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context('fork')) as pool:
+            results = list(pool.map(_parse_job, arguments, chunksize=max(1, min(64, len(pending) // (4 * jobs)))))
+
+    for (key, folder), (row, error) in zip(pending, results):
+        runs[key] = (runs[key][0] if error is None else None, row)  # broken runs are parsed again next time
+        if error is not None:
+            print(f'Could not parse {folder}: {error}', file=sys.stderr)
+
+    if verbose:
+        print(f'{len(pending)} out of {len(runs)} runs parsed.', file=sys.stderr)
+    if manifest is not None and (pending or len(runs) != len(cached)):
+        _write_manifest(manifest, runs, config_file, metrics)
+
+    return [row for _, row in runs.values()]
+
+
+def columns(rows: list) -> list:
+    """Union of the keys of the rows, in order of appearance."""
+    return list(dict.fromkeys(key for row in rows for key in row))
+
+
+def write_table(rows: list, filename) -> None:
+    """Writes the rows as a CSV file, or a Parquet one (it requires pandas and pyarrow) if it ends with `.parquet`."""
+    filename = Path(filename)
+    if filename.suffix == '.parquet':
+        import pandas  # only needed for this format
+        pandas.DataFrame(rows, columns=columns(rows)).to_parquet(filename)
+        return
+
+    with filename.open('w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=columns(rows), restval='')
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+@click.command()
+@click.argument('roots', nargs=-1, required=True, type=click.Path(exists=True, file_okay=False))
+@click.option('--output', '-o', type=click.Path(dir_okay=False), default='results.csv', show_default=True,
+              help='Table with the results (.csv or .parquet).')
+@click.option('--manifest', type=click.Path(dir_okay=False), help='Cache of the parsed runs [default: OUTPUT.manifest].')
+@click.option('--config-file', default='config.yml', show_default=True, help='Configuration file of each run.')
+@click.option('--metrics', '-m', multiple=True, default=['metrics.yml'], show_default=True,
+              help='Metrics file of each run (YAML or JSON), can be given many times.')
+@click.option('--jobs', '-j', type=int, help='Number of processes parsing the runs [default: number of CPUs].')
+def main(roots, output, manifest, config_file, metrics, jobs):
+    """Collects the configuration and metrics of the runs inside ROOTS into a single table."""
+    rows = collect(roots, manifest=manifest or f'{output}.manifest', config_file=config_file, metrics=metrics,
+                   jobs=jobs, verbose=True)
+    write_table(rows, output)
+    print(f'{len(rows)} runs written to {output}.', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
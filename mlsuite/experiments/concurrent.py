@@ -0,0 +1,98 @@
+""" Runs many experiments concurrently within a single process.
+
+`os.chdir` and `contextlib.redirect_stdout` change the whole process, so isolated runs (the `isolated` option of
+`experiment_wrapper`) replace them by context variables instead: `sys.stdout` and `sys.stderr` write to the files of the
+run of the current thread or asyncio task, and `workdir()` returns its output directory, which the experiment should
+use for its files (e.g., `workdir() / 'model.pt'`). Threads created by the experiment itself need to copy the context
+(`contextvars.copy_context().run`) to be part of the run.
+"""
+import sys
+import inspect
+import threading
+from pathlib import Path
+from contextvars import ContextVar
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+_workdir = ContextVar('workdir')
+_stdout = ContextVar('stdout')
+_stderr = ContextVar('stderr')
+_install_lock = threading.Lock()
+
+
+class _ContextStream:
+    """Stands for a standard stream, writing to the one of the run in the current context (or to the original one)."""
+    def __init__(self, var: ContextVar, default):
+        self._var = var
+        self._default = default
+
+    def write(self, data):
+        return self._var.get(self._default).write(data)
+
+    def flush(self):
+        return self._var.get(self._default).flush()
+
+    def __getattr__(self, name):
+        return getattr(self._var.get(self._default), name)
+
+
+def _install_streams() -> None:
+    with _install_lock:
+        if not isinstance(sys.stdout, _ContextStream):
+            sys.stdout = _ContextStream(_stdout, sys.stdout)
+        if not isinstance(sys.stderr, _ContextStream):
+            sys.stderr = _ContextStream(_stderr, sys.stderr)
+
+
+def workdir() -> Path:
+    """Output directory of the isolated run in the current context, or the working directory outside of them."""
+    return _workdir.get(None) or Path.cwd()
+
+
+@contextmanager
+def run_context(directory: Path, out, err):
+    """Within the with statement, `workdir()` is `directory` and the standard output/error go to `out`/`err`."""
+    _install_streams()
+    tokens = _workdir.set(directory), _stdout.set(out), _stderr.set(err)
+    try:
+        yield
+    finally:
+        for var, token in zip([_workdir, _stdout, _stderr], tokens):
+            var.reset(token)
+
+
+async def _gather(experiment, configs: list, jobs: int) -> list:
+    import asyncio
+    semaphore = asyncio.Semaphore(jobs)
+
+    async def run(config):
+        async with semaphore:
+            try:
+                await experiment(config, options={'isolated': True})
+            except Exception as e:
+                return e
+
+    return await asyncio.gather(*[run(config) for config in configs])
+
+
+def _run(experiment, config):
+    try:
+        experiment(config, options={'isolated': True})
+    except Exception as e:
+        return e
+
+
+def run_concurrent(experiment, configs, jobs: int = 8) -> list:
+    """ Runs `experiment` (decorated with `experiment_wrapper`) once per configuration in `configs` as isolated runs,
+    up to `jobs` at the same time: in threads, or as asyncio tasks if it is a coroutine function. Returns the exception
+    raised by each run (None if it finished successfully).
+    """
+    assert jobs > 0, 'There should be at least one job.'
+    configs = list(configs)
+
+    if inspect.iscoroutinefunction(experiment):
+        import asyncio  # not imported along with the module, which every experiment needs
+        return asyncio.run(_gather(experiment, configs, jobs))
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(lambda config: _run(experiment, config), configs))
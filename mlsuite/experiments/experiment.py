@@ -1,15 +1,23 @@
 import os
+import re
 import sys
-import subprocess
-from functools import wraps
+import fcntl
+import shutil
+import inspect
+from pathlib import Path
+from functools import wraps, partial
 from datetime import datetime
-from contextlib import redirect_stdout, redirect_stderr
+from contextlib import contextmanager, asynccontextmanager, redirect_stdout, redirect_stderr
 
 import yaml
 import click
 
 from mlsuite.experiments.arguments import ArgumentsHeader, Arguments
-from mlsuite.experiments.yaml_handlers import read_yaml, YAMLConfig
+from mlsuite.experiments.yaml_handlers import read_yaml, store_arrays, YAMLConfig
+from mlsuite.experiments.git import GitRevision, same_revision
+from mlsuite.experiments.registry import registered, get_registry, start_hash
+from mlsuite.experiments.concurrent import run_context, workdir
+from mlsuite.experiments.logs import BackgroundWriter, capture_fd
 
 
 class TeeFile:
@@ -36,89 +44,93 @@ def experiment_wrapper(*args, **kwargs):
     In particular:
         1. Gathers all arguments and pass it to the function.
         2. Creates the experiment directories and changes the working directory.
-        3. Saves a copy of the arguments to a yaml file.
-        4. Adds the git hash (if it exists) and timestamp to the settings.
-        5. Redirects output and error to a file.
+        3. Saves a copy of the arguments to a yaml file, and registers the run (see `mlsuite.experiments.registry`).
+        4. Adds the git hash (if it exists, followed by -dirty if `git_dirty` and there are uncommitted changes) and
+           timestamp to the settings.
+        5. Redirects output and error to a file. The files are written by a background thread (see
+           `mlsuite.experiments.logs.BackgroundWriter`), and rotated once they are bigger than `max_log_size` bytes.
+           With `capture_fds=True` the file descriptors 1 and 2 are redirected instead, which also captures the
+           output of C extensions and subprocesses. Unless `log_index=False`, each file has an index to read parts of
+           it quickly (`python -m mlsuite.experiments.logs --help`).
         6. If verbose=True and it is running in an interactive terminal it also outputs to the terminal.
+
+    The output is completely written when the experiment ends, even if it raises an exception (which includes the
+    SIGTERM signal, once `mlsuite.failsafe` is used or `mlsuite.failsafe.signals` imported).
+
+    If the `sweep` option points to a YAML file describing a sweep (see `mlsuite.experiments.sweep`), the function is
+    instead run once per point of the sweep, each of them in its own folder inside `output_dir`.
+
+    With `isolated=True` (always the case for coroutine functions) the run neither changes the working directory nor
+    redirects the output of the whole process, so that many of them can run concurrently in threads or asyncio tasks
+    (see `mlsuite.experiments.concurrent`).
+
+    With `reuse=True` the experiment is not run if the registry has a run that finished with the same experiment (the
+    `experiment` option, the module and qualified name of the function by default), configuration (without the options)
+    and git revision, `output_dir` is linked to its folder instead. With `content_addressed` set to a folder, runs are
+    also written to `<content_addressed>/<experiment>-<hash>-<revision>` (and `output_dir` links to it), so identical
+    runs (e.g., points of sweeps) share their folder: a run waits for an identical one that is running, and starts over
+    the folder of one that did not finish. Dirty revisions are never reused.
     """
     def _experiment_decorator(**kwargs):
-        arguments = ArgumentsHeader(options={
+        options = {
             'output_dir': 'results',  # '.',
             'default_dirs': [],
             'output_file': 'stdout.txt',
             'error_file': 'stderr.txt',
             'verbose': True,
-            'git_hash': 'no-git',
+            'git_hash': None,
+            'git_dirty': False,
             'exist_ok': False,
             'config_file': 'config.yml',
-        })
-        arguments.options.update(**kwargs)
-
-        # Add git version to the config file
-        try:
-            git_hash = subprocess.check_output(["git", "describe", "--always"],
-                                               stderr=subprocess.DEVNULL).strip().decode('ascii')
-            arguments.options.update(git_hash=git_hash)
-        except subprocess.CalledProcessError:
-            pass
-
-        # Add timestamp to the config file
-        arguments.options.update(timestamp=datetime.today().strftime('%Y-%m-%d-%H:%M:%S'))
+            'sweep': None,
+            'jobs': 1,
+            'isolated': False,
+            'max_log_size': None,
+            'log_backups': 3,
+            'capture_fds': False,
+            'log_index': True,
+            'reuse': False,
+            'content_addressed': None,
+            'experiment': None,  # what the runs with the same configuration have to share to be reused
+        }
+        options.update(**kwargs)
+
+        # Add git version to the config file, only read if used
+        if options['git_hash'] is None:
+            options['git_hash'] = GitRevision(os.getcwd(), dirty=options['git_dirty'])
 
         def __experiment_decorator(func):
-            @wraps(func)
-            def wrapper(*args, **kwargs):
-                try:
-                    arguments.update(*args, **kwargs)
-                    arguments.update(pwd=os.getcwd())
-
-                    assert arguments.options.output_dir != '.', 'Do not use . as output directory please.'
-
-                    # Create the project folder and change the working directory
-                    output_dir = str(arguments.options.output_dir)
-                    os.makedirs(output_dir, exist_ok=arguments.options.exist_ok)
-                    os.chdir(output_dir)
-
-                    for dir in arguments.options.default_dirs:
-                        os.makedirs(str(dir), exist_ok=arguments.options.exist_ok)
-
-                    # check if the configuration file exists already
-                    if arguments.options.exist_ok:
-                        try:
-                            new_args = read_yaml(arguments.options.config_file)
-                            assert 'options' in new_args.keys(), 'Loaded configuration does not have options.'
-                            assert 'git_hash' in new_args['options'].keys() and 'timestamp' in new_args['options'].keys()
-                            assert new_args['options']['git_hash'] == arguments.options.git_hash, 'Different git versions.'
-
-                            options = new_args['options']
-                            new_args.pop('options')
-
-                            arguments.options.timestamp = options['timestamp']
-                            arguments.update(new_args)
-                        except FileExistsError:
-                            pass
-
-                    if arguments.options.verbose and is_interactive_shell():
-                        print(arguments.to_dict(), file=sys.stderr)
-
-                    with open(arguments.options.output_file, 'a') as out, open(arguments.options.error_file, 'a') as err:
-                        if arguments.options.verbose and is_interactive_shell():
-                            out_file = TeeFile(out, sys.stdout)
-                            err_file = TeeFile(err, sys.stderr)
-                        else:
-                            out_file, err_file = out, err
-
-                        with redirect_stdout(out_file), redirect_stderr(err_file):
-                            func(arguments)
-
-                except Exception as e:
-                    arguments.update({'exception thrown': f'"{type(e).__name__}: {str(e)}"'})
-                    raise e
-
-                finally:
-                    with open(arguments.options.config_file, 'w') as file:
-                        arguments.pop('pwd')
-                        yaml.safe_dump(arguments.to_dict(), file)
+            experiment = options['experiment'] or f'{func.__module__}.{func.__qualname__}'
+
+            def make_arguments(args, kwargs) -> ArgumentsHeader:
+                # new ones per call (with their own timestamp), so it can be called many times
+                timestamp = datetime.today().strftime('%Y-%m-%d-%H:%M:%S')
+                arguments = ArgumentsHeader(options={**options, 'experiment': experiment, 'timestamp': timestamp})
+                arguments.update(*args, **kwargs)
+                return arguments
+
+            if inspect.iscoroutinefunction(func):
+                @wraps(func)
+                async def wrapper(*args, **kwargs):
+                    arguments = make_arguments(args, kwargs)
+                    async with _claimed_async(arguments) as reused:
+                        if not reused:
+                            with isolated_run(arguments):
+                                await func(arguments)
+            else:
+                @wraps(func)
+                def wrapper(*args, **kwargs):
+                    arguments = make_arguments(args, kwargs)
+                    if arguments.options.sweep is not None:
+                        from mlsuite.experiments.sweep import run_sweep  # it needs multiprocessing
+                        run_sweep(partial(run_experiment, func), arguments)
+                    elif arguments.options.isolated:
+                        with _claimed(arguments) as reused:
+                            if not reused:
+                                with isolated_run(arguments):
+                                    func(arguments)
+                    else:
+                        run_experiment(func, arguments)
 
             return wrapper
         return __experiment_decorator
@@ -132,6 +144,212 @@ def experiment_wrapper(*args, **kwargs):
         return _experiment_decorator(**kwargs)
 
 
+def run_experiment(func, arguments: ArgumentsHeader) -> None:
+    """Runs `func(arguments)` as a single experiment, following the steps described in `experiment_wrapper`."""
+    with _claimed(arguments) as reused:
+        if not reused:
+            _run_experiment(func, arguments)
+
+
+def _run_experiment(func, arguments: ArgumentsHeader) -> None:
+    with arguments.as_root(), registered(arguments):
+        try:
+            arguments.update(pwd=os.getcwd())
+
+            assert arguments.options.output_dir != '.', 'Do not use . as output directory please.'
+
+            # Create the project folder and change the working directory
+            output_dir = str(arguments.options.output_dir)
+            os.makedirs(output_dir, exist_ok=arguments.options.exist_ok)
+            os.chdir(output_dir)
+
+            for dir in arguments.options.default_dirs:
+                os.makedirs(str(dir), exist_ok=arguments.options.exist_ok)
+
+            # check if the configuration file exists already
+            if arguments.options.exist_ok:
+                _restore(arguments, str(arguments.options.config_file))
+
+            if arguments.options.verbose and is_interactive_shell():
+                print(arguments.to_dict(), file=sys.stderr)
+
+            if arguments.options.capture_fds:  # Python writes directly to the captured file descriptors
+                with _capture(arguments, 1, 'output_file'), _capture(arguments, 2, 'error_file'), \
+                        redirect_stdout(sys.__stdout__), redirect_stderr(sys.__stderr__):
+                    func(arguments)
+            else:
+                with _writer(arguments, 'output_file', sys.stdout) as out, \
+                        _writer(arguments, 'error_file', sys.stderr) as err:
+                    with redirect_stdout(out), redirect_stderr(err):
+                        func(arguments)
+
+        except Exception as e:
+            arguments.update({'exception thrown': f'"{type(e).__name__}: {str(e)}"'})
+            raise e
+
+        finally:
+            with open(arguments.options.config_file, 'w') as file:
+                content = store_arrays(arguments.to_dict())
+                content.pop('pwd', None)  # still needed by the placeholders (and the registry), but not saved
+                yaml.safe_dump(content, file)
+
+
+@contextmanager
+def _claimed(arguments: ArgumentsHeader):
+    """ Yields whether the results of a finished run with the same configuration and revision can be used instead of
+    running the experiment again (only if the `reuse` or `content_addressed` options are set), in which case `output_dir`
+    is linked to its folder. With `content_addressed`, new runs are written to the folder of their key instead, which is
+    locked within the with statement so that identical runs wait for it to finish.
+    """
+    options = arguments.options
+    if not options.reuse and not options.content_addressed:
+        yield False
+        return
+
+    registry = get_registry()
+    assert registry is not None, 'Reusing runs requires the registry (see GlobalOptions.registry_file).'
+
+    with arguments.as_root():
+        key, revision, output_dir = start_hash(arguments), str(options.git_hash), Path(str(options.output_dir))
+    if revision.endswith('-dirty') or revision == 'no-git':  # the code might have changed
+        yield False
+        return
+
+    if _reuse(registry, key, revision, output_dir):
+        yield True
+        return
+    if not options.content_addressed:
+        yield False
+        return
+
+    name = f'{key}-{revision}' if options.get('experiment') is None else f'{options.experiment}-{key}-{revision}'
+    target = Path(str(options.content_addressed), re.sub(r'[^\w.-]', '_', name))  # e.g., <locals> in qualified names
+    target.parent.mkdir(parents=True, exist_ok=True)
+    lock = os.open(target.parent / f'.{target.name}.lock', os.O_RDWR | os.O_CREAT)
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX)  # released once closed, even if the process is killed
+        if _reuse(registry, key, revision, output_dir):  # an identical run finished while waiting
+            yield True
+            return
+
+        if target.exists():  # left by an identical run that did not finish
+            shutil.rmtree(target)
+        _link(output_dir, target)
+        options.output_dir = str(target.absolute())
+        yield False
+    finally:
+        os.close(lock)
+
+
+@asynccontextmanager
+async def _claimed_async(arguments: ArgumentsHeader):
+    """Same as `_claimed`, but waiting for identical runs without blocking the event loop."""
+    import asyncio
+    claim = _claimed(arguments)
+    reused = await asyncio.to_thread(claim.__enter__)
+    try:
+        yield reused
+    finally:
+        claim.__exit__(None, None, None)  # only releases the lock
+
+
+def _reuse(registry, key: str, revision: str, output_dir: Path) -> bool:
+    """Links `output_dir` to a finished run with the same `key` and `revision` (if any), and returns whether it did."""
+    run = registry.finished(key, revision)
+    if run is None:
+        return False
+
+    if not output_dir.exists() or _is_link(output_dir, Path(run['output_dir'])):
+        _link(output_dir, Path(run['output_dir']))
+    print(f'Not running {output_dir}, the results of the same configuration are in {run["output_dir"]}.',
+          file=sys.__stderr__)
+    return True
+
+
+def _is_link(link: Path, target: Path) -> bool:
+    return link.absolute() == target.absolute() or (link.is_symlink() and link.resolve() == target.resolve())
+
+
+def _link(link: Path, target: Path) -> None:
+    if _is_link(link, target):
+        return
+    if link.exists() or link.is_symlink():
+        raise FileExistsError(f'{link} already exists, it cannot be linked to {target}.')
+
+    link.parent.mkdir(parents=True, exist_ok=True)
+    os.symlink(os.path.relpath(target.absolute(), link.parent.absolute()), link, target_is_directory=True)
+
+
+def _writer(arguments: ArgumentsHeader, option: str, console, folder='.') -> BackgroundWriter:
+    """Writer of the output file `arguments.options[option]`, also printing to `console` if verbose."""
+    tee = arguments.options.verbose and is_interactive_shell()
+    return BackgroundWriter(Path(folder, str(arguments.options[option])), console=console if tee else None,
+                            max_size=arguments.options.max_log_size, backups=arguments.options.log_backups,
+                            index=arguments.options.log_index)
+
+
+def _capture(arguments: ArgumentsHeader, fd: int, option: str):
+    """Captures the file descriptor `fd` into the output file `arguments.options[option]`."""
+    return capture_fd(fd, str(arguments.options[option]), tee=arguments.options.verbose and is_interactive_shell(),
+                      max_size=arguments.options.max_log_size, backups=arguments.options.log_backups,
+                      index=arguments.options.log_index)
+
+
+def _restore(arguments: ArgumentsHeader, config_file) -> None:
+    """Loads the configuration of a previous run of the experiment, if any."""
+    try:
+        new_args = read_yaml(config_file, cache=False)
+        assert 'options' in new_args.keys(), 'Loaded configuration does not have options.'
+        assert 'git_hash' in new_args['options'].keys() and 'timestamp' in new_args['options'].keys()
+        assert same_revision(new_args['options']['git_hash'], arguments.options.git_hash), 'Different git versions.'
+
+        options = new_args['options']
+        new_args.pop('options')
+
+        arguments.options.timestamp = options['timestamp']
+        arguments.update(new_args)
+    except FileExistsError:
+        pass
+
+
+@contextmanager
+def isolated_run(arguments: ArgumentsHeader):
+    """ Same as `run_experiment` for the code within the with statement, but without changing the working directory or
+    redirecting the output of the whole process (see `mlsuite.experiments.concurrent`).
+    """
+    with arguments.as_root(), registered(arguments):
+        output_dir, created = Path(str(arguments.options.output_dir)).absolute(), False
+        try:
+            arguments.update(pwd=str(workdir()))  # the working directory of the context that runs it
+
+            assert arguments.options.output_dir != '.', 'Do not use . as output directory please.'
+            assert not arguments.options.capture_fds, 'File descriptors cannot be captured by isolated runs.'
+
+            output_dir.mkdir(parents=True, exist_ok=arguments.options.exist_ok)
+            created = True
+            for dir in arguments.options.default_dirs:
+                (output_dir / str(dir)).mkdir(parents=True, exist_ok=arguments.options.exist_ok)
+
+            if arguments.options.exist_ok:
+                _restore(arguments, output_dir / str(arguments.options.config_file))
+
+            with _writer(arguments, 'output_file', sys.__stdout__, output_dir) as out, \
+                    _writer(arguments, 'error_file', sys.__stderr__, output_dir) as err:
+                with run_context(output_dir, out, err):
+                    yield arguments
+
+        except Exception as e:
+            arguments.update({'exception thrown': f'"{type(e).__name__}: {str(e)}"'})
+            raise e
+
+        finally:
+            if created:  # never overwrite the configuration of another run
+                with open(output_dir / str(arguments.options.config_file), 'w') as file:
+                    content = store_arrays(arguments.to_dict(), root=output_dir)
+                    content.pop('pwd', None)
+                    yaml.safe_dump(content, file)
+
+
 def CLIConfig(func):
     """ Shortcut to read the experiment options from the command line."""
     @click.option('--output-dir', '-dir', type=click.Path(exists=False, dir_okay=True), help='Output directory.')
@@ -139,15 +357,22 @@ def CLIConfig(func):
     @click.option('--error-file', '-err', type=str, help='Error filename.')
     @click.option('--config-file', '-conf', type=str, help='Configuration filename.')
     @click.option('--exist-ok', type=bool, default=None, help='Whether it is ok if the directory already exists.')
+    @click.option('--sweep', type=click.Path(exists=True, dir_okay=False), help='YAML file describing a sweep.')
+    @click.option('--jobs', '-j', type=int, help='Number of runs of the sweep executed in parallel.')
+    @click.option('--reuse', type=bool, default=None, help='Whether to reuse the results of identical finished runs.')
     @click.option('--verbose', is_flag=True)
     @wraps(func)
-    def wrapper(*args, output_dir=None, output_file=None, error_file=None, config_file=None, exist_ok=None, **kwargs):
+    def wrapper(*args, output_dir=None, output_file=None, error_file=None, config_file=None, exist_ok=None, sweep=None,
+                jobs=None, reuse=None, **kwargs):
         options = {}
         if output_file is not None: options['output_file'] = output_file
         if error_file is not None: options['error_file'] = error_file
         if config_file is not None: options['config_file'] = config_file
         if exist_ok is not None: options['exist_ok'] = exist_ok
         if output_dir is not None: options['output_dir'] = output_dir
+        if sweep is not None: options['sweep'] = sweep
+        if jobs is not None: options['jobs'] = jobs
+        if reuse is not None: options['reuse'] = reuse
 
         return func(Arguments(options=options), *args, **kwargs)
 
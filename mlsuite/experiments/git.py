@@ -0,0 +1,122 @@
+""" Revision of the git repository containing the experiment, read directly from the `.git` folder. """
+import os
+import re
+import subprocess
+from pathlib import Path
+
+from mlsuite.experiments.arguments import Deferred
+
+_ENVIRON = 'MLSUITE_GIT_REVISION'  # shares the revision with child processes as `<revision> <dirty> <git folder>`
+_DESCRIBE = re.compile(r'(?:^|-g)([0-9a-f]{4,40})(-dirty)?$')  # commit in the output of `git describe --always`
+_revisions = {}  # (git folder, dirty) -> revision, for this process
+
+
+def _git_dir(path: Path) -> tuple:
+    """Returns the git folder of the repository containing `path` and its work tree (where `.git` was found)."""
+    for folder in [path, *path.parents]:
+        candidate = folder / '.git'
+        if candidate.is_dir():
+            return candidate, folder
+        if candidate.is_file():  # worktrees and submodules: "gitdir: <path>"
+            content = candidate.read_text().strip()
+            if content.startswith('gitdir:'):
+                return (folder / content[len('gitdir:'):].strip()).resolve(), folder
+    return None, None
+
+
+def _read_ref(git_dir: Path, ref: str):
+    common = git_dir
+    if (git_dir / 'commondir').is_file():  # branches of worktrees live in the main repository
+        common = (git_dir / (git_dir / 'commondir').read_text().strip()).resolve()
+
+    for folder in {git_dir, common}:
+        try:
+            return (folder / ref).read_text().strip()
+        except OSError:
+            pass
+
+    try:
+        with (common / 'packed-refs').open() as file:
+            for line in file:
+                if not line.startswith(('#', '^')) and line.rstrip('\n').endswith(' ' + ref):
+                    return line.split(' ', 1)[0]
+    except OSError:
+        pass
+    return None
+
+
+def _head(git_dir: Path):
+    head = (git_dir / 'HEAD').read_text().strip()
+    for _ in range(5):  # symbolic references can point to other symbolic references
+        if not head.startswith('ref:'):
+            return head
+        head = _read_ref(git_dir, head[len('ref:'):].strip())
+        if head is None:  # e.g., a branch without commits
+            return None
+    return None
+
+
+def _is_dirty(git_dir: Path, work_tree: Path) -> bool:
+    try:
+        status = subprocess.check_output(['git', '--git-dir', str(git_dir), '--work-tree', str(work_tree),
+                                          'status', '--porcelain', '--untracked-files=no'],
+                                         stderr=subprocess.DEVNULL)
+        return len(status.strip()) > 0
+    except (OSError, subprocess.CalledProcessError):
+        return False
+
+
+def git_revision(path='.', dirty=False, length=7, default='no-git') -> str:
+    """ Returns the (abbreviated to `length` characters) commit checked out in the repository containing `path`, followed
+    by `-dirty` if `dirty` and there are uncommitted changes to tracked files (only this needs to run git), or `default`
+    if there is no such repository.
+
+    It is computed once per process and repository, and shared with the child processes through the environment.
+    """
+    git_dir, work_tree = _git_dir(Path(path).absolute())
+    if git_dir is None:
+        return default
+
+    key = (str(git_dir), dirty)
+    if key not in _revisions:
+        inherited = os.environ.get(_ENVIRON, '').split(' ', 2)
+        if inherited[1:] == [str(int(dirty)), key[0]]:
+            _revisions[key] = inherited[0]
+        else:
+            try:
+                revision = _head(git_dir)
+            except OSError:
+                revision = None
+            if revision is None:
+                return default
+
+            revision = revision[:length] + ('-dirty' if dirty and _is_dirty(git_dir, work_tree) else '')
+            _revisions[key] = revision
+            os.environ[_ENVIRON] = f'{revision} {int(dirty)} {key[0]}'
+
+    return _revisions[key]
+
+
+def same_revision(a: str, b: str) -> bool:
+    """Whether two revisions are the same commit, even if abbreviated differently or coming from `git describe`."""
+    a, b = str(a), str(b)
+    if a == b:
+        return True
+
+    a, b = _DESCRIBE.search(a), _DESCRIBE.search(b)
+    if a is None or b is None:
+        return False
+    return a.group(2) == b.group(2) and (a.group(1).startswith(b.group(1)) or b.group(1).startswith(a.group(1)))
+
+
+class GitRevision(Deferred):
+    """Value of the `git_hash` option, so that the revision of the repository containing `path` is only read if used."""
+    def __init__(self, path='.', dirty=False):
+        self.path = os.path.abspath(path)
+        self.dirty = dirty
+
+    def load(self):
+        return git_revision(self.path, dirty=self.dirty)
+
+    def __repr__(self):
+        return f'GitRevision({self.path!r}, dirty={self.dirty})'
@@ -0,0 +1,221 @@
+""" Launches many runs of an experiment without paying the start-up cost of Python (and its imports) for each of them.
+
+A fork server is started once: it imports the heavy dependencies and the module of the experiment, and then forks a
+fresh child per run, which calls the experiment command with the arguments of the run as if they came from the command
+line (so it goes through the usual `experiment_wrapper` path). For example, with one line of arguments per run in
+runs.txt (e.g. `-c config.yml -device cpu --output-dir results/0`):
+
+    python -m mlsuite.experiments.launcher example:main runs.txt --jobs 8
+
+Note that the children inherit the state of the server, including the seeds of the random number generators.
+"""
+import os
+import sys
+import time
+import shlex
+import struct
+import statistics
+import importlib
+import traceback
+import multiprocessing
+from collections import deque, namedtuple
+from multiprocessing.connection import wait
+
+import click
+
+PRELOAD = ['numpy', 'torch', 'yaml', 'click', 'dill']
+
+LaunchResult = namedtuple('LaunchResult', ['index', 'argv', 'pid', 'exit_code', 'startup', 'duration'])
+LaunchResult.__doc__ = """Outcome of a run. `startup` is the time (in seconds) since the run was submitted until the
+experiment was called, and `duration` until its process finished."""
+
+
+def _load(target: str):
+    module, _, name = target.partition(':')
+    obj = importlib.import_module(module)
+    for attr in (name or 'main').split('.'):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def _call(command, argv: list) -> int:
+    try:
+        if isinstance(command, click.Command):
+            command.main(args=argv, prog_name=command.name, standalone_mode=True)  # it always raises SystemExit
+        else:
+            command(argv)
+        return 0
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else int(e.code is not None)
+    except Exception:
+        traceback.print_exc()
+        return 1
+
+
+def _run_child(command, argv: list, submitted: float, pipe: int) -> None:
+    code = 1
+    try:
+        sys.argv = sys.argv[:1] + argv
+        os.write(pipe, struct.pack('d', time.monotonic() - submitted))
+        code = _call(command, argv)
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(code)  # never go back to the loop of the server
+
+
+def _serve(target: str, preload: list, conn) -> None:
+    for name in preload:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+
+    try:
+        command = _load(target)
+    except Exception:
+        conn.send(('error', traceback.format_exc()))
+        return
+    conn.send(('ready', None))
+
+    children = {}  # read end of the pipe of each child -> [index, argv, pid, submitted, startup]
+    while True:
+        for ready in wait([conn] + list(children.keys())):
+            if ready is conn:
+                try:
+                    request = conn.recv()
+                except EOFError:
+                    request = None
+                if request is None:
+                    return
+
+                index, argv, submitted = request
+                read, write = os.pipe()  # the child writes its startup time, and closing it signals its end
+                pid = os.fork()
+                if pid == 0:
+                    os.close(read)
+                    _run_child(command, argv, submitted, write)
+                os.close(write)
+                children[read] = [index, argv, pid, submitted, None]
+                continue
+
+            child, data = children[ready], os.read(ready, 8)
+            if data:
+                child[4], = struct.unpack('d', data)
+                continue
+
+            os.close(ready)
+            del children[ready]
+            index, argv, pid, submitted, startup = child
+            _, status = os.waitpid(pid, 0)
+            conn.send(LaunchResult(index, argv, pid, os.waitstatus_to_exitcode(status), startup,
+                                   time.monotonic() - submitted))
+
+
+class ForkServer:
+    """ Process that imports `preload` and the experiment `target` (given as `module:command`) once, and then forks a
+    new child for every run. `command` is either a click command or a function receiving the list of arguments.
+    """
+    def __init__(self, target: str, preload=PRELOAD):
+        self.target = target
+        self.preload = list(preload)
+        self.startup = None  # time it took to start the server
+        self._process = self._conn = None
+
+    def start(self) -> 'ForkServer':
+        context = multiprocessing.get_context('spawn')  # a clean interpreter, whatever the state of this one
+        self._conn, conn = context.Pipe()
+        self._process = context.Process(target=_serve, args=(self.target, self.preload, conn), daemon=True)
+
+        start = time.monotonic()
+        self._process.start()
+        conn.close()
+        try:
+            status, error = self._conn.recv()
+        except EOFError:
+            status, error = 'error', f'exit code {self._process.exitcode}'
+        if status == 'error':
+            self.close()
+            raise RuntimeError(f'The fork server could not load {self.target}:\n{error}')
+        self.startup = time.monotonic() - start
+
+        return self
+
+    def run(self, runs, jobs: int = 1, callback=None) -> list:
+        """ Runs the experiment once per list of arguments in `runs`, with up to `jobs` of them at the same time.
+        Returns a `LaunchResult` per run, in the same order, and calls `callback(result)` as soon as each one finishes.
+        """
+        assert self._process is not None, 'The fork server has not been started.'
+        assert jobs > 0, 'There should be at least one job.'
+
+        pending, results, running = deque(enumerate(runs)), {}, 0
+        while pending or running > 0:
+            while pending and running < jobs:
+                index, argv = pending.popleft()
+                self._conn.send((index, list(argv), time.monotonic()))
+                running += 1
+
+            result = self._conn.recv()
+            results[result.index], running = result, running - 1
+            if callback is not None:
+                callback(result)
+
+        return [results[i] for i in range(len(results))]
+
+    def close(self) -> None:
+        if self._process is None:
+            return
+        try:
+            self._conn.send(None)
+        except OSError:  # the server is already gone
+            pass
+        self._conn.close()
+        self._process.join()
+        self._process = self._conn = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def read_runs(file) -> list:
+    """Arguments of each run, one line per run (empty lines and those starting with # are skipped)."""
+    return [shlex.split(line) for line in file if line.strip() and not line.lstrip().startswith('#')]
+
+
+@click.command()
+@click.argument('target')
+@click.argument('runs', type=click.File('r'))
+@click.option('--jobs', '-j', type=int, default=1, help='Number of runs executed in parallel.')
+@click.option('--preload', '-p', multiple=True, help='Extra module imported by the server before forking.')
+def main(target, runs, jobs, preload):
+    """Runs TARGET (`module:command`) once per line of arguments in the RUNS file, forking a pre-warmed server."""
+    runs = read_runs(runs)
+
+    def report(result):
+        report.completed += 1
+        status = 'done' if result.exit_code == 0 else f'failed (exit code {result.exit_code})'
+        startup = 'n/a' if result.startup is None else f'{1000 * result.startup:.1f} ms'
+        print(f'[{report.completed}/{len(runs)}] {shlex.join(result.argv)} {status}, started in {startup}, '
+              f'took {result.duration:.2f} s', file=sys.stderr)
+    report.completed = 0
+
+    with ForkServer(target, preload=PRELOAD + list(preload)) as server:
+        print(f'Fork server ready in {server.startup:.2f} s.', file=sys.stderr)
+        results = server.run(runs, jobs=jobs, callback=report)
+
+    startups = [1000 * r.startup for r in results if r.startup is not None]
+    if startups:
+        print(f'Startup latency: median {statistics.median(startups):.1f} ms, max {max(startups):.1f} ms.',
+              file=sys.stderr)
+
+    failed = sum(r.exit_code != 0 for r in results)
+    if failed > 0:
+        print(f'{failed} out of {len(results)} runs failed.', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,485 @@
+""" Capture of the output of the experiments, and fast access to the resulting logs. """
+import os
+import re
+import sys
+import mmap
+import bisect
+import struct
+import time
+import atexit
+import weakref
+import itertools
+import threading
+from datetime import datetime
+from pathlib import Path
+from collections import deque
+from functools import partial
+from contextlib import contextmanager
+
+import click
+
+INDEX_ENTRY = struct.Struct('<dqq')  # time, line number and byte offset of a line of a log
+
+_writers = weakref.WeakSet()  # writers still open, closed at exit if the experiment did not
+
+
+class _Closed:
+    """Queue of a closed writer."""
+    def append(self, data):
+        raise ValueError('I/O operation on closed file.')
+
+    def __len__(self):
+        return 1
+
+
+def _read_index(path: Path) -> list:
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return []
+    data = data[:len(data) - len(data) % INDEX_ENTRY.size]  # the last entry might be half-written
+    return list(INDEX_ENTRY.iter_unpack(data))
+
+
+def index_file(filename) -> Path:
+    """Sidecar file with the index of the log `filename`, see `LogReader`."""
+    filename = Path(filename)
+    return filename.with_name(f'{filename.name}.idx')
+
+
+class _RotatingFile:
+    """ File opened for appending which is rotated once it grows bigger than `max_size` bytes, keeping `backups` old
+    files (`filename.1` being the most recent one). The data is written as text or bytes depending on `mode`.
+
+    Unless `index=False`, every `index_bytes` bytes or `index_seconds` seconds the time, line number and byte offset of
+    the next line starting are added to its index file, so that `LogReader` can seek it without reading everything.
+    """
+    index_bytes = 1 << 20
+    index_seconds = 1.
+    read_size = 1 << 20  # of the reads counting the lines not indexed yet, when appending to an existing log
+
+    def __init__(self, filename: Path, mode='a', max_size=None, backups=3, buffering=1 << 16, index=True):
+        self.filename, self.mode, self.buffering = filename, mode, buffering
+        self.max_size, self.backups, self.indexed = max_size, backups, index
+        self.newline = b'\n' if 'b' in mode else '\n'
+        self._open()
+
+    def _open(self) -> None:
+        self.file = open(self.filename, self.mode, buffering=self.buffering)
+        self.lines, self.at_line_start = 0, True
+        self.index, self.last_entry = None, (0., 0, -1 << 62)
+        if not self.indexed:
+            return
+
+        index = index_file(self.filename)
+        size = self.filename.stat().st_size
+        if size > 0:  # appending to an existing log, continue its index from its last entry
+            entries = _read_index(index)
+            if entries and entries[-1][2] <= size:
+                self.last_entry = entries[-1]
+            self.lines, last = max(self.last_entry[1], 0), b'\n'  # the last entry is the start of a line
+            with self.filename.open('rb') as file:
+                file.seek(max(self.last_entry[2], 0))
+                for data in iter(partial(file.read, self.read_size), b''):  # without the index, the whole log
+                    self.lines += data.count(b'\n')
+                    last = data[-1:]
+            self.at_line_start = last == b'\n'
+        self.index = open(index, 'ab', buffering=0)
+
+    def write(self, data) -> None:
+        while self.max_size is not None and self.file.tell() + len(data) > self.max_size:
+            # fill the current file with whole lines, unless a single line does not fit in it
+            cut = data.rfind(self.newline, 0, self.max_size - self.file.tell()) + 1
+            if cut == 0 and self.file.tell() == 0:
+                cut = data.find(self.newline) + 1 or len(data)
+            self._append(data[:cut])
+            data = data[cut:]
+            self.rotate()
+        self._append(data)
+
+    def _append(self, data) -> None:
+        if not data:
+            return
+        if self.index is not None:
+            self._add_entry(data)
+        self.file.write(data)
+        self.lines += data.count(self.newline)
+        self.at_line_start = data.endswith(self.newline)
+
+    def _add_entry(self, data) -> None:
+        now, offset = time.time(), self.file.tell()
+        if offset - self.last_entry[2] < self.index_bytes and now - self.last_entry[0] < self.index_seconds:
+            return
+
+        lines = self.lines
+        if not self.at_line_start:  # index the first line starting within data instead
+            cut = data.find(self.newline) + 1
+            if cut == 0 or cut == len(data):
+                return
+            offset += cut if isinstance(data, bytes) else len(data[:cut].encode(self.file.encoding))
+            lines += 1
+
+        self.last_entry = (now, lines, offset)
+        self.index.write(INDEX_ENTRY.pack(*self.last_entry))
+
+    def rotate(self) -> None:
+        self.close()
+        for i in range(self.backups, 0, -1):
+            source = self.filename if i == 1 else self.filename.with_name(f'{self.filename.name}.{i - 1}')
+            target = self.filename.with_name(f'{self.filename.name}.{i}')
+            for old, new in [(source, target), (index_file(source), index_file(target))]:
+                if old.exists():
+                    os.replace(old, new)
+        if self.backups == 0:
+            self.filename.unlink()
+            index_file(self.filename).unlink(missing_ok=True)
+        self._open()
+
+    def flush(self) -> None:
+        self.file.flush()
+
+    def fileno(self) -> int:
+        return self.file.fileno()
+
+    def close(self) -> None:
+        self.file.close()
+        if self.index is not None:
+            self.index.close()
+
+
+class BackgroundWriter:
+    """ File-like object whose writes are done by a background thread, so that printing never waits for the disk.
+
+    Writes are queued (blocking once `queue_size` of them are pending), and the thread writes them in batches to
+    `filename`, which is rotated once it grows bigger than `max_size` bytes (keeping `backups` old files, `filename.1`
+    being the most recent one), and indexed unless `index=False` (see `LogReader`). If a `console` stream is given the
+    output is also written there, but at most once every `console_interval` seconds. Closing the writer (or leaving its
+    with statement) writes everything still pending.
+    """
+    interval = 0.1  # seconds between the batches of the thread, unless `batch_size` writes are pending
+    console_interval = 0.1
+    batch_size = 4096
+
+    def __init__(self, filename, console=None, max_size=None, backups=3, queue_size=100000, index=True):
+        self.filename = Path(filename).absolute()
+        self.console = console
+        self.max_size = max_size
+        self.backups = backups
+        self.queue_size = queue_size
+
+        self._file = _RotatingFile(self.filename, 'a', max_size, backups, index=index)
+        # appending to a deque is atomic, which makes it much cheaper for the writers than a queue.Queue (the lock only
+        # keeps them from appending to it once it has been swapped by `close`, the thread would never write it)
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._wakeup, self._space = threading.Event(), threading.Event()
+        self._console_buffer, self._console_time = [], 0.
+        self._error = None
+        self.closed = False
+
+        self._thread = threading.Thread(target=self._loop, args=(self._pending,), name=f'writer-{self.filename.name}',
+                                        daemon=True)
+        self._thread.start()
+        _writers.add(self)
+
+    @property
+    def encoding(self):
+        return self._file.file.encoding
+
+    def write(self, data: str) -> int:
+        # this is called a few times per print, so it does as little as possible
+        with self._lock:
+            pending = self._pending
+            pending.append(data)
+        if len(pending) % self.batch_size == 0:  # wake up the thread once per batch
+            self._wakeup.set()
+            while len(pending) >= self.queue_size and self._thread.is_alive():
+                self._space.wait(self.interval)
+        return len(data)
+
+    def writelines(self, lines) -> None:
+        for line in lines:
+            self.write(line)
+
+    def flush(self) -> None:
+        """Waits until everything written so far is in the file (and on the console)."""
+        if self.closed:
+            return
+        done = threading.Event()
+        with self._lock:
+            self._pending.append(done)
+        self._wakeup.set()
+        done.wait()
+        self._raise()
+
+    def close(self) -> None:
+        with self._lock:  # nothing is appended to the queue after the end of the thread
+            if self.closed:
+                return
+            self.closed = True
+            pending, self._pending = self._pending, _Closed()
+            pending.append(None)
+        self._wakeup.set()
+        self._thread.join()
+        self._file.close()
+        self._raise()
+
+    def isatty(self) -> bool:
+        return False
+
+    def fileno(self) -> int:
+        return self._file.fileno()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _raise(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _loop(self, pending: deque) -> None:
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self._space.clear()
+
+            items = [pending.popleft() for _ in range(len(pending))]
+            self._space.set()
+
+            data = ''.join(item for item in items if isinstance(item, str))
+            flush = any(not isinstance(item, str) for item in items)
+            try:
+                if data:
+                    self._write(data)
+                if self._console_buffer and (flush or time.monotonic() - self._console_time >= self.console_interval):
+                    self._refresh_console()
+                if data or flush:  # at most once per batch, so that the file can be followed (e.g., tail -f)
+                    self._file.flush()
+            except Exception as e:  # reported on the next flush or close
+                self._error = e
+
+            for item in items:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if None in items:
+                return
+
+    def _write(self, data: str) -> None:
+        if self.console is not None:
+            self._console_buffer.append(data)
+        self._file.write(data)
+
+    def _refresh_console(self) -> None:
+        self.console.write(''.join(self._console_buffer))
+        self.console.flush()
+        self._console_buffer, self._console_time = [], time.monotonic()
+
+
+def _flush_standard_streams() -> None:
+    for stream in {sys.stdout, sys.stderr, sys.__stdout__, sys.__stderr__} - {None}:
+        try:
+            stream.flush()
+        except (ValueError, OSError):  # closed
+            pass
+
+
+def _drain(read: int, file: _RotatingFile, console) -> None:
+    try:
+        while True:
+            data = os.read(read, 1 << 16)
+            if not data:  # every write end of the pipe has been closed
+                break
+            file.write(data)
+            if console is not None:
+                console.write(data)
+    finally:
+        os.close(read)
+        file.close()
+        if console is not None:
+            console.close()
+
+
+@contextmanager
+def capture_fd(fd: int, filename, tee=False, max_size=None, backups=3, timeout=1., index=True):
+    """ Sends everything written to the file descriptor `fd` within the with statement to `filename` (rotated as in
+    `BackgroundWriter`), and also to its original destination if `tee`. Unlike `contextlib.redirect_stdout`, this
+    includes the output of C extensions and subprocesses. The output of subprocesses still running at the end is
+    captured for at most `timeout` seconds more. The file is indexed unless `index=False`.
+    """
+    _flush_standard_streams()
+
+    # everything is opened before redirecting `fd`, which is left untouched if any of it fails
+    file = _RotatingFile(Path(filename).absolute(), 'ab', max_size, backups, buffering=0, index=index)
+    saved = console = None
+    try:
+        saved = os.dup(fd)
+        console = open(os.dup(saved), 'wb', buffering=0) if tee else None
+        read, write = os.pipe()
+    except BaseException:
+        file.close()
+        if console is not None:
+            console.close()
+        if saved is not None:
+            os.close(saved)
+        raise
+
+    os.dup2(write, fd)
+    os.close(write)
+    thread = threading.Thread(target=_drain, args=(read, file, console), name=f'capture-{fd}', daemon=True)
+    thread.start()
+
+    try:
+        yield
+    finally:
+        _flush_standard_streams()
+        os.dup2(saved, fd)  # it closes the write end of the pipe, unless a subprocess still has it
+        os.close(saved)
+        thread.join(timeout)
+
+
+class LogReader:
+    """ Reads parts of a (possibly huge) log written by an experiment without going through all of it, by memory-mapping
+    the file and using its index (see `_RotatingFile`). Lines are returned with their line break.
+
+    Times are those of the index entries, so they are only as precise as its resolution (a second by default), and
+    without an index every search has to read the file from its beginning.
+    """
+    step_pattern = r'step\D{0,3}(\d+)'
+
+    def __init__(self, filename):
+        self.filename = Path(filename)
+        with self.filename.open('rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size > 0 else b''
+
+        entries = [e for e in _read_index(index_file(self.filename)) if e[2] <= len(self.data)]
+        self._times, self._lines, self._offsets = [list(column) for column in zip(*entries)] or ([], [], [])
+
+    def close(self) -> None:
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def lines(self, start=0, end=None):
+        """Yields the lines between the byte offsets `start` (which should be the start of a line) and `end`."""
+        end = len(self.data) if end is None else end
+        while start < end:
+            stop = self.data.find(b'\n', start, end) + 1 or end
+            yield self.data[start:stop].decode(errors='replace')
+            start = stop
+
+    def tail(self, n=10) -> list:
+        """Returns the last `n` lines."""
+        position = len(self.data) - 1 if self.data[-1:] == b'\n' else len(self.data)
+        for _ in range(n):
+            position = self.data.rfind(b'\n', 0, position)
+            if position < 0:
+                break
+        return list(self.lines(position + 1))
+
+    def line_offset(self, number: int) -> int:
+        """Byte offset of the line `number` (starting at 0)."""
+        i = bisect.bisect_right(self._lines, number) - 1
+        offset, line = (self._offsets[i], self._lines[i]) if i >= 0 else (0, 0)
+        for _ in range(number - line):
+            offset = self.data.find(b'\n', offset) + 1
+            if offset == 0:
+                return len(self.data)
+        return offset
+
+    def time_offset(self, timestamp: float, after=False) -> int:
+        """ Byte offset of the last indexed line written no later than `timestamp` (seconds since the epoch), or of the
+        first one written after it if `after`.
+        """
+        i = bisect.bisect_right(self._times, timestamp)
+        if after:
+            return self._offsets[i] if i < len(self._offsets) else len(self.data)
+        return self._offsets[i - 1] if i > 0 else 0
+
+    def between(self, start=None, end=None):
+        """Yields the lines written between the times `start` and `end` (both in seconds since the epoch)."""
+        start = 0 if start is None else self.time_offset(start)
+        end = None if end is None else self.time_offset(end, after=True)
+        return self.lines(start, end)
+
+    def step_offset(self, step: int, pattern=None) -> int:
+        """ Byte offset of the first line whose step (the number captured by the regular expression `pattern`, by
+        default lines like "step 500" or "step: 500") is at least `step`, assuming that the steps grow along the log.
+        """
+        regex = re.compile((pattern or self.step_pattern).encode())
+
+        def first_step(offset):
+            match = regex.search(self.data, offset)
+            return (int(match.group(1)), match.start()) if match else (None, len(self.data))
+
+        # binary search of the last indexed line followed by a smaller step, then look for it from there
+        low, high = 0, len(self._offsets)
+        while low < high:
+            middle = (low + high) // 2
+            value, _ = first_step(self._offsets[middle])
+            if value is not None and value < step:
+                low = middle + 1
+            else:
+                high = middle
+
+        offset = self._offsets[low - 1] if low > 0 else 0
+        while True:
+            value, position = first_step(offset)
+            if value is None or value >= step:
+                return self.data.rfind(b'\n', 0, position) + 1 if value is not None else len(self.data)
+            offset = self.data.find(b'\n', position) + 1 or len(self.data)
+
+
+def _parse_time(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+@click.command()
+@click.argument('filename', type=click.Path(exists=True, dir_okay=False))
+@click.option('--tail', '-t', type=int, help='Shows the last TAIL lines.')
+@click.option('--since', type=str, help='Shows the lines written since then (ISO format or seconds since the epoch).')
+@click.option('--until', type=str, help='Shows the lines written until then (ISO format or seconds since the epoch).')
+@click.option('--line', '-l', type=int, help='Shows the lines from the given line number (starting at 0).')
+@click.option('--step', '-s', type=int, help='Shows the lines from the first one with at least the given step.')
+@click.option('--pattern', type=str, default=LogReader.step_pattern, help='Regular expression capturing the step.')
+@click.option('--count', '-n', type=int, help='Maximum number of lines shown.')
+def main(filename, tail, since, until, line, step, pattern, count):
+    """Shows part of the log FILENAME (e.g., results/stdout.txt) without reading all of it."""
+    with LogReader(filename) as reader:
+        if tail is not None:
+            lines = reader.tail(tail)
+        elif line is not None:
+            lines = reader.lines(reader.line_offset(line))
+        elif step is not None:
+            lines = reader.lines(reader.step_offset(step, pattern))
+        else:
+            lines = reader.between(None if since is None else _parse_time(since),
+                                   None if until is None else _parse_time(until))
+
+        for text in itertools.islice(lines, count):
+            sys.stdout.write(text)
+
+
+@atexit.register
+def _close_writers() -> None:
+    for writer in list(_writers):
+        try:
+            writer.close()
+        except Exception as e:
+            print(f'Could not close {writer.filename}: {e}', file=sys.__stderr__)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,264 @@
+""" SQLite database with a record per run of `experiment_wrapper` (see `GlobalOptions.registry_file`, set it to `False`
+to disable it), so that finding runs does not require reading every output directory:
+
+    from mlsuite.experiments.registry import Registry
+    failed = Registry().runs(status='failed', git_hash='1a2b3c4', since='2024-01-01')
+"""
+import os
+import sys
+import time
+import uuid
+import socket
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from datetime import datetime
+from contextlib import contextmanager, closing
+
+from mlsuite.options import GlobalOptions
+from mlsuite.experiments.concurrent import workdir
+
+COLUMNS = ['run_id', 'output_dir', 'status', 'config_hash', 'timestamp', 'git_hash', 'started', 'finished', 'duration',
+           'exception', 'host', 'pid']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    output_dir TEXT NOT NULL,
+    status TEXT NOT NULL,  -- running, finished, failed or interrupted
+    config_hash TEXT,  -- content hash of the arguments without the options, as the run started
+    timestamp TEXT,
+    git_hash TEXT,
+    started REAL,  -- seconds since the epoch
+    finished REAL,
+    duration REAL,
+    exception TEXT,
+    host TEXT,
+    pid INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_output_dir ON runs (output_dir);
+CREATE INDEX IF NOT EXISTS runs_config_hash ON runs (config_hash);
+CREATE INDEX IF NOT EXISTS runs_status ON runs (status, started);
+CREATE INDEX IF NOT EXISTS runs_started ON runs (started);
+"""
+
+_registries = {}  # (process, path) -> registry, since neither connections nor threads survive a fork
+_registries_lock = threading.Lock()
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    connection = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+    connection.execute('PRAGMA journal_mode=WAL')  # readers and writers of different runs do not block each other
+    connection.execute('PRAGMA synchronous=NORMAL')
+    connection.row_factory = sqlite3.Row
+    return connection
+
+
+class Registry:
+    """ Registry of the runs stored in the SQLite database `path`. Writes are queued and committed in batches by a
+    background thread every `interval` seconds, `flush` waits until the ones done so far are committed.
+    """
+    interval = 0.5
+
+    def __init__(self, path=None):
+        self.path = Path(path or GlobalOptions.registry_file.value()).expanduser().absolute()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(_connect(self.path)) as connection:
+            connection.executescript(_SCHEMA)
+
+        self._pending, self._lock = [], threading.Lock()
+        self._wakeup, self._error = threading.Event(), None
+        self._thread = None
+
+    def start(self, output_dir, **fields) -> str:
+        """Registers a new run writing to `output_dir`, and returns its id."""
+        run_id = uuid.uuid4().hex
+        fields = {'run_id': run_id, 'output_dir': str(Path(output_dir).absolute()), 'status': 'running',
+                  'started': time.time(), 'host': socket.gethostname(), 'pid': os.getpid(), **fields}
+        self._queue(f'INSERT INTO runs ({", ".join(fields)}) VALUES ({", ".join("?" * len(fields))})',
+                    list(fields.values()))
+        return run_id
+
+    def finish(self, run_id: str, status='finished', **fields) -> None:
+        """Updates the run `run_id` once it is over with `status` and any other column in `fields`."""
+        fields = {'status': status, 'finished': time.time(), **fields}
+        self._queue(f'UPDATE runs SET {", ".join(f"{k} = ?" for k in fields)}, duration = ? - started '
+                    f'WHERE run_id = ?', [*fields.values(), fields['finished'], run_id])
+
+    def flush(self) -> None:
+        done = threading.Event()
+        self._queue(None, done)
+        done.wait()
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _queue(self, statement, parameters) -> None:
+        with self._lock:
+            self._pending.append((statement, parameters))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name='registry', daemon=True)
+                self._thread.start()
+        if statement is None:
+            self._wakeup.set()
+
+    def _loop(self) -> None:
+        connection = _connect(self.path)
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                continue
+
+            try:  # a single transaction for all of them
+                with connection:
+                    connection.execute('BEGIN IMMEDIATE')
+                    for statement, parameters in batch:
+                        if statement is not None:
+                            connection.execute(statement, parameters)
+            except sqlite3.Error as e:  # reported on the next flush
+                self._error = e
+
+            for statement, done in batch:
+                if statement is None:
+                    done.set()
+
+    def runs(self, since=None, until=None, order='started', limit=None, **filters) -> list:
+        """ Returns the runs (as dictionaries) whose columns are equal to (or in, if a list is given) the `filters`,
+        started between `since` and `until` (seconds since the epoch or ISO dates), sorted by `order` (prefix it with
+        `-` for descending order) and at most `limit` of them.
+        """
+        query, parameters = self._where(since, until, filters)
+        descending = order.startswith('-')
+        assert order.lstrip('-') in COLUMNS, f'Unknown column {order}.'
+        query = f'SELECT * FROM runs{query} ORDER BY {order.lstrip("-")} {"DESC" if descending else "ASC"}'
+        if limit is not None:
+            query, parameters = f'{query} LIMIT ?', [*parameters, limit]
+
+        with closing(_connect(self.path)) as connection:
+            return [dict(row) for row in connection.execute(query, parameters)]
+
+    def count(self, since=None, until=None, **filters) -> int:
+        """Number of runs matching the filters, see `runs`."""
+        query, parameters = self._where(since, until, filters)
+        with closing(_connect(self.path)) as connection:
+            return connection.execute(f'SELECT COUNT(*) FROM runs{query}', parameters).fetchone()[0]
+
+    def latest(self, output_dir):
+        """Last run that wrote to `output_dir`, if any."""
+        runs = self.runs(output_dir=str(Path(output_dir).absolute()), order='-started', limit=1)
+        return runs[0] if runs else None
+
+    def finished(self, config_hash: str, git_hash: str):
+        """Last run that finished successfully with the same configuration and revision, and whose folder still exists."""
+        for run in self.runs(config_hash=config_hash, git_hash=git_hash, status='finished', order='-started'):
+            if Path(run['output_dir']).is_dir():
+                return run
+        return None
+
+    @staticmethod
+    def _where(since, until, filters) -> tuple:
+        conditions, parameters = [], []
+        for column, value in filters.items():
+            assert column in COLUMNS, f'Unknown column {column}.'
+            if isinstance(value, (list, tuple, set)):
+                conditions.append(f'{column} IN ({", ".join("?" * len(value))})')
+                parameters.extend(value)
+            elif value is None:
+                conditions.append(f'{column} IS NULL')
+            else:
+                conditions.append(f'{column} = ?')
+                parameters.append(value)
+        for column, operator, value in [('started', '>=', since), ('started', '<=', until)]:
+            if value is not None:
+                conditions.append(f'{column} {operator} ?')
+                parameters.append(_epoch(value))
+        return (f' WHERE {" AND ".join(conditions)}' if conditions else ''), parameters
+
+
+def _epoch(value) -> float:
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).timestamp()
+    return float(value)
+
+
+def get_registry():
+    """Registry of this process in `GlobalOptions.registry_file`, or None if it is disabled."""
+    path = GlobalOptions.registry_file.value()
+    if not path:
+        return None
+
+    key = (os.getpid(), str(path))
+    with _registries_lock:
+        if key not in _registries:
+            _registries[key] = Registry(path)
+        return _registries[key]
+
+
+def config_hash(arguments) -> str:
+    """Hash of the (resolved) configuration of a run, without its options."""
+    return arguments.content_hash(exclude=('options', 'exception_thrown', 'pwd'))
+
+
+def start_hash(arguments) -> str:
+    """ Key of a run that has not started yet to reuse the finished ones: its `config_hash` (resolving `${pwd}` to the
+    working directory, see `workdir`) together with its experiment (`options.experiment`), since different experiments
+    with the same configuration are not interchangeable.
+    """
+    if 'pwd' in arguments:
+        digest = config_hash(arguments)
+    else:
+        arguments.update(pwd=str(workdir()))
+        try:
+            digest = config_hash(arguments)
+        finally:
+            arguments.pop('pwd')
+
+    experiment = arguments.options.get('experiment')
+    if experiment is None:
+        return digest
+    return hashlib.blake2b(f'{experiment}\0{digest}'.encode(), digest_size=len(digest) // 2).hexdigest()
+
+
+@contextmanager
+def registered(arguments):
+    """ Registers the run of the experiment with `arguments` within the with statement (if the registry is enabled).
+
+    The hash of its configuration is computed once it ends, so that includes and arrays are not loaded just for it,
+    unless the run might be reused (see `experiment_wrapper`), which needs the one it had when it started.
+    """
+    try:
+        registry = get_registry()
+        fields = {'timestamp': str(arguments.options.timestamp)}
+        if registry is not None and (arguments.options.reuse or arguments.options.content_addressed):
+            fields['config_hash'] = start_hash(arguments)
+        run_id = registry.start(str(arguments.options.output_dir), **fields) if registry is not None else None
+    except (OSError, sqlite3.Error) as e:  # the experiment can run without it
+        print(f'Could not register the run: {e}', file=sys.__stderr__)
+        registry = None
+
+    status = 'interrupted'
+    try:
+        yield
+        status = 'finished'
+    except Exception:
+        status = 'failed'
+        raise
+    finally:
+        if registry is not None:
+            try:
+                exception = arguments.get('exception_thrown')
+                fields = {'git_hash': str(arguments.options.git_hash),
+                          'exception': None if exception is None else str(exception).strip('"')}
+                if not (arguments.options.reuse or arguments.options.content_addressed):
+                    try:
+                        fields['config_hash'] = config_hash(arguments)
+                    except Exception as e:  # e.g., placeholders that cannot be resolved anymore
+                        print(f'Could not hash the configuration of the run: {e}', file=sys.__stderr__)
+                registry.finish(run_id, status, **fields)
+                registry.flush()
+            except Exception as e:  # it must not hide the result of the experiment
+                print(f'Could not register the run: {e}', file=sys.__stderr__)
@@ -0,0 +1,119 @@
+""" Sweeps run the same experiment over many configurations. They are described in a YAML file such as:
+
+    grid:  # every combination of the values
+      model.optimizer.lr: [0.1, 0.01]
+      seed: [1, 2, 3]
+    zip:  # the lists are traversed together, so they must have the same length
+      model.layers: [2, 4]
+      model.hidden: [128, 64]
+    random:  # `samples` independent draws of the axes
+      samples: 10
+      seed: 0
+      axes:
+        model.dropout: {uniform: [0.0, 0.5]}
+        model.optimizer.momentum: {loguniform: [0.5, 0.99]}
+        model.activation: {choice: [relu, tanh]}
+        model.heads: {randint: [1, 8]}
+
+The points of the sweep are the product of the three blocks (any of them can be omitted), and each of them overrides
+the given keys (dotted paths) of the configuration.
+"""
+import os
+import sys
+import math
+import random
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import yaml
+
+from mlsuite.experiments.arguments import ArgumentsHeader
+from mlsuite.experiments.yaml_handlers import read_yaml
+
+_sweeps = {}  # id -> runs of the sweep, set before the workers are forked so that they do not need to be pickled
+
+
+def _sample(rng: random.Random, axis):
+    if isinstance(axis, list):
+        return rng.choice(axis)
+
+    assert isinstance(axis, dict) and len(axis) == 1, f'Invalid random axis: {axis}.'
+    (distribution, values), = axis.items()
+    if distribution == 'choice':
+        return rng.choice(values)
+    if distribution == 'uniform':
+        return rng.uniform(*values)
+    if distribution == 'loguniform':
+        return math.exp(rng.uniform(math.log(values[0]), math.log(values[1])))
+    if distribution == 'randint':
+        return rng.randint(*values)
+    raise ValueError(f'Unknown distribution "{distribution}".')
+
+
+def expand_sweep(spec: dict) -> list:
+    """Returns the list of points of the sweep described by `spec`, each one a dictionary {dotted path: value}."""
+    unknown = set(spec.keys()) - {'grid', 'zip', 'random'}
+    assert len(unknown) == 0, f'Unknown sweep blocks: {unknown}.'
+
+    grid = spec.get('grid') or {}
+    grid = [dict(zip(grid.keys(), values)) for values in itertools.product(*grid.values())]
+
+    zipped = spec.get('zip') or {}
+    assert len({len(values) for values in zipped.values()}) <= 1, 'All the zipped axes must have the same length.'
+    zipped = [dict(zip(zipped.keys(), values)) for values in zip(*zipped.values())] if zipped else [{}]
+
+    sampled = [{}]
+    if spec.get('random'):
+        rng = random.Random(spec['random'].get('seed'))
+        axes = spec['random'].get('axes', {})
+        sampled = [{k: _sample(rng, axis) for k, axis in axes.items()} for _ in range(spec['random'].get('samples', 1))]
+
+    return [{**a, **b, **c} for a, b, c in itertools.product(grid, zipped, sampled)]
+
+
+def _run_point(key, index) -> None:
+    cwd = os.getcwd()
+    try:
+        _sweeps[key][index]()
+    finally:
+        os.chdir(cwd)  # the worker is reused by other runs
+
+
+def run_sweep(run, arguments: ArgumentsHeader) -> None:
+    """ Runs `run(arguments)` once per point of the sweep in `arguments.options.sweep`, using up to `options.jobs`
+    processes. Each run has its own `output_dir` inside the original one (where the file `sweep.yml` lists the runs) and
+    writes its output there instead of the terminal.
+    """
+    points = expand_sweep(read_yaml(arguments.options.sweep))
+    output_dir, width = str(arguments.options.output_dir), len(str(len(points) - 1))
+
+    runs, summary = [], []
+    for i, overrides in enumerate(points):
+        run_arguments = ArgumentsHeader(arguments)
+        run_arguments.set_paths(overrides)
+        run_arguments.options.update(output_dir=os.path.join(output_dir, f'{i:0{width}d}'), sweep=None, verbose=False)
+
+        runs.append(lambda run_arguments=run_arguments: run(run_arguments))
+        summary.append({'output_dir': str(run_arguments.options.output_dir), 'overrides': overrides})
+
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, 'sweep.yml'), 'w') as file:
+        yaml.safe_dump({'sweep': str(arguments.options.sweep), 'runs': summary}, file)
+
+    key, failed = id(runs), 0
+    _sweeps[key] = runs
+    try:
+        with ProcessPoolExecutor(max_workers=int(arguments.options.jobs),
+                                 mp_context=multiprocessing.get_context('fork')) as pool:
+            futures = {pool.submit(_run_point, key, i): i for i in range(len(runs))}
+            for completed, future in enumerate(as_completed(futures), 1):
+                exc = future.exception()
+                failed += exc is not None
+                status = 'done' if exc is None else f'failed ({type(exc).__name__}: {exc})'
+                print(f'[{completed}/{len(runs)}] {summary[futures[future]]["output_dir"]} {status}', file=sys.stderr)
+    finally:
+        del _sweeps[key]
+
+    if failed > 0:
+        raise RuntimeError(f'{failed} out of {len(runs)} runs of the sweep failed.')
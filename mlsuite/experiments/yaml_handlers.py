@@ -1,26 +1,206 @@
+import os
+import sys
+import pickle
+import hashlib
+import tempfile
 from pathlib import Path
 from functools import wraps
+from collections import OrderedDict
+from contextvars import ContextVar
 
 import yaml
 import click
 from yaml.representer import SafeRepresenter
 
-from mlsuite.experiments.arguments import LazyString, Arguments
+from mlsuite.options import GlobalOptions
+from mlsuite.experiments.arguments import LazyString, Arguments, Deferred
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML without libyaml
+    from yaml import SafeLoader
 
 yaml.add_representer(LazyString, SafeRepresenter.represent_str, yaml.SafeDumper)
 
+_parsed = OrderedDict()  # (path, mtime, size) -> pickled content of the last files read by this process
+_PARSED_ITEMS = 256
+_parsing = ContextVar('parsing')  # folder of the file being parsed, relative includes are relative to it
+
+
+class FileReference(Deferred):
+    """Value of a YAML tag of the form `!tag path`, where the path is relative to the file containing it."""
+    tag = None
+
+    def __init__(self, path):
+        self.path = path
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.path == other.path
+
+    def __hash__(self):
+        return hash(self.path)
+
+    def __repr__(self):
+        return f'{self.tag} {self.path}'
+
+    @classmethod
+    def constructor(cls, loader, node):
+        path = Path(loader.construct_scalar(node)).expanduser()
+        return cls(str(_parsing.get(Path.cwd()) / path))
+
+    @classmethod
+    def representer(cls, dumper, data):
+        return dumper.represent_scalar(cls.tag, data.path)
+
+
+class Include(FileReference):
+    """Value of a `!include path` tag, the content of the file is only read once the key is accessed."""
+    tag = '!include'
+
+    def load(self):
+        return read_yaml(self.path)
+
+
+class NpyArray(FileReference):
+    """Value of a `!npy path` tag, a NumPy array memory-mapped from the file once the key is accessed."""
+    tag = '!npy'
+
+    def load(self):
+        import numpy
+        return numpy.load(self.path, mmap_mode='r')
+
+
+class _Loader(SafeLoader):
+    """Safe loader with the tags above, so that `yaml.safe_load` is left untouched for the rest of the program."""
+
+
+for _reference in [Include, NpyArray]:
+    _Loader.add_constructor(_reference.tag, _reference.constructor)
+    yaml.add_representer(_reference, _reference.representer, yaml.SafeDumper)
+
+
+def read_yaml(path, cache=True):
+    """ Safely reads a YAML file and returns its content as a dictionary.
 
-def read_yaml(path):
-    """Safely reads a YAML file and returns its content as a dictionary."""
+    Unless `cache=False`, the parsed content is cached in memory and on disk (in `GlobalOptions.yaml_cache_dir`, set it
+    to `False` to disable it) keyed by the path, modification time and size of the file, so that unchanged files are
+    never parsed twice. The least recently used files are dropped beyond `GlobalOptions.yaml_cache_size` bytes on disk.
+    """
     path = Path(path)
     if not path.exists():
         raise FileExistsError(f'{path} doesn\'t exist.')
     if not path.is_file():
         raise FileExistsError(f'{path} is a directory, not a file.')
 
-    with path.open('r') as file:
-        content = yaml.safe_load(file)
-        return content if content is not None else {}
+    if not cache:
+        return _parse_yaml(path)
+
+    stat = path.stat()
+    key = (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+    if key not in _parsed:
+        data = _read_cache(key)
+        if data is None:
+            data = pickle.dumps(_parse_yaml(path), protocol=pickle.HIGHEST_PROTOCOL)
+            _write_cache(key, data)
+        _parsed[key] = data
+        while len(_parsed) > _PARSED_ITEMS:
+            _parsed.popitem(last=False)
+    _parsed.move_to_end(key)
+
+    return pickle.loads(_parsed[key])  # always a new copy, callers are free to modify it
+
+
+def _parse_yaml(path: Path):
+    token = _parsing.set(path.parent.resolve())
+    try:
+        with path.open('r') as file:
+            content = yaml.load(file, Loader=_Loader)
+            return content if content is not None else {}
+    finally:
+        _parsing.reset(token)
+
+
+def _cache_file(key: tuple):
+    folder = GlobalOptions.yaml_cache_dir.value()
+    if not folder:
+        return None
+    return Path(folder) / f'{hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()}.pickle'
+
+
+def _read_cache(key: tuple):
+    filename = _cache_file(key)
+    try:
+        if filename is None:
+            return None
+        data = filename.read_bytes()
+        os.utime(filename)  # the least recently used ones are removed first, see `_evict_cache`
+        return data
+    except OSError:
+        return None
+
+
+def _write_cache(key: tuple, data: bytes) -> None:
+    filename = _cache_file(key)
+    if filename is None:
+        return
+
+    try:  # written to a temporary file first, so that concurrent readers never see it half-written
+        filename.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=filename.parent, delete=False) as file:
+            file.write(data)
+        os.replace(file.name, filename)
+        _evict_cache(filename.parent, keep=filename.name)
+    except OSError:
+        pass
+
+
+def _evict_cache(folder: Path, keep: str) -> None:
+    """Removes the least recently used files of the cache (except `keep`) until it fits in `yaml_cache_size` bytes."""
+    max_size = GlobalOptions.yaml_cache_size.value()
+    if max_size is None:
+        return
+
+    with os.scandir(folder) as scanned:
+        entries = sorted((entry.stat().st_mtime_ns, entry.stat().st_size, entry.path) for entry in scanned
+                         if entry.name.endswith('.pickle'))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in entries:
+        if total <= max_size:
+            break
+        if os.path.basename(path) != keep:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:  # removed by another process
+                pass
+            total -= size
+
+
+def store_arrays(content: dict, folder='arrays', root='.') -> dict:
+    """ Returns a copy of `content` (as returned by `Arguments.to_dict`) where the NumPy arrays have been saved as
+    `folder/<dotted.key>.npy` and replaced by `!npy` references, instead of being written inline in YAML files. The
+    references are relative to `root`, which should be the folder of the YAML file.
+    """
+    numpy = sys.modules.get('numpy')
+    if numpy is None:  # no one could have created an array
+        return content
+
+    def store(value, path):
+        if isinstance(value, dict):
+            return {k: store(v, f'{path}.{k}' if path else str(k)) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return type(value)(store(v, f'{path}.{i}') for i, v in enumerate(value))
+        if isinstance(value, numpy.ndarray):
+            reference = Path(folder, f'{path}.npy')
+            filename = Path(root, reference)
+            # memory maps of the very same file are the result of re-running in the same folder
+            if not isinstance(value, numpy.memmap) or value.filename is None or \
+                    Path(value.filename).resolve() != filename.resolve():
+                filename.parent.mkdir(parents=True, exist_ok=True)
+                numpy.save(filename, value)
+            return NpyArray(str(reference))
+        return value
+
+    return store(content, '')
 
 
 def read_yaml_click(ctx, param, value):
@@ -1,6 +1,22 @@
-from .failsafe import FailSafe, GlobalOptions
-from .wrapper import FailSafeWrapper, failsafe_result, execute_once, failsafe_object
-from . import signals
+from mlsuite._lazy import lazy_exports
+
+_getattr, __dir__ = lazy_exports(__name__, {
+    'FailSafe': '.failsafe',
+    'GlobalOptions': '.failsafe',
+    'FailSafeWrapper': '.wrapper',
+    'failsafe_result': '.wrapper',
+    'execute_once': '.wrapper',
+    'failsafe_object': '.wrapper',
+    'snapshot': '.snapshots',
+    'memoize': '.memo',
+}, submodules=['signals'])
+
+
+def __getattr__(name):
+    value = _getattr(name)
+    from . import signals  # the exit and signal hooks are installed once the failsafe utilities are used
+    return value
+
 
 # __all__ = ['FailSafe', 'GlobalOptions', 'FailSafeWrapper', 'failsafe_result', 'execute_once', 'failsafe_object']
-# TODO It needs to be checked/reimplemented before further use.
\ No newline at end of file
+# TODO It needs to be checked/reimplemented before further use.
@@ -0,0 +1,267 @@
+""" Chunked, content-addressed checkpoints, used by the `chunked` serializer (see `mlsuite.failsafe.serializers`).
+
+The state of the object (`__getstate__`) is saved attribute by attribute: the pickle stream of each attribute and its
+out-of-band buffers, split in chunks of `chunk_size` bytes, are stored in the folder `.<name>.chunks` next to the
+checkpoint and named after the SHA-256 of their content, so that saving again only writes the chunks that changed. The
+checkpoint itself is a small JSON manifest listing them, which is replaced atomically on each save. If some attributes
+share objects (e.g., the parameters of a model and of its optimizer), the whole object is pickled at once instead, so
+that they are still shared once loaded (its buffers are still chunked).
+
+The last `keep_last` manifests are kept (the older ones as `<name>.1`, `<name>.2`...) as long as all their chunks fit in
+`max_size` bytes (the latest one is always kept), and the chunks that none of them uses are deleted (unless another save
+in the same folder is in progress, in another thread or process).
+
+Restoring can be lazy: the attributes with at least `lazy_size` bytes of buffers are loaded as `LazyValue`s, which only
+read their chunks once loaded (e.g., when FailSafe objects access the attribute), and which are saved again without
+being loaded if they are still in the same folder.
+"""
+import os
+import sys
+import json
+import mmap
+import fcntl
+import types
+import pickle
+import shutil
+import hashlib
+from pathlib import Path
+from contextlib import contextmanager
+
+import dill
+
+from .serializers import atomic_write, dumps, loads, empty
+
+
+def chunk_folder(path) -> Path:
+    path = Path(path)
+    return path.parent / f'.{path.name}.chunks'
+
+
+def history(path) -> list:
+    """Manifests of the checkpoint `path` that still exist, from the latest to the oldest."""
+    path = Path(path)
+    older = [(int(f.name[len(path.name) + 1:]), f) for f in path.parent.glob(f'{path.name}.*')
+             if f.name[len(path.name) + 1:].isdigit()]
+    return ([path] if path.exists() else []) + [f for _, f in sorted(older)]
+
+
+def remove(path) -> None:
+    """Removes the checkpoint `path` together with its older manifests and all its chunks."""
+    for manifest in history(path):
+        manifest.unlink()
+    shutil.rmtree(chunk_folder(path), ignore_errors=True)
+
+
+class ChunkedCheckpoints(object):
+    """Saves and loads checkpoints split in chunks, keeping at most `keep_last` of them within `max_size` bytes."""
+    def __init__(self, chunk_size=4 << 20, keep_last=3, max_size=None, lazy_size=1 << 20):
+        assert chunk_size > 0, 'The chunks cannot be empty.'
+        assert keep_last > 0, 'At least the last checkpoint has to be kept.'
+        self.chunk_size = chunk_size
+        self.keep_last = keep_last
+        self.max_size = max_size
+        self.lazy_size = lazy_size
+
+    def dump(self, obj, path) -> None:
+        path = Path(path)
+        folder = chunk_folder(path)
+        folder.mkdir(parents=True, exist_ok=True)
+
+        with _locked(folder, fcntl.LOCK_SH):  # the chunks of this save are not collected until its manifest is written
+            stored = set(os.listdir(folder))
+            manifest = {'chunked': 1, 'folder': folder.name, 'class': None}  # the folder is shared with the older ones
+            state = obj.__getstate__()
+            dumped = _dump_attributes(state, folder) if isinstance(state, dict) else None
+            if dumped is None:  # no attributes to split it by, or they share objects
+                dumped = {'': dumps(obj)}
+            else:
+                manifest['class'] = self._store(folder, stored, dill.dumps(type(obj)))
+
+            manifest['attributes'] = {name: self._store_value(folder, stored, value) for name, value in dumped.items()}
+
+            self._rotate(path)
+            with atomic_write(path) as file:
+                file.write(json.dumps(manifest).encode())
+        self.collect(path)
+
+    def _store_value(self, folder: Path, stored: set, value) -> dict:
+        if isinstance(value, LazyValue):  # its chunks are already there
+            return value.entry
+
+        data, codec, buffers = value
+        return {
+            'codec': codec,
+            'stream': self._store(folder, stored, data),
+            'buffers': [[self._store(folder, stored, buffer[i:i + self.chunk_size])
+                         for i in range(0, buffer.nbytes, self.chunk_size)] for buffer in buffers],
+        }
+
+    @staticmethod
+    def _store(folder: Path, stored: set, data) -> list:
+        """Writes a chunk (unless it already exists), and returns its name and size."""
+        name = hashlib.sha256(data).hexdigest()
+        if name not in stored:
+            with atomic_write(folder / name) as file:
+                file.write(data)
+            stored.add(name)
+        return [name, len(data)]
+
+    def _rotate(self, path: Path) -> None:
+        """Moves the current manifest (if any) to `<name>.1`, and the older ones one position further."""
+        if self.keep_last == 1 or not path.exists():
+            return
+
+        for i in range(self.keep_last - 1, 1, -1):
+            older = path.with_name(f'{path.name}.{i - 1}')
+            if older.exists():
+                os.replace(older, path.with_name(f'{path.name}.{i}'))
+        with atomic_write(path.with_name(f'{path.name}.1')) as file:  # copied, so that `path` always exists
+            file.write(path.read_bytes())
+
+    def collect(self, path) -> None:
+        """ Removes the manifests of `path` beyond `keep_last` or `max_size` (except the latest one), and the chunks that
+        the rest of them do not use.
+        """
+        manifests = history(path)
+        for manifest in manifests[self.keep_last:]:
+            manifest.unlink()
+        manifests = manifests[:self.keep_last]
+
+        chunks = [dict(_chunks(json.loads(manifest.read_bytes()))) for manifest in manifests]
+        if self.max_size is not None:
+            while len(manifests) > 1 and sum({k: v for c in chunks for k, v in c.items()}.values()) > self.max_size:
+                manifests.pop().unlink()
+                chunks.pop()
+
+        used = set().union(*chunks)
+        try:
+            with _locked(chunk_folder(path), fcntl.LOCK_EX | fcntl.LOCK_NB), os.scandir(chunk_folder(path)) as entries:
+                for entry in entries:
+                    if entry.name not in used:  # including temporary files left by interrupted saves
+                        os.unlink(entry.path)
+        except BlockingIOError:  # another save is in progress, its chunks (and temporary files) are not used yet
+            pass
+
+    def load(self, path, mmap_mode=False, lazy=False):
+        """ Loads the checkpoint `path`. With `mmap_mode=True` the buffers that fit in a single chunk are copy-on-write
+        memory maps of it instead of being read. With `lazy=True` the attributes with at least `lazy_size` bytes of
+        buffers are `LazyValue`s instead.
+        """
+        manifest = json.loads(Path(path).read_bytes())
+        folder = Path(path).parent / manifest['folder']
+        if manifest['class'] is None:
+            return _load_value(folder, manifest['attributes'][''], mmap_mode)
+
+        state = {}
+        for name, entry in manifest['attributes'].items():
+            if lazy and sum(size for chunks in entry['buffers'] for _, size in chunks) >= self.lazy_size:
+                state[name] = LazyValue(folder, entry, mmap_mode)
+            else:
+                state[name] = _load_value(folder, entry, mmap_mode)
+
+        cls = dill.loads(_read(folder, manifest['class']))
+        obj = cls.__new__(cls)
+        if hasattr(obj, '__setstate__'):
+            obj.__setstate__(state)
+        else:
+            obj.__dict__.update(state)
+        return obj
+
+
+class LazyValue(object):
+    """Attribute of a checkpoint that is not read until `load` is called, pickled as its value."""
+    __slots__ = ('folder', 'entry', 'mmap_mode')
+
+    def __init__(self, folder: Path, entry: dict, mmap_mode=False):
+        self.folder = folder
+        self.entry = entry
+        self.mmap_mode = mmap_mode
+
+    def load(self):
+        return _load_value(self.folder, self.entry, self.mmap_mode)
+
+    def __reduce__(self):
+        return _value, (self.load(),)
+
+    def __repr__(self):
+        return f'LazyValue({self.entry["stream"][0]})'
+
+
+def _value(value):
+    return value
+
+
+@contextmanager
+def _locked(folder: Path, operation: int):
+    """Locks the chunk folder `folder` (`flock` on the folder itself, released when the with statement ends)."""
+    fd = os.open(folder, os.O_RDONLY)
+    try:
+        fcntl.flock(fd, operation)
+        yield
+    finally:
+        os.close(fd)
+
+
+_IMMUTABLE = (str, bytes, int, float, complex, bool, tuple, frozenset, range, type, types.FunctionType,
+              types.BuiltinFunctionType, types.ModuleType, pickle.PickleBuffer)
+
+
+def _mutable(obj) -> bool:
+    """Whether it matters that `obj` is shared, i.e., whether it could be modified through one of its references."""
+    numpy = sys.modules.get('numpy')
+    return not isinstance(obj, _IMMUTABLE) and not (numpy is not None and isinstance(obj, numpy.dtype))
+
+
+def _dump_attributes(state: dict, folder: Path):
+    """ Pickles each attribute of `state` on its own (see `dumps`), or returns None if some of them share objects, which
+    would be copies of each other once loaded.
+    """
+    dumped, pickled = {}, {}  # the objects pickled so far, by id (kept alive, so that their ids are not reused)
+    for name, value in state.items():
+        if isinstance(value, LazyValue) and value.folder == folder:  # saved again without being loaded
+            dumped[name] = value
+            continue
+
+        memo = {}
+        dumped[name] = dumps(value, memo)
+        if any(key in pickled and _mutable(obj) for key, obj in memo.items()):
+            return None
+        pickled.update(memo)
+    return dumped
+
+
+def _load_value(folder: Path, entry: dict, mmap_mode: bool):
+    buffers = []
+    for chunks in entry['buffers']:
+        if mmap_mode and len(chunks) == 1:
+            with open(folder / chunks[0][0], 'rb') as file:
+                buffers.append(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY))
+            continue
+
+        buffer, offset = empty(sum(size for _, size in chunks)), 0
+        view = memoryview(buffer).cast('B')
+        for name, size in chunks:
+            with open(folder / name, 'rb') as file:
+                if file.readinto(view[offset:offset + size]) != size:
+                    raise EOFError(f'The chunk {name} is truncated.')
+            offset += size
+        buffers.append(buffer)
+
+    return loads(_read(folder, entry['stream']), entry['codec'], buffers)
+
+
+def _read(folder: Path, chunk: list) -> bytes:
+    return (folder / chunk[0]).read_bytes()
+
+
+def _chunks(manifest: dict):
+    """Yields the name and size of every chunk used by a manifest."""
+    if manifest['class'] is not None:
+        yield manifest['class']
+    for entry in manifest['attributes'].values():
+        yield entry['stream']
+        for chunks in entry['buffers']:
+            yield from chunks
+
+
+checkpoints = ChunkedCheckpoints()  # used by the `chunked` serializer
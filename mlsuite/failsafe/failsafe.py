@@ -1,16 +1,16 @@
 from pathlib import Path
+import os
 import sys
 import inspect
-import dill
 import atexit
 from functools import partial, wraps, partialmethod
 from typing import Callable
 
-from mlsuite.options import Options
-from mlsuite.directories import Directories
-from mlsuite import directories as dirs
+from mlsuite.options import Options, _CACHE_DIR
+from . import serializers, checkpoints, snapshots
 
-# TODO check *args, **kwargs on calls to load or not (safe hash of the parameters)
+# TODO check *args, **kwargs on calls to load or not (safe hash of the parameters, as mlsuite.failsafe.memo does for
+#  the results of functions)
 
 
 class GlobalOptions(metaclass=Options):
@@ -18,7 +18,14 @@ class GlobalOptions(metaclass=Options):
     _opt_load_on_init = True
     _opt_save_on_del = True
     _opt_remove_on_completion = False
-    _opt_failsafe_folder = dirs
+    _opt_failsafe_folder = '.'  # the output folder, for experiments
+    _opt_serializer = 'pickle5'  # see mlsuite.failsafe.serializers
+    _opt_snapshot_interval = None  # seconds between snapshots of all the objects, see mlsuite.failsafe.snapshots
+    _opt_snapshot_mode = 'thread'
+    _opt_lazy_restore = False  # memory-map the loaded buffers, and load the large attributes (chunked) once accessed
+    _opt_memo_dir = os.path.join(_CACHE_DIR, 'memo')  # results of functions, see mlsuite.failsafe.memo
+    _opt_memo_max_size = 10 << 30  # bytes
+    _opt_memo_memory_items = 16
 
 
 # Default functions
@@ -27,18 +34,18 @@ def default_remove(path):
     path = Path(path)
     if path.exists() and path.is_file():
         path.unlink()
+    checkpoints.remove(path)  # the older manifests and chunks of the chunked serializer, if any
 
 
 def default_save(self, path):
-    with open(path, 'wb') as file:
-        dill.dump(self, file)
+    serializers.dump(self, path, self.serializer.value())
 
 
 def default_load(path):
     path = Path(path)
     if path.exists():
-        with path.open('rb') as file:
-            return dill.load(file)
+        lazy = GlobalOptions.lazy_restore.value()
+        return serializers.load(path, GlobalOptions.serializer.value(), mmap_mode=lazy, lazy=lazy)
     else:
         return None
 
@@ -54,15 +61,20 @@ def default_getstate(self):
 
 
 def default_setstate(self, state):
-    self.__dict__.udpdate(state)
+    self.__dict__.update(state)
 
 
 def failsafe_getstate(getstate):
     @wraps(getstate)
     def failsafe_getstate_(self):
         state = getstate(self)
+        if '_lazy' in state:  # the attributes not accessed since they were restored, saved again without loading them
+            state = {**{k: v for k, v in state.items() if k != '_lazy'}, **state['_lazy']}
+        if '_atexit' in state:  # it refers to the object itself, set again once it is loaded (see init_or_load)
+            state = {k: v for k, v in state.items() if k != '_atexit'}
         state.update({'_oid': self._oid})
         return state
+    failsafe_getstate_.failsafe = True
     return failsafe_getstate_
 
 
@@ -70,7 +82,11 @@ def failsafe_setstate(setstate):
     @wraps(setstate)
     def failsafe_setstate_(self, state):
         self._oid = state.pop('_oid')
-        setstate(self, state)
+        lazy = {k: v for k, v in state.items() if isinstance(v, checkpoints.LazyValue)}
+        setstate(self, {k: v for k, v in state.items() if k not in lazy} if lazy else state)
+        if lazy:  # loaded by Guardian.__getattr__ once accessed
+            object.__setattr__(self, '_lazy', lazy)
+    failsafe_setstate_.failsafe = True
     return failsafe_setstate_
 
 
@@ -87,16 +103,19 @@ class FailSafe(Options):
 
         @staticmethod
         def _atexit_template(self) -> None:
-            if sys.exit_code == 0 and self.remove_on_completion.value() and self.save_on_del.value():
+            snapshots.stop()  # none of them can overwrite this save afterwards
+            snapshots.untrack(self)
+
+            # the exit code is only known once mlsuite.failsafe.signals is imported
+            if getattr(sys, 'exit_code', None) == 0 and self.remove_on_completion.value() and self.save_on_del.value():
                 self.remove(self.__path__)
                 self.save_on_del.value(False)
 
             if self.save_on_del.value():
                 try:
                     self.save(self.__path__)
-                except Exception as e:
+                except Exception as e:  # the previous save is left untouched, saves are atomic
                     print(f'{id(self)} An exception happened while saving {self.__path__}: {e}', file=sys.stderr)
-                    self.remove(self.__path__)
                     raise
 
             atexit.unregister(self._atexit)
@@ -107,12 +126,20 @@ class FailSafe(Options):
 
         @property
         def __path__(self):
-#            assert isinstance(self.failsafe_folder.value(), Directories), f'Expected type: {Directories.__name__}, Actual: {type(self.failsafe_folder.value())}'
             return f'{str(self.failsafe_folder.value())}/{self.__filename__(self._oid)}'
 
         def __init__(self, *args, **kwargs):
             super(FailSafe.Guardian, self).__init__(*args, **kwargs)
 
+        def __getattr__(self, item):
+            lazy = self.__dict__.get('_lazy')
+            if lazy and item in lazy:  # restored lazily (see GlobalOptions.lazy_restore) and not accessed so far
+                value = lazy[item].load()
+                object.__setattr__(self, item, value)
+                del lazy[item]
+                return value
+            raise AttributeError(item)
+
         @staticmethod
         def init_or_load(self, __init__, *args, **kwargs):
             type(self)._unique_id += 1  # For the same version of the code the id should be the same
@@ -131,8 +158,6 @@ class FailSafe(Options):
                     res = self.load(path)
 
                 if res is not None:
-                    type(res).decorate(res)  # depending on the load function this might not be called
-
                     # As Failsafe.__call__ might not get called I have to force it to inherit the options
                     for attr in [v for v in dir(res) if v.startswith('_opt_')]:
                         setattr(res, attr, getattr(res, attr[len('_opt_'):]).value())
@@ -149,6 +174,10 @@ class FailSafe(Options):
             object.__setattr__(self, '_atexit', partial(FailSafe.Guardian._atexit_template, self))
             atexit.register(self._atexit)
 
+            snapshots.track(self)
+            if self.snapshot_interval.value() and not snapshots.running():
+                snapshots.start(self.snapshot_interval.value(), self.snapshot_mode.value())
+
     def __init__(cls, name, bases, namespace, loader=None, saver=None, remover=None, filename=None):
         super(FailSafe, cls).__init__(name, bases, namespace)
 
@@ -161,8 +190,12 @@ class FailSafe(Options):
         setattr(cls, 'remove', staticmethod(remover or getattr(cls, 'remove', default_remove)))
         setattr(cls, '__filename__', partialmethod(filename or getattr(cls, '__filename__', default_filename())))
 
-        setattr(cls, '__getstate__', failsafe_getstate(getattr(cls, '__getstate__', default_getstate)))
-        setattr(cls, '__setstate__', failsafe_setstate(getattr(cls, '__setstate__', default_setstate)))
+        getstate = getattr(cls, '__getstate__', default_getstate)
+        setstate = getattr(cls, '__setstate__', default_setstate)
+        if not getattr(getstate, 'failsafe', False):  # not wrapped already by a FailSafe base class
+            setattr(cls, '__getstate__', failsafe_getstate(getstate))
+        if not getattr(setstate, 'failsafe', False):
+            setattr(cls, '__setstate__', failsafe_setstate(setstate))
 
         assert isinstance(cls.load, Callable), 'The "load" property has to be callable.'
         assert not inspect.ismethod(cls.load) or cls.load.__self__ is cls, 'the "load" method has to be of type ' \
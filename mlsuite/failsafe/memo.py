@@ -0,0 +1,235 @@
+""" Memoization of function results across runs, keyed by a stable hash of the function and of its arguments (used by
+`failsafe_result` and `execute_once`):
+
+    from mlsuite.failsafe.memo import memoize
+
+    @memoize
+    def preprocess(path, size=256):
+        ...
+
+The function is identified by its module, qualified name and code, so editing it invalidates its results, and the
+arguments are bound to its signature first, so `f(1, b=2)` and `f(1, 2)` share their result. The results are kept in
+memory (the last `GlobalOptions.memo_memory_items` used, the same object is returned on every hit, do not modify it) and
+saved in `GlobalOptions.memo_dir` with `GlobalOptions.serializer`, where the least recently used ones are removed beyond
+`GlobalOptions.memo_max_size` bytes. Set `GlobalOptions.memo_dir` to `False` to disable it (these are the options of
+`mlsuite.failsafe.GlobalOptions`).
+"""
+import os
+import sys
+import types
+import inspect
+import hashlib
+import threading
+from pathlib import Path, PurePath
+from functools import wraps, partial
+from collections import OrderedDict
+
+from .failsafe import GlobalOptions
+from . import serializers, checkpoints
+
+_MISSING = object()
+
+_memos = {}  # (process, folder) -> memo
+_memos_lock = threading.Lock()
+
+
+def _digest(value) -> bytes:
+    if value is None or isinstance(value, (bool, int, float, complex)):
+        data = f'{type(value).__name__}:{value!r}'.encode()
+    elif isinstance(value, str):  # with its placeholders replaced, if any (see mlsuite.experiments.arguments)
+        data = b's' + str.__str__(str(value)).encode()
+    elif isinstance(value, (bytes, bytearray)):
+        data = b'b' + bytes(value)
+    elif isinstance(value, PurePath):
+        data = b'p' + str(value).encode()
+    elif isinstance(value, dict):
+        data = b'd' + b''.join(sorted(_digest(k) + _digest(v) for k, v in value.items()))
+    elif isinstance(value, (set, frozenset)):
+        data = b'e' + b''.join(sorted(_digest(v) for v in value))
+    elif isinstance(value, (list, tuple)):
+        data = (b'l' if isinstance(value, list) else b't') + b''.join(_digest(v) for v in value)
+    elif 'numpy' in sys.modules and isinstance(value, sys.modules['numpy'].ndarray) and value.dtype != object:
+        digest = hashlib.blake2b(f'a{value.dtype.str}{value.shape}'.encode(), digest_size=16)
+        digest.update(sys.modules['numpy'].ascontiguousarray(value).data)
+        return digest.digest()
+    elif isinstance(value, (types.FunctionType, types.MethodType, partial)):
+        return function_digest(value)
+    else:  # its pickle, e.g., the attributes of an object
+        stream, _, buffers = serializers.dumps(value)
+        digest = hashlib.blake2b(b'o' + type(value).__qualname__.encode(), digest_size=16)
+        digest.update(stream)
+        for buffer in buffers:
+            digest.update(buffer)
+        return digest.digest()
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _code_digest(code: types.CodeType) -> bytes:
+    digest = hashlib.blake2b(code.co_code, digest_size=16)
+    digest.update(repr(code.co_names).encode())
+    for const in code.co_consts:  # including the code of nested functions
+        digest.update(_code_digest(const) if isinstance(const, types.CodeType) else _digest(const))
+    return digest.digest()
+
+
+def function_digest(func) -> bytes:
+    """Digest of the identity of `func`: its module, qualified name and code (and the arguments bound by partials)."""
+    if isinstance(func, partial):
+        return _digest(('partial', function_digest(func.func), func.args, func.keywords))
+    if isinstance(func, types.MethodType):
+        return _digest(('method', function_digest(func.__func__), func.__self__))
+
+    digest = hashlib.blake2b(f'{func.__module__}.{func.__qualname__}'.encode(), digest_size=16)
+    code = getattr(func, '__code__', None)
+    if code is not None:
+        digest.update(_code_digest(code))
+    return digest.digest()
+
+
+def key(func, args=(), kwargs=None) -> str:
+    """Hash of a call to `func`, stable across processes."""
+    kwargs = kwargs or {}
+    try:
+        bound = inspect.signature(func).bind(*args, **kwargs)
+        bound.apply_defaults()
+        args, kwargs = (), bound.arguments
+    except (TypeError, ValueError):  # no signature available, or the call would fail anyway
+        pass
+    return _digest((function_digest(func), tuple(args), dict(kwargs))).hex()
+
+
+class Memo(object):
+    """Results of calls by their `key`, the last `memory_items` in memory and all of them in `folder`."""
+    def __init__(self, folder, max_size=None, memory_items=16, serializer='pickle5'):
+        self.folder = Path(folder)
+        self.max_size = max_size
+        self.memory_items = memory_items
+        self.serializer = serializer
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.disk_hits = self.misses = self.evictions = 0
+
+    def path(self, key: str) -> Path:
+        return self.folder / f'{key}.pickle'
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+
+        path = self.path(key)
+        try:
+            value = serializers.load(path, self.serializer)
+            os.utime(path)  # the least recently used ones are removed first, see `evict`
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return default
+
+        with self._lock:
+            self.disk_hits += 1
+        self._remember(key, value)
+        return value
+
+    def put(self, key: str, value) -> None:
+        self.folder.mkdir(parents=True, exist_ok=True)
+        serializers.dump(value, self.path(key), self.serializer)
+        self._remember(key, value)
+        if self.max_size is not None:
+            self.evict(keep=key)
+
+    def _remember(self, key: str, value) -> None:
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def evict(self, keep=None) -> None:
+        """Removes the least recently used results until the rest fit in `max_size` bytes (except `keep`)."""
+        entries = []
+        with os.scandir(self.folder) as scanned:
+            for entry in scanned:
+                if entry.name.endswith('.pickle') and not entry.name.startswith('.'):  # not being written
+                    stat = entry.stat()
+                    size = stat.st_size + _folder_size(checkpoints.chunk_folder(entry.path))  # chunked serializer
+                    entries.append((stat.st_mtime_ns, size, entry.name[:-len('.pickle')]))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_size:
+                break
+            if name == keep:
+                continue
+            _remove(self.path(name))
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+    def call(self, func, args=(), kwargs=None):
+        """Returns `func(*args, **kwargs)`, computing and saving it only if it is not known yet."""
+        kwargs = kwargs or {}
+        call_key = key(func, args, kwargs)
+        value = self.get(call_key, _MISSING)
+        if value is _MISSING:
+            value = func(*args, **kwargs)
+            self.put(call_key, value)
+        return value
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses,
+                    'evictions': self.evictions, 'memory_items': len(self._memory)}
+
+    def clear(self) -> None:
+        """Forgets every result, in memory and on disk."""
+        with self._lock:
+            self._memory.clear()
+        if self.folder.exists():
+            for path in self.folder.glob('*.pickle'):
+                _remove(path)
+
+
+def _folder_size(folder) -> int:
+    try:
+        with os.scandir(folder) as entries:
+            return sum(entry.stat().st_size for entry in entries)
+    except FileNotFoundError:
+        return 0
+
+
+def _remove(path: Path) -> None:
+    try:
+        checkpoints.remove(path)  # with the older manifests and chunks of the chunked serializer, if any
+    except FileNotFoundError:  # removed by another process
+        pass
+
+
+def get_memo():
+    """Memo of this process in `GlobalOptions.memo_dir` with the current options, or None if it is disabled."""
+    folder = GlobalOptions.memo_dir.value()
+    if not folder:
+        return None
+
+    process_key = (os.getpid(), str(folder))
+    with _memos_lock:
+        if process_key not in _memos:
+            _memos[process_key] = Memo(folder)
+        memo = _memos[process_key]
+    memo.max_size = GlobalOptions.memo_max_size.value()
+    memo.memory_items = GlobalOptions.memo_memory_items.value()
+    memo.serializer = GlobalOptions.serializer.value()
+    return memo
+
+
+def memoize(func):
+    """Decorator that reuses the results of previous calls to `func` with the same arguments, see `get_memo`."""
+    @wraps(func)
+    def memoized(*args, **kwargs):
+        memo = get_memo()
+        if memo is None:
+            return func(*args, **kwargs)
+        return memo.call(func, args, kwargs)
+    return memoized
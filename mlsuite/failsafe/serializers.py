@@ -0,0 +1,241 @@
+""" Serializers used to save and load the FailSafe objects, selected by name with `GlobalOptions.serializer`:
+
+    - `pickle5` (default): pickle protocol 5, with the buffers of NumPy arrays (and the storages of CPU torch tensors,
+      so that the views of the same one are still shared once loaded) written out of band as raw, aligned blocks after
+      the pickle stream, so they are neither copied into it when saving nor out of it when loading. Objects that plain
+      pickle cannot handle (e.g., lambdas) are pickled with dill instead.
+    - `chunked`: the state is split by attribute and in chunks, and only the chunks that changed since the previous save
+      are written (see `mlsuite.failsafe.checkpoints`, where its policy can be changed).
+    - `dill`: the whole object is pickled with dill, as done originally.
+
+New ones can be added with `register_serializer`. Whatever serializer is selected, `load` recognizes the files written
+by `pickle5` and `chunked` by their first bytes.
+"""
+import io
+import os
+import sys
+import mmap
+import pickle
+import struct
+import tempfile
+from pathlib import Path
+from contextlib import contextmanager
+from collections import namedtuple
+
+import dill
+
+Serializer = namedtuple('Serializer', ['dump', 'load'])
+
+MAGIC = b'MLSUITE5'
+CHUNKED = b'{"chunked": '  # first bytes of the manifests of the chunked serializer
+ALIGNMENT = 64  # of the buffers within the file
+OUT_OF_BAND = 1 << 12  # smaller buffers are kept in the pickle stream, where they cost less
+
+_HEADER = struct.Struct('<8sBQQ')  # magic, codec, number of buffers and length of the pickle stream
+_BUFFER = struct.Struct('<QQ')  # offset and size of each buffer
+_CODECS = {0: pickle, 1: dill}
+
+
+def _tensor(storage, dtype: str, offset: int, size: tuple, stride: tuple, requires_grad: bool):
+    import torch
+    data = torch.from_numpy(storage).view(getattr(torch, dtype))  # the tensors of the same storage share it again
+    return data.as_strided(size, stride, offset).requires_grad_(requires_grad)
+
+
+def _reducer_override(obj, storages: dict):
+    numpy = sys.modules.get('numpy')
+    if numpy is not None and isinstance(obj, numpy.ndarray):  # dill pickles them in band otherwise
+        return obj.__reduce_ex__(5)
+
+    torch = sys.modules.get('torch')  # no one could have created a tensor otherwise
+    if numpy is not None and torch is not None and type(obj) is torch.Tensor and obj.device.type == 'cpu' \
+            and obj.layout == torch.strided and not obj.is_quantized:
+        try:
+            # the bytes of its storage as an array (out of band), the same one for all the tensors (views) using it
+            untyped = obj.untyped_storage()
+            key = (untyped.data_ptr(), untyped.nbytes())
+            if key not in storages:
+                storages[key] = torch.empty(0, dtype=torch.uint8).set_(untyped).numpy()
+            return _tensor, (storages[key], str(obj.dtype)[len('torch.'):], obj.storage_offset(), tuple(obj.shape),
+                             obj.stride(), obj.requires_grad)
+        except (RuntimeError, TypeError):  # left to the reducer of torch
+            return NotImplemented
+
+    return NotImplemented
+
+
+class _Pickler(pickle.Pickler):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._storages = {}  # of the tensors, see `_reducer_override`
+
+    def reducer_override(self, obj):
+        return _reducer_override(obj, self._storages)
+
+
+class _DillPickler(dill.Pickler):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._storages = {}
+
+    def reducer_override(self, obj):
+        return _reducer_override(obj, self._storages)
+
+
+@contextmanager
+def atomic_write(path):
+    """Opens a temporary file next to `path` that replaces it once the with statement ends without exceptions."""
+    path = Path(path)
+    file = tempfile.NamedTemporaryFile(dir=path.parent, prefix=f'.{path.name}.', delete=False)
+    try:
+        with file:
+            yield file
+        os.replace(file.name, path)
+    except BaseException:
+        os.unlink(file.name)
+        raise
+
+
+def empty(size: int):
+    numpy = sys.modules.get('numpy')  # unlike bytearray, it does not fill the memory before reading into it
+    return numpy.empty(size, dtype=numpy.uint8) if numpy is not None else bytearray(size)
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def dumps(obj, memo=None) -> tuple:
+    """ Pickles `obj` with protocol 5, and returns the pickle stream, the codec needed to load it (see `loads`) and the
+    out-of-band buffers as memory views of the original data. The objects pickled are added to `memo` (by their id), if
+    given.
+    """
+    buffers = []
+
+    def out_of_band(buffer):
+        if buffer.raw().nbytes < OUT_OF_BAND:
+            return True
+        buffers.append(buffer)
+        return False
+
+    stream, codec = io.BytesIO(), 0
+    pickler = _Pickler(stream, protocol=5, buffer_callback=out_of_band)
+    try:
+        pickler.dump(obj)
+    except (pickle.PicklingError, TypeError, AttributeError):  # e.g., lambdas or local classes
+        stream, codec = io.BytesIO(), 1
+        buffers.clear()
+        pickler = _DillPickler(stream, protocol=5, buffer_callback=out_of_band)
+        pickler.dump(obj)
+
+    if memo is not None:
+        memo.update({key: value for key, (_, value) in pickler.memo.copy().items()})
+
+    return stream.getbuffer(), codec, [buffer.raw() for buffer in buffers]
+
+
+def loads(data, codec: int, buffers=()):
+    """Inverse of `dumps`."""
+    return _CODECS[codec].loads(data, buffers=buffers)
+
+
+def dump_buffers(obj, path) -> None:
+    """Saves `obj` in `path` with the `pickle5` serializer."""
+    data, codec, raws = dumps(obj)
+    table, offset = [], _HEADER.size + _BUFFER.size * len(raws) + len(data)
+    for raw in raws:
+        offset = _align(offset)
+        table.append((offset, raw.nbytes))
+        offset += raw.nbytes
+
+    with atomic_write(path) as file:
+        file.write(_HEADER.pack(MAGIC, codec, len(raws), len(data)))
+        file.write(b''.join(_BUFFER.pack(*entry) for entry in table))
+        file.write(data)
+        for (offset, _), raw in zip(table, raws):
+            file.write(bytes(offset - file.tell()))
+            file.write(raw)
+
+
+def load_buffers(path, mmap_mode=False):
+    """ Loads an object saved with `dump_buffers` (or with `dill`). With `mmap_mode=True` the buffers are copy-on-write
+    memory maps of the file instead of being read, so they are only read from the disk once accessed.
+    """
+    with open(path, 'rb') as file:
+        header = file.read(_HEADER.size)
+        if len(header) < _HEADER.size or not header.startswith(MAGIC):
+            file.seek(0)
+            return dill.load(file)
+
+        _, codec, count, length = _HEADER.unpack(header)
+        table = list(_BUFFER.iter_unpack(file.read(_BUFFER.size * count)))
+        data = file.read(length)
+
+        buffers = []
+        if mmap_mode and count > 0:
+            mapped = memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY))
+            buffers = [mapped[offset:offset + size] for offset, size in table]
+        else:
+            for offset, size in table:
+                buffer = empty(size)
+                file.seek(offset)
+                if file.readinto(buffer) != size:
+                    raise EOFError(f'{path} is truncated.')
+                buffers.append(buffer)
+
+    return loads(data, codec, buffers)
+
+
+def dump_dill(obj, path) -> None:
+    """Saves `obj` in `path` with the `dill` serializer."""
+    with atomic_write(path) as file:
+        dill.dump(obj, file)
+
+
+def load_dill(path):
+    with open(path, 'rb') as file:
+        return dill.load(file)
+
+
+def dump_chunked(obj, path) -> None:
+    """Saves `obj` in `path` with the `chunked` serializer, see `mlsuite.failsafe.checkpoints`."""
+    from .checkpoints import checkpoints
+    checkpoints.dump(obj, path)
+
+
+def load_chunked(path, mmap_mode=False, lazy=False):
+    from .checkpoints import checkpoints
+    return checkpoints.load(path, mmap_mode, lazy)
+
+
+serializers = {
+    'pickle5': Serializer(dump_buffers, load_buffers),
+    'chunked': Serializer(dump_chunked, load_chunked),
+    'dill': Serializer(dump_dill, load_dill),
+}
+
+
+def register_serializer(name: str, dump, load) -> None:
+    """Adds the serializer `name`, with the functions `dump(obj, path)` and `load(path)`."""
+    serializers[name] = Serializer(dump, load)
+
+
+def dump(obj, path, serializer='pickle5') -> None:
+    """Saves `obj` in `path` (atomically for the built-in serializers) with the given serializer."""
+    assert serializer in serializers, f'Unknown serializer "{serializer}", choose one of {list(serializers)}.'
+    serializers[serializer].dump(obj, path)
+
+
+def load(path, serializer='pickle5', mmap_mode=False, lazy=False):
+    """ Loads an object saved in `path` with the given serializer, or with `pickle5` or `chunked` if the file starts
+    as theirs. `mmap_mode` is only used by them, and `lazy` (large attributes loaded once accessed) by `chunked`.
+    """
+    assert serializer in serializers, f'Unknown serializer "{serializer}", choose one of {list(serializers)}.'
+    with open(path, 'rb') as file:
+        start = file.read(16)
+
+    if start.startswith(MAGIC):
+        return load_buffers(path, mmap_mode)
+    if start.startswith(CHUNKED):
+        return load_chunked(path, mmap_mode, lazy)
+    return serializers[serializer].load(path)
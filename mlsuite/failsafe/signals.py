@@ -4,10 +4,11 @@ import atexit
 from functools import wraps
 
 
-def exit_gracefully(signum, frame):
-    class SigtermException(Exception):
-        pass
+class SigtermException(Exception):
+    pass
 
+
+def exit_gracefully(signum, frame):  # an exception, so that with statements and finally blocks do their cleanup
     raise SigtermException('SIGTERM signal received')
 
 
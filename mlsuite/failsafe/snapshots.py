@@ -0,0 +1,149 @@
+""" Snapshots of the live FailSafe objects taken while the program runs, instead of only when it exits.
+
+`snapshot()` saves every object being tracked (the FailSafe objects track themselves on creation) without stopping the
+program for the whole save, and `start(interval)` does it periodically from a background thread (as done by the FailSafe
+objects if `GlobalOptions.snapshot_interval` is set). Two modes are available:
+
+    - `thread`: the object is pickled with its buffers (e.g., arrays) copied, which is cheap, and saved by a background
+      thread from that copy.
+    - `fork`: a child process, a copy-on-write image of the program at the time of the snapshot, saves the objects. Only
+      the time to fork is spent, but the child must not need locks that other threads could be holding (e.g., imports).
+
+Snapshots taken periodically might see an object in the middle of an update, call `snapshot()` where they are known to
+be consistent if it matters. The saves are atomic for the built-in serializers (see `mlsuite.failsafe.serializers`), so
+a crash in the middle of one never corrupts the previous checkpoint, and they never overlap: a periodic snapshot is
+skipped if the previous one has not finished yet.
+"""
+import os
+import sys
+import weakref
+import threading
+from contextvars import copy_context
+from concurrent.futures import ThreadPoolExecutor, Future
+
+from .serializers import dumps, loads, empty
+
+_objects = weakref.WeakSet()
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='snapshots')  # saves one snapshot at a time
+_pending = []  # futures of the snapshots not finished yet
+_lock = threading.Lock()
+_timer = None
+
+
+def track(obj) -> None:
+    """Includes `obj` (which must have a `save(path)` method and a `__path__`) in the snapshots."""
+    _objects.add(obj)
+
+
+def untrack(obj) -> None:
+    _objects.discard(obj)
+
+
+def _copy(buffer):
+    copy = empty(buffer.nbytes)
+    memoryview(copy).cast('B')[:] = buffer
+    return copy
+
+
+def _capture(obj) -> tuple:
+    data, codec, buffers = dumps(obj)
+    return bytes(data), codec, [_copy(buffer) for buffer in buffers]
+
+
+def _save(obj) -> None:
+    try:
+        obj.save(obj.__path__)
+    except Exception as e:
+        print(f'{id(obj)} An exception happened while taking a snapshot of {obj.__path__}: {e}', file=sys.stderr)
+        raise
+
+
+def _save_captured(captured: list) -> None:
+    for capture in captured:
+        _save(loads(*capture))
+
+
+def _save_forked(pid: int) -> None:
+    _, status = os.waitpid(pid, 0)
+    if os.waitstatus_to_exitcode(status) != 0:
+        raise RuntimeError(f'The snapshot process {pid} failed ({os.waitstatus_to_exitcode(status)}).')
+
+
+def _child(objects: list) -> None:
+    code = 0
+    try:
+        for obj in objects:
+            _save(obj)
+    except BaseException:
+        code = 1
+    finally:
+        os._exit(code)  # neither the exit handlers nor the buffers of the parent are run/flushed twice
+
+
+def snapshot(objects=None, mode='thread') -> Future:
+    """ Saves `objects` (all the ones being tracked by default) in the background, and returns the future of the save.
+    Only capturing them (`thread` mode) or forking (`fork` mode) is done before returning.
+    """
+    assert mode in ('thread', 'fork'), f'Unknown snapshot mode "{mode}".'
+    objects = list(_objects) if objects is None else list(objects)
+
+    if mode == 'fork':
+        pid = os.fork()
+        if pid == 0:
+            _child(objects)
+        future = _executor.submit(_save_forked, pid)
+    else:
+        # saved with the options of the caller (e.g., `with GlobalOptions.failsafe_folder(...)`), local to its context
+        future = _executor.submit(copy_context().run, _save_captured, [_capture(obj) for obj in objects])
+
+    with _lock:
+        _pending[:] = [f for f in _pending if not f.done()] + [future]
+    return future
+
+
+def wait() -> None:
+    """Waits until the snapshots taken so far are saved, so that they do not overwrite newer saves."""
+    with _lock:
+        pending = list(_pending)
+    for future in pending:
+        future.exception()
+
+
+def _periodic(stop: threading.Event, interval: float, mode: str) -> None:
+    future = None
+    while not stop.wait(interval):
+        if future is not None and not future.done():  # the previous one is still being saved
+            continue
+        try:
+            future = snapshot(mode=mode)
+        except Exception as e:
+            print(f'An exception happened while taking a snapshot: {e}', file=sys.stderr)
+
+
+def start(interval: float, mode='thread') -> None:
+    """Takes a snapshot every `interval` seconds from a background thread, until `stop` is called."""
+    global _timer
+    assert interval > 0, 'The interval has to be positive.'
+    stop()
+
+    event = threading.Event()
+    thread = threading.Thread(target=copy_context().run, args=(_periodic, event, interval, mode),
+                              name='snapshots-timer', daemon=True)  # with the options of the caller
+    _timer = (event, thread)
+    thread.start()
+
+
+def stop() -> None:
+    """Stops the periodic snapshots (if any), and waits until the pending ones are saved."""
+    global _timer
+    if _timer is not None:
+        event, thread = _timer
+        event.set()
+        if thread is not threading.current_thread():
+            thread.join()
+        _timer = None
+    wait()
+
+
+def running() -> bool:
+    return _timer is not None
@@ -1,6 +1,5 @@
-from functools import wraps
-
 from .failsafe import default_load, FailSafe
+from .memo import memoize
 
 
 # TODO for now this has the basic options (non-configurable at all)
@@ -28,6 +27,8 @@ class FailSafeWrapper(metaclass=FailSafe):
         return f'{self.func_name}_{oid}.pickle'
 
     def __getattr__(self, item):
+        if item in self.__dict__.get('_lazy', ()):  # e.g., the result, if it was restored lazily
+            return super(FailSafeWrapper, self).__getattr__(item)
         if item != 'wrapped':  # This happens if save is called when CPython is already shutting down
             return getattr(self.wrapped, item)
         raise AttributeError(item)
@@ -40,21 +41,15 @@ class FailSafeWrapper(metaclass=FailSafe):
 
 
 def failsafe_result(func):
-    @wraps(func)
-    def failsafe_result_wrapper(*args, **kwargs):
-        wrapper = FailSafeWrapper(func, *args, **kwargs)
-        return wrapper
-
-    return failsafe_result_wrapper
+    """ Saves the result of every call to `func`, and returns the saved one on the next calls with the same arguments
+    (also in other runs), see `mlsuite.failsafe.memo`.
+    """
+    return memoize(func)
 
 
 def execute_once(func):
-    @failsafe_result
-    @wraps(func)
-    def execute_once_(*args, **kwargs):
-        result = func(*args, **kwargs)
-        return result if result is not None else 1
-    return execute_once_
+    """Runs `func` only once for each set of arguments, later calls return the result of the first one."""
+    return memoize(func)
 
 
 def failsafe_object(obj):
@@ -62,4 +57,4 @@ def failsafe_object(obj):
         return obj
 
     failsafe_object_.__name__ = type(obj).__name__  # Save it with the name of the object safed
-    return failsafe_result(failsafe_object_)(obj)
\ No newline at end of file
+    return FailSafeWrapper(failsafe_object_, obj)  # saved at exit with its changes, not memoized by its initial state
\ No newline at end of file
@@ -1,3 +1,5 @@
+import os
+from contextvars import ContextVar
 from functools import partial, wraps
 
 
@@ -5,28 +7,28 @@ def with_stmt(outer_func):
     """
     Takes a function an returns a context manager that can be used as decorator and in a with statement.
 
-    :param outer_func Function that works as a setter/getter when some/no arguments are passed to it.
+    :param outer_func Function that works as a setter/getter when some/no arguments are passed to it. With
+    `context=True` it only sets the value for the current context (thread or asyncio task) and returns a token, which
+    restores the previous value when passed as `reset=token`.
     """
 
     class CM(object):
         def __init__(self, *args, **kwargs):
             self.args = args
             self.kwargs = kwargs
-            self.old_value = []
+            self.tokens = []
 
         def __enter__(self):
-            self.old_value.append(outer_func())
-            outer_func(*self.args, **self.kwargs)
+            self.tokens.append(outer_func(*self.args, context=True, **self.kwargs))
 
         def __exit__(self, exc_type, exc_val, exc_tb):
-            prev_value = self.old_value.pop()
-            outer_func(prev_value) if prev_value is not None else outer_func(reset=True)
+            outer_func(reset=self.tokens.pop())
             return False
 
         def __call__(self, inner_func):
             @wraps(inner_func)
             def decorate_inner_func(*args, **kwargs):
-                with self:
+                with CM(*self.args, **self.kwargs):  # a new one per call, so it can be used concurrently
                     return inner_func(*args, **kwargs)
             return decorate_inner_func
 
@@ -37,17 +39,36 @@ def with_stmt(outer_func):
     return CM
 
 
+_UNSET = object()
+
+
 class Options(type):
+    """
+    Metaclass that turns every `_opt_name` attribute into an option `cls.name` that can be read/set with
+    `cls.name.value(...)` and temporarily changed with `cls.name(value)` as a decorator or in a with statement.
+    Temporary changes are local to the current context, so threads and asyncio tasks do not see each other's. Setting
+    the value within a temporary change also changes it until the end of the change (and globally afterwards).
+    """
     def __init__(cls, name, bases, namespace):
         super(Options, cls).__init__(name, bases, namespace)
 
-        def getter(self, name, value=None):
-            if value is not None:
+        def getter(self, name, var, value=None, context=False, reset=None):
+            if reset is not None:
+                var.reset(reset)
+            elif context:
+                return var.set(value)
+            elif value is not None:
                 setattr(self, name, value)
-            return getattr(self, name)
+                if var.get(_UNSET) is not _UNSET:  # a temporary change is active in this context
+                    var.set(value)
+            return var.get(getattr(self, name))
 
         for attr in [x for x in namespace if x.startswith('_opt_')]:
-            setattr(cls, attr[len('_opt_'):], with_stmt(partial(getter, cls, attr)))
+            var = ContextVar(f'{cls.__qualname__}.{attr}')
+            setattr(cls, attr[len('_opt_'):], with_stmt(partial(getter, cls, attr, var)))
+
+
+_CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), 'mlsuite')
 
 
 class GlobalOptions(metaclass=Options):
@@ -55,4 +76,6 @@ class GlobalOptions(metaclass=Options):
     # _opt_load_on_init = True
     # _opt_save_on_del = True
     _opt_replace_placeholders = True
-
+    _opt_yaml_cache_dir = os.path.join(_CACHE_DIR, 'yaml')
+    _opt_yaml_cache_size = 64 << 20  # bytes
+    _opt_registry_file = os.path.join(_CACHE_DIR, 'runs.sqlite')  # see mlsuite.experiments.registry
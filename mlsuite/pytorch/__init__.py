@@ -1,5 +1,13 @@
-from .utils import fix_seed, to_one_hot, LazySummaryWriter, skip_grad
+from mlsuite._lazy import lazy_exports
+
+# torch is only imported once any of these is used
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'fix_seed': '.utils',
+    'to_one_hot': '.utils',
+    'LazySummaryWriter': '.utils',
+    'skip_grad': '.utils',
+})
 
 # summary_writer = LazySummaryWriter(directories.root)
 
-__all__ = ['fix_seed', 'to_one_hot', 'skip_grad']
\ No newline at end of file
+__all__ = ['fix_seed', 'to_one_hot', 'skip_grad']
@@ -17,11 +17,12 @@ setuptools.setup(
      url="https://github.com/adrianjav/ml-code-base",
      packages=setuptools.find_packages(),
      classifiers=[
-         "Programming Language :: Python :: 3.7",
+         "Programming Language :: Python :: 3.9",
          # "License :: OSI Approved :: MIT License",
          "Operating System :: OS Independent",
      ],
      include_package_data=True,
+     python_requires='>=3.9',
      install_requires=[
          'dotmap',
          'pyyaml',
@@ -0,0 +1,35 @@
+import os
+import tempfile
+
+from mlsuite.options import GlobalOptions
+from mlsuite.experiments.registry import get_registry
+
+_OPTIONS = {'registry_file': 'runs.sqlite', 'yaml_cache_dir': 'yaml'}
+
+
+class TemporaryCache(object):
+    """ Mixin for the test cases that run experiments, so that the registry and the YAML cache are kept in a temporary
+    folder instead of the cache of the user (also for the processes they spawn).
+    """
+    def setUp(self) -> None:
+        self._cache = tempfile.TemporaryDirectory()
+        self._previous = {name: getattr(GlobalOptions, name).value() for name in _OPTIONS}
+        for name, filename in _OPTIONS.items():
+            getattr(GlobalOptions, name).value(os.path.join(self._cache.name, filename))
+        self._environ = os.environ.get('XDG_CACHE_HOME')
+        os.environ['XDG_CACHE_HOME'] = self._cache.name
+        super().setUp()
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        registry = get_registry()
+        if registry is not None:
+            registry.flush()
+
+        for name, value in self._previous.items():
+            getattr(GlobalOptions, name).value(value)
+        if self._environ is None:
+            os.environ.pop('XDG_CACHE_HOME', None)
+        else:
+            os.environ['XDG_CACHE_HOME'] = self._environ
+        self._cache.cleanup()
@@ -0,0 +1,179 @@
+import unittest
+import sys
+import os
+import json
+import fcntl
+import pickle
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from mlsuite.failsafe import serializers
+from mlsuite.failsafe.checkpoints import ChunkedCheckpoints, LazyValue, chunk_folder, history, remove
+
+
+class Model:
+    def __init__(self):
+        self.step = 0
+        self.weights = np.arange(1 << 18, dtype=np.float64)  # 2 MiB
+        self.embeddings = np.ones((64, 1024), dtype=np.float32)  # 256 KiB
+        self.name = 'model'
+
+
+class TestCheckpoints(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = Path(self.folder.name, 'Model_1.pickle')
+        self.checkpoints = ChunkedCheckpoints(chunk_size=1 << 18, keep_last=3)
+
+    def tearDown(self) -> None:
+        self.folder.cleanup()
+
+    def chunks(self) -> set:
+        return set(os.listdir(chunk_folder(self.path)))
+
+    def assertModel(self, model, step=0):
+        self.assertIsInstance(model, Model)
+        self.assertEqual(step, model.step)
+        np.testing.assert_array_equal(Model().embeddings, model.embeddings)
+        self.assertEqual('model', model.name)
+
+    def test_round_trip(self):
+        model = Model()
+        self.checkpoints.dump(model, self.path)
+        self.assertTrue(self.path.read_bytes().startswith(serializers.CHUNKED))
+
+        loaded = self.checkpoints.load(self.path)
+        self.assertModel(loaded)
+        np.testing.assert_array_equal(model.weights, loaded.weights)
+        loaded.weights[0] = -1  # writable
+
+        mapped = self.checkpoints.load(self.path, mmap_mode=True)
+        self.assertModel(mapped)
+        mapped.embeddings[0, 0] = -1  # copy on write
+        self.assertModel(serializers.load(self.path))
+
+    def test_delta(self):
+        model = Model()
+        self.checkpoints.dump(model, self.path)
+        before = self.chunks()
+
+        model.step = 1
+        model.weights[-1] = -1  # only the last chunk of the weights changes
+        self.checkpoints.dump(model, self.path)
+        written = self.chunks() - before
+        self.assertEqual(2, len(written))  # the stream of `step` and the chunk of the weights
+        self.assertLess(sum(os.path.getsize(chunk_folder(self.path) / name) for name in written), (1 << 18) + 100)
+
+        loaded = self.checkpoints.load(self.path)
+        self.assertModel(loaded, step=1)
+        self.assertEqual(-1, loaded.weights[-1])
+
+    def test_keep_last(self):
+        model = Model()
+        for step in range(5):
+            model.step, model.weights = step, model.weights + 1
+            self.checkpoints.dump(model, self.path)
+
+        manifests = history(self.path)
+        self.assertListEqual([self.path, self.path.with_name(f'{self.path.name}.1'),
+                              self.path.with_name(f'{self.path.name}.2')], manifests)
+        for step, manifest in zip([4, 3, 2], manifests):
+            loaded = self.checkpoints.load(manifest)
+            self.assertModel(loaded, step=step)
+            self.assertEqual(step + 1, loaded.weights[0])
+
+        # chunks of the removed checkpoints are deleted
+        used = {name for manifest in manifests for name in json.dumps(json.loads(manifest.read_bytes())).split('"')}
+        self.assertTrue(self.chunks() <= used)
+        # chunks of the weights and streams of the step of each checkpoint, the embeddings, the class and the streams of
+        # the rest of attributes
+        self.assertEqual(3 * (8 + 1) + 1 + 1 + 3, len(self.chunks()))
+
+    def test_budget(self):
+        model = Model()
+        checkpoints = ChunkedCheckpoints(chunk_size=1 << 18, keep_last=5, max_size=5 << 20)
+        for step in range(4):
+            model.weights = model.weights + 1
+            checkpoints.dump(model, self.path)
+        self.assertEqual(2, len(history(self.path)))
+
+        checkpoints.max_size = 1
+        checkpoints.dump(model, self.path)
+        self.assertListEqual([self.path], history(self.path))  # the latest one is always kept
+        np.testing.assert_array_equal(model.weights, checkpoints.load(self.path).weights)
+
+    def test_lazy(self):
+        model = Model()
+        self.checkpoints.dump(model, self.path)
+        before = self.chunks()
+
+        loaded = self.checkpoints.load(self.path, mmap_mode=True, lazy=True)
+        self.assertIsInstance(loaded.weights, LazyValue)  # only the 2 MiB array is large enough
+        self.assertModel(loaded)
+        np.testing.assert_array_equal(model.weights, loaded.weights.load())
+
+        loaded.step = 1
+        self.checkpoints.dump(loaded, self.path)  # without loading the weights
+        self.assertEqual(1, len(self.chunks() - before))
+        self.assertModel(self.checkpoints.load(self.path), step=1)
+
+        copy = pickle.loads(pickle.dumps(loaded))
+        np.testing.assert_array_equal(model.weights, copy.weights)
+
+    def test_shared(self):
+        model = Model()
+        model.params = [model.weights]
+        model.optimizer = {'params': model.params, 'lr': 0.1}  # as the optimizers of the models
+        self.checkpoints.dump(model, self.path)
+
+        loaded = self.checkpoints.load(self.path)
+        self.assertIs(loaded.params, loaded.optimizer['params'])
+        self.assertIs(loaded.weights, loaded.params[0])
+        self.assertModel(loaded)
+
+        before = self.chunks()
+        model.step = 1
+        model.weights[-1] = -1
+        self.checkpoints.dump(model, self.path)
+        self.assertEqual(2, len(self.chunks() - before))  # the stream of the object and the chunk of the weights
+
+    def test_save_in_progress(self):
+        self.checkpoints.dump(Model(), self.path)
+        (chunk_folder(self.path) / '.in_progress').write_bytes(b'')
+        fd = os.open(chunk_folder(self.path), os.O_RDONLY)  # as another save of the same folder
+        try:
+            fcntl.flock(fd, fcntl.LOCK_SH)
+            self.checkpoints.dump(Model(), self.path)
+            self.assertIn('.in_progress', self.chunks())
+        finally:
+            os.close(fd)
+
+        self.checkpoints.dump(Model(), self.path)
+        self.assertNotIn('.in_progress', self.chunks())
+
+    def test_other_objects(self):
+        for obj in [[1, 2, np.arange(10000)], {'a': 1}, lambda x: 2 * x]:
+            self.checkpoints.dump(obj, self.path)
+            loaded = self.checkpoints.load(self.path)
+            if callable(obj):
+                self.assertEqual(4, loaded(2))
+            else:
+                self.assertEqual(repr(obj), repr(loaded))
+
+    def test_serializer(self):
+        serializers.dump(Model(), self.path, serializer='chunked')
+        self.assertModel(serializers.load(self.path))
+        (chunk_folder(self.path) / '.interrupted').write_bytes(b'')
+        serializers.dump(Model(), self.path, serializer='chunked')
+        self.assertNotIn('.interrupted', self.chunks())
+
+        remove(self.path)
+        self.assertListEqual([], os.listdir(self.folder.name))
+
+
+if __name__ == '__main__':
+    unittest.main()
+    sys.exit(0)
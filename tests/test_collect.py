@@ -0,0 +1,103 @@
+import unittest
+import sys
+import os
+import csv
+import time
+import tempfile
+from pathlib import Path
+
+import yaml
+
+from mlsuite.experiments.collect import collect, find_runs, parse_run, write_table, main
+
+
+class TestCollect(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.folder = tempfile.TemporaryDirectory()
+        self.root = Path(self.folder.name, 'results')
+        for i in range(12):
+            self.write_run(i, {'model': {'lr': 0.1 * i, 'layers': [i, i]}, 'options': {'timestamp': str(i)}},
+                           metrics={'loss': 1. / (i + 1)} if i % 3 else None)
+        self.manifest = Path(self.folder.name, 'results.csv.manifest')
+
+    def tearDown(self) -> None:
+        self.folder.cleanup()
+
+    def write_run(self, i, config, metrics=None):
+        folder = self.root / 'sweep' / f'{i:02d}'
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / 'config.yml').write_text(yaml.safe_dump(config))
+        if metrics is not None:
+            (folder / 'metrics.yml').write_text(yaml.safe_dump(metrics))
+        return folder
+
+    def test_parse(self):
+        row = parse_run(self.root / 'sweep' / '01')
+        self.assertDictEqual({'run': str(self.root / 'sweep' / '01'), 'model.lr': 0.1, 'model.layers': '[1, 1]',
+                              'options.timestamp': '1', 'metrics.loss': 0.5}, row)
+        self.assertNotIn('metrics.loss', parse_run(self.root / 'sweep' / '00'))
+
+    def test_find(self):
+        (self.root / '.hidden').mkdir()
+        (self.root / '.hidden' / 'config.yml').write_text('a: 1')
+        self.assertListEqual([str(self.root / 'sweep' / f'{i:02d}') for i in range(12)], find_runs([self.root]))
+
+    def test_parallel(self):
+        rows = collect([self.root], jobs=2)
+        self.assertListEqual(rows, collect([self.root], jobs=1))
+        self.assertEqual(12, len(rows))
+        self.assertListEqual([0.1 * i for i in range(12)], [row['model.lr'] for row in rows])
+
+    def test_incremental(self):
+        rows = collect([self.root], manifest=self.manifest)
+        mtime = self.manifest.stat().st_mtime_ns
+
+        # nothing changed, nothing parsed or written
+        self.assertListEqual(rows, collect([self.root], manifest=self.manifest))
+        self.assertEqual(mtime, self.manifest.stat().st_mtime_ns)
+
+        folder = self.write_run(3, {'model': {'lr': -1}})
+        os.utime(folder / 'config.yml', ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+        self.write_run(12, {'model': {'lr': 12}})
+        (self.root / 'sweep' / '00' / 'config.yml').unlink()
+        (self.root / 'sweep' / '01' / 'metrics.yml').write_text('loss: 0.25\naccuracy: 0.9')
+
+        rows = {row['run']: row for row in collect([self.root], manifest=self.manifest)}
+        self.assertEqual(12, len(rows))
+        self.assertNotIn(str(self.root / 'sweep' / '00'), rows)
+        self.assertDictEqual({'run': str(folder), 'model.lr': -1}, rows[str(folder)])
+        self.assertEqual(12, rows[str(self.root / 'sweep' / '12')]['model.lr'])
+        self.assertEqual(0.9, rows[str(self.root / 'sweep' / '01')]['metrics.accuracy'])
+
+    def test_broken(self):
+        folder = self.write_run(5, {})
+        (folder / 'config.yml').write_text('a: [')
+        rows = {row['run']: row for row in collect([self.root], manifest=self.manifest)}
+        self.assertDictEqual({'run': str(folder)}, rows[str(folder)])
+
+        (folder / 'config.yml').write_text('a: 1')  # parsed again even if the signature matched
+        rows = {row['run']: row for row in collect([self.root], manifest=self.manifest)}
+        self.assertEqual(1, rows[str(folder)]['a'])
+
+    def test_table(self):
+        output = Path(self.folder.name, 'results.csv')
+        write_table(collect([self.root]), output)
+        with output.open() as file:
+            rows = list(csv.DictReader(file))
+        self.assertListEqual(['run', 'model.layers', 'model.lr', 'options.timestamp', 'metrics.loss'],
+                             list(rows[0].keys()))
+        self.assertListEqual(['', '0.5'], [rows[0]['metrics.loss'], rows[1]['metrics.loss']])
+
+    def test_cli(self):
+        output = Path(self.folder.name, 'table.csv')
+        with self.assertRaises(SystemExit) as exit:
+            main([str(self.root), '-o', str(output), '-j', '1'])
+        self.assertEqual(0, exit.exception.code)
+        self.assertTrue(Path(f'{output}.manifest').is_file())
+        self.assertEqual(13, len(output.read_text().splitlines()))
+
+
+if __name__ == '__main__':
+    unittest.main()
+    sys.exit(0)
@@ -0,0 +1,93 @@
+import unittest
+import sys
+import os
+import asyncio
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from mlsuite.experiments.experiment import experiment_wrapper
+from mlsuite.experiments.concurrent import run_concurrent, workdir
+from mlsuite.experiments.yaml_handlers import read_yaml
+
+from helpers import TemporaryCache
+
+barrier = threading.Barrier(3, timeout=5)
+
+
+@experiment_wrapper(output_dir='results/${name}', verbose=False)
+def evaluate(args):
+    barrier.wait()  # all the runs are alive at the same time
+    print(f'run {args.name}')
+    print(f'error {args.name}', file=sys.stderr)
+    (workdir() / 'result.txt').write_text(str(args.value * 2))
+    args.weights = np.full(3, args.value)
+    if args.value < 0:
+        raise ValueError('negative value')
+
+
+@experiment_wrapper(output_dir='results/${name}', verbose=False)
+async def evaluate_async(args):
+    await asyncio.sleep(0.01)
+    print(f'run {args.name}')
+    (workdir() / 'result.txt').write_text(str(args.value * 2))
+
+
+@experiment_wrapper(output_dir='results/${name}', verbose=False)
+async def locate(args):
+    (workdir() / 'data.txt').write_text(str(args.data))
+
+
+class TestConcurrent(TemporaryCache, unittest.TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.folder = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.folder.name)
+
+    def tearDown(self) -> None:
+        os.chdir(self.cwd)
+        self.folder.cleanup()
+        super().tearDown()
+
+    def test_threads(self):
+        configs = [{'name': f'run{i}', 'value': i} for i in [1, 2, -3]]
+        errors = run_concurrent(evaluate, configs, jobs=3)
+
+        self.assertEqual(self.folder.name, os.path.realpath(os.getcwd()))
+        self.assertIsNone(errors[0])
+        self.assertIsInstance(errors[2], ValueError)
+        for i in [1, 2, -3]:
+            self.assertEqual(f'run run{i}\n', Path(f'results/run{i}/stdout.txt').read_text())
+            self.assertEqual(f'error run{i}\n', Path(f'results/run{i}/stderr.txt').read_text())
+            self.assertEqual(str(2 * i), Path(f'results/run{i}/result.txt').read_text())
+
+        config = read_yaml('results/run-3/config.yml')
+        self.assertIn('exception_thrown', config)
+        np.testing.assert_array_equal(np.full(3, -3), config['weights'].load())
+
+    def test_async(self):
+        errors = run_concurrent(evaluate_async, [{'name': f'run{i}', 'value': i} for i in range(5)], jobs=2)
+        self.assertListEqual([None] * 5, errors)
+        self.assertEqual('run run4\n', Path('results/run4/stdout.txt').read_text())
+        self.assertEqual('8', Path('results/run4/result.txt').read_text())
+        self.assertTrue(read_yaml('results/run4/config.yml')['options']['isolated'])
+
+    def test_pwd(self):
+        self.assertListEqual([None], run_concurrent(locate, [{'name': 'run1', 'data': '${pwd}/data'}]))
+        self.assertEqual(os.path.join(os.getcwd(), 'data'), Path('results/run1/data.txt').read_text())
+        self.assertNotIn('pwd', read_yaml('results/run1/config.yml'))
+
+    def test_existing(self):
+        Path('results/run1').mkdir(parents=True)
+        Path('results/run1/config.yml').write_text('previous: true\n')
+        self.assertIsInstance(run_concurrent(evaluate_async, [{'name': 'run1', 'value': 1}])[0], FileExistsError)
+        self.assertEqual('previous: true\n', Path('results/run1/config.yml').read_text())
+
+
+if __name__ == '__main__':
+    unittest.main()
+    sys.exit(0)
@@ -0,0 +1,85 @@
+import unittest
+import sys
+import subprocess
+
+from mlsuite.experiments.arguments import ArgumentsHeader, Arguments
+
+
+class TestContentHash(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.settings = {
+            'seed': 7,
+            'model': {'optimizer': {'lr': 1e-3, 'name': 'adam'}, 'num clusters': '${seed}'},
+            'layers': [1, 2, {'size': 3}],
+        }
+
+    def test_order_independent(self):
+        reordered = {'layers': [1, 2, {'size': 3}], 'model': {'num clusters': '${seed}', 'optimizer': {'name': 'adam', 'lr': 1e-3}}, 'seed': 7}
+        self.assertEqual(ArgumentsHeader(self.settings).content_hash(), ArgumentsHeader(reordered).content_hash())
+
+    def test_resolved(self):
+        resolved = dict(self.settings, model=dict(self.settings['model'], **{'num clusters': '7'}))
+        self.assertEqual(ArgumentsHeader(self.settings).content_hash(), ArgumentsHeader(resolved).content_hash())
+
+    def test_types(self):
+        self.assertNotEqual(ArgumentsHeader({'a': 1}).content_hash(), ArgumentsHeader({'a': '1'}).content_hash())
+        self.assertNotEqual(ArgumentsHeader({'a': 1}).content_hash(), ArgumentsHeader({'a': True}).content_hash())
+
+    def test_own_root(self):
+        expected = ArgumentsHeader({'k': 1, 'x': '1'}).content_hash()
+        args = ArgumentsHeader({'k': 1, 'x': '${k}'})
+        ArgumentsHeader({'k': 2, 'x': '${k}'})  # the root of the current context now
+        self.assertEqual(expected, args.content_hash())
+        with args.as_root():  # not cached with the other root either
+            self.assertEqual(expected, args.content_hash())
+
+    def test_incremental(self):
+        args = ArgumentsHeader(self.settings)
+        original = args.content_hash()
+
+        args.model.optimizer.lr = 0.1
+        self.assertIsNone(args._digest)
+        self.assertIsNone(args.model.optimizer._digest)
+        self.assertIsNone(args.model._digest)
+        changed = args.content_hash()
+        self.assertNotEqual(original, changed)
+
+        args.model.optimizer.lr = 1e-3
+        self.assertEqual(original, args.content_hash())
+
+        args.model.optimizer.lr = 0.1
+        self.assertEqual(changed, args.content_hash())
+
+    def test_untouched_sections(self):
+        args = ArgumentsHeader(self.settings, other={'a': 1})
+        args.content_hash()
+        args.model.optimizer.lr = 0.1
+        self.assertIsNotNone(args.other._digest)
+
+    def test_placeholder_dependencies(self):
+        args = ArgumentsHeader(self.settings)
+        original = args.content_hash()
+
+        args.seed = 8
+        self.assertIsNone(args.model._digest)
+        self.assertNotEqual(original, args.content_hash())
+
+        args.update({'seed': 7})
+        self.assertEqual(original, args.content_hash())
+
+        args.model = Arguments({'num clusters': '${seed}'})
+        args.content_hash()
+        args.seed = 9
+        self.assertIsNone(args.model._digest)
+
+    def test_stable_across_processes(self):
+        code = 'from mlsuite.experiments.arguments import ArgumentsHeader;' \
+               f'print(ArgumentsHeader({self.settings!r}).content_hash())'
+        output = subprocess.check_output([sys.executable, '-c', code]).decode().strip()
+        self.assertEqual(ArgumentsHeader(self.settings).content_hash(), output)
+
+
+if __name__ == '__main__':
+    unittest.main()
+    sys.exit(0)
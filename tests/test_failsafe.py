@@ -1,9 +1,15 @@
 import unittest
-import mlsuite
+import os
+import time
+import pickle
+import tempfile
+
+import numpy as np
+
 from mlsuite.failsafe.failsafe import FailSafe, GlobalOptions
-from mlsuite import directories as dirs
+from mlsuite.failsafe import serializers, snapshots
 
-mlsuite.save_on_del.value(False)
+GlobalOptions.save_on_del.value(False)
 
 
 # TODO I have to change the way of choosing folders
@@ -51,9 +57,7 @@ class AnotherDummyClass(DummyClass):  # It inherits the metaclass flavour
 
 class TestBodyguard(unittest.TestCase):
     def setUp(self) -> None:
-        mlsuite.create_dirs.value(False)
-        dirs.update({'dummy_saves': []})  # TODO dots in directories
-        mlsuite.failsafe_folder.value(dirs.dummy_saves)
+        GlobalOptions.failsafe_folder.value('./dummy_saves')
         GlobalOptions.load_on_init.value(False)
 
         DummyClass.__reset_id__()
@@ -95,8 +99,99 @@ class TestBodyguard(unittest.TestCase):
         self.assertEqual(1, obj2.a)
         self.assertEqual('./dummy_saves/AnotherDummyClass_2.pickle', obj3.a)
 
+    def test_pickle_subclass(self):
+        obj = AnotherDummyClass(1, 2, 3)
+        copy = pickle.loads(pickle.dumps(obj))  # the state of the subclass is not wrapped twice
+        self.assertEqual(obj._oid, copy._oid)
+        self.assertEqual('1 2 3', str(copy))
+
     # TODO keep adding tests, e.g., loader/saver/_load/_save
 
 
+class Model(metaclass=FailSafe):  # saved and loaded with the default functions
+    def __init__(self, size):
+        super().__init__()
+        self.step = 0
+        self.weights = np.arange(size, dtype=np.float64)
+
+
+class TestDefaults(unittest.TestCase):
+    def setUp(self) -> None:
+        self.folder = tempfile.TemporaryDirectory()
+        GlobalOptions.failsafe_folder.value(self.folder.name)
+        GlobalOptions.load_on_init.value(True)
+        Model.__reset_id__()
+        self.models = []
+
+    def tearDown(self) -> None:
+        for model in self.models:
+            model._atexit()  # neither tracked by the snapshots nor saved at exit anymore
+        GlobalOptions.load_on_init.value(False)
+        self.folder.cleanup()
+
+    def restart(self, size=10) -> Model:
+        Model.__reset_id__()  # as in a new run of the program
+        self.models.append(Model(size))
+        return self.models[-1]
+
+    def test_serializers(self):
+        for serializer, start in [('pickle5', serializers.MAGIC), ('chunked', serializers.CHUNKED), ('dill', b'')]:
+            with GlobalOptions.serializer(serializer):
+                model = self.restart(1 << 12)
+                model.remove(model.__path__)
+                model = self.restart(1 << 12)
+                model.step = 3
+                model.save(model.__path__)
+
+                with open(model.__path__, 'rb') as file:
+                    self.assertTrue(file.read().startswith(start))
+                loaded = self.restart()
+                self.assertEqual(3, loaded.step)
+                np.testing.assert_array_equal(np.arange(1 << 12), loaded.weights)
+
+    def test_snapshots(self):
+        with GlobalOptions.snapshot_interval(0.05):
+            model = self.restart()
+            self.assertTrue(snapshots.running())
+            model.step = 5
+            time.sleep(0.3)
+        snapshots.stop()
+        self.assertEqual(5, self.restart().step)
+
+    def test_snapshot_options(self):
+        folder = os.path.join(self.folder.name, 'out')
+        os.mkdir(folder)
+        with GlobalOptions.failsafe_folder(folder), GlobalOptions.serializer('chunked'):
+            model = self.restart()
+            model.step = 4
+            snapshots.snapshot([model]).result()  # saved by another thread, with the options of this context
+
+        with open(os.path.join(folder, 'Model_1.pickle'), 'rb') as file:
+            self.assertTrue(file.read().startswith(serializers.CHUNKED))
+        self.assertFalse(os.path.exists(os.path.join(self.folder.name, 'Model_1.pickle')))
+
+    def test_lazy_restore(self):
+        with GlobalOptions.serializer('chunked'):
+            model = self.restart(1 << 18)  # 2 MiB
+            model.step = 1
+            model.save(model.__path__)
+
+            with GlobalOptions.lazy_restore(True):
+                loaded = self.restart()
+            self.assertNotIn('weights', loaded.__dict__)  # not loaded until accessed
+            self.assertEqual(1, loaded.step)
+            np.testing.assert_array_equal(np.arange(1 << 18), loaded.weights)
+            self.assertIn('weights', loaded.__dict__)
+            self.assertRaises(AttributeError, getattr, loaded, 'missing')
+
+            with GlobalOptions.lazy_restore(True):
+                loaded = self.restart()
+            loaded.step = 2
+            loaded.save(loaded.__path__)  # without loading the weights
+            loaded = self.restart()
+            self.assertEqual(2, loaded.step)
+            np.testing.assert_array_equal(np.arange(1 << 18), loaded.weights)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,54 @@
+import unittest
+import sys
+import pickle
+
+from mlsuite.experiments.arguments import ArgumentsHeader, FrozenArguments
+
+
+class TestFrozen(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.args = ArgumentsHeader({
+            'variable': 4,
+            'model': {'num clusters': '${variable}', 'layers': [1, 2, {'size': 3}]},
+            'x-y': 'not an identifier',
+            'items': 'clashes with a method',
+        })
+
+    def test_resolved(self):
+        frozen = self.args.freeze()
+        self.assertIsInstance(frozen.model, FrozenArguments)
+        self.assertEqual('4', frozen.model.num_clusters)
+        self.assertIs(str, type(frozen.model.num_clusters))
+        self.assertEqual(3, frozen.model.layers[2].size)
+        self.assertEqual('not an identifier', frozen['x-y'])
+        self.assertEqual('clashes with a method', frozen['items'])
+
+    def test_not_root(self):
+        other = ArgumentsHeader({'variable': 5})  # the root of the placeholders from now on
+        self.assertEqual('4', self.args.freeze().model.num_clusters)
+
+    def test_immutable(self):
+        frozen = self.args.freeze()
+        with self.assertRaises(AttributeError):
+            frozen.variable = 5
+        with self.assertRaises(AttributeError):
+            del frozen.model
+
+        self.args.variable = 5
+        self.assertEqual('4', frozen.model.num_clusters)
+
+    def test_to_dict(self):
+        frozen = self.args.freeze()
+        expected = self.args.to_dict()
+        expected['model']['num_clusters'] = '4'
+        self.assertDictEqual(expected, frozen.to_dict())
+
+    def test_pickle(self):
+        frozen = self.args.freeze()
+        self.assertEqual(frozen, pickle.loads(pickle.dumps(frozen)))
+
+
+if __name__ == '__main__':
+    unittest.main()
+    sys.exit(0)
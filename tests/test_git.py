@@ -0,0 +1,104 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import subprocess
+from pathlib import Path
+
+from mlsuite.experiments import git
+from mlsuite.experiments.git import git_revision, same_revision, GitRevision
+from mlsuite.experiments.arguments import ArgumentsHeader
+
+
+def run(*command, cwd):
+    return subprocess.check_output(['git', '-c', 'user.name=test', '-c', 'user.email=test@test', *command],
+                                   cwd=cwd, stderr=subprocess.DEVNULL).decode().strip()
+
+
+@unittest.skipIf(shutil.which('git') is None, 'git is not installed')
+class TestGitRevision(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.folder = tempfile.TemporaryDirectory()
+        self.repo = Path(self.folder.name, 'repo')
+        (self.repo / 'src').mkdir(parents=True)
+        run('init', '-q', cwd=self.repo)
+        (self.repo / 'file.txt').write_text('first')
+        run('add', 'file.txt', cwd=self.repo)
+        run('commit', '-q', '-m', 'first', cwd=self.repo)
+        self.clear()
+
+    def tearDown(self) -> None:
+        self.clear()
+        self.folder.cleanup()
+
+    def clear(self):
+        git._revisions.clear()
+        os.environ.pop(git._ENVIRON, None)
+
+    def head(self):
+        return run('rev-parse', '--short=7', 'HEAD', cwd=self.repo)
+
+    def test_loose_and_packed(self):
+        self.assertEqual(self.head(), git_revision(self.repo / 'src'))
+        run('pack-refs', '--all', cwd=self.repo)
+        self.clear()
+        self.assertFalse(any((self.repo / '.git/refs/heads').iterdir()))
+        self.assertEqual(self.head(), git_revision(self.repo))
+
+    def test_detached(self):
+        (self.repo / 'file.txt').write_text('second')
+        run('commit', '-q', '-am', 'second', cwd=self.repo)
+        run('checkout', '-q', 'HEAD~1', cwd=self.repo)
+        self.assertEqual(self.head(), git_revision(self.repo))
+
+    def test_dirty(self):
+        self.assertEqual(self.head(), git_revision(self.repo, dirty=True))
+        self.clear()
+        (self.repo / 'file.txt').write_text('changed')
+        self.assertEqual(f'{self.head()}-dirty', git_revision(self.repo, dirty=True))
+        self.assertEqual(self.head(), git_revision(self.repo))
+
+    def test_worktree(self):
+        worktree = Path(self.folder.name, 'worktree')
+        run('worktree', 'add', '-q', '--detach', str(worktree), cwd=self.repo)
+        self.assertEqual(self.head(), git_revision(worktree, dirty=True))
+        self.clear()
+        (worktree / 'file.txt').write_text('changed')
+        self.assertEqual(f'{self.head()}-dirty', git_revision(worktree, dirty=True))
+
+    def test_cached(self):
+        revision = git_revision(self.repo)
+        self.assertIn(revision, os.environ[git._ENVIRON])
+        git._revisions.clear()  # as in a child process
+        shutil.rmtree(self.repo / '.git' / 'refs')
+        self.assertEqual(revision, git_revision(self.repo))
+
+    def test_no_repository(self):
+        self.assertEqual('no-git', git_revision(self.folder.name))
+
+    def test_lazy(self):
+        args = ArgumentsHeader({'options': {'git_hash': GitRevision(self.repo)}})
+        self.assertDictEqual({}, git._revisions)
+        self.assertEqual(self.head(), args.to_dict()['options']['git_hash'])
+
+
+class TestSameRevision(unittest.TestCase):
+
+    def test_same(self):
+        self.assertTrue(same_revision('1a2b3c4', '1a2b3c4d5e'))
+        self.assertTrue(same_revision('v1.0-3-g1a2b3c4', '1a2b3c4'))
+        self.assertTrue(same_revision('1a2b3c4-dirty', '1a2b3c4d-dirty'))
+        self.assertTrue(same_revision('no-git', 'no-git'))
+
+    def test_different(self):
+        self.assertFalse(same_revision('1a2b3c4', '1a2b3c5'))
+        self.assertFalse(same_revision('1a2b3c4-dirty', '1a2b3c4'))
+        self.assertFalse(same_revision('no-git', '1a2b3c4'))
+        self.assertFalse(same_revision('v1.0', 'v1.1'))
+
+
+if __name__ == '__main__':
+    unittest.main()
+    sys.exit(0)
@@ -0,0 +1,48 @@
+import unittest
+import sys
+import subprocess
+
+BUDGET = 20000  # microseconds that `import mlsuite` can take, it is around 2000 when nothing heavy is imported
+HEAVY = ['yaml', 'click', 'dotmap', 'dill', 'numpy', 'torch', 'asyncio', 'multiprocessing']
+
+
+def python(code: str, *flags) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *flags, '-c', code], capture_output=True, text=True, check=True)
+
+
+def import_time(module: str) -> int:
+    """Cumulative time (in microseconds) that importing `module` takes according to `python -X importtime`."""
+    for line in python(f'import {module}', '-X', 'importtime').stderr.splitlines():
+        _, cumulative, name = line.split('|')
+        if name.strip() == module:
+            return int(cumulative)
+    raise ValueError(f'{module} was not imported')
+
+
+class TestImports(unittest.TestCase):
+
+    def test_budget(self):
+        elapsed = min(import_time('mlsuite') for _ in range(3))
+        self.assertLess(elapsed, BUDGET, f'import mlsuite took {elapsed}us, check what it imports with '
+                                         f'`python -X importtime -c "import mlsuite"`.')
+
+    def test_nothing_heavy(self):
+        for module in ['mlsuite', 'mlsuite.experiments', 'mlsuite.failsafe', 'mlsuite.pytorch']:
+            loaded = python(f'import sys, {module}; print(*[m for m in {HEAVY} if m in sys.modules])').stdout.split()
+            self.assertListEqual([], loaded, f'import {module} imports {loaded}.')
+
+    def test_lazy_attributes(self):
+        import mlsuite
+        from mlsuite.experiments.arguments import ArgumentsHeader
+        from mlsuite.experiments.experiment import experiment_wrapper, experiment
+
+        self.assertIs(ArgumentsHeader, mlsuite.Arguments)
+        self.assertIs(experiment_wrapper, mlsuite.experiment_wrapper)
+        self.assertIs(experiment, mlsuite.experiments.experiment)  # not the module with the same name
+        self.assertIn('YAMLConfig', dir(mlsuite))
+        self.assertRaises(AttributeError, getattr, mlsuite, 'missing')
+
+
+if __name__ == '__main__':
+    unittest.main()
+    sys.exit(0)
@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+import pickle
+import tempfile
+from pathlib import Path
+
+from mlsuite.options import GlobalOptions
+from mlsuite.experiments.arguments import ArgumentsHeader, Arguments
+from mlsuite.experiments.yaml_handlers import read_yaml, read_yaml_click, Include
+
+
+class TestInclude(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.folder = tempfile.TemporaryDirectory()
+        self.cache = GlobalOptions.yaml_cache_dir(False)
+        self.cache.__enter__()
+
+        root = Path(self.folder.name)
+        (root / 'data').mkdir()
+        (root / 'data' / 'vocab.yml').write_text('size: 3\nwords: [a, b, c]\nnested: !include weights.yml\n')
+        (root / 'data' / 'weights.yml').write_text('weights: [0.5, 0.25, 0.25]\n')
+        (root / 'config.yml').write_text('seed: 7\nvocab: !include data/vocab.yml\nname: vocab-${vocab.size}\n')
+        self.filename = str(root / 'config.yml')
+
+    def tearDown(self) -> None:
+        self.cache.__exit__(None, None, None)
+        self.folder.cleanup()
+
+    def load(self):
+        args = ArgumentsHeader()
+        args.update(read_yaml_click(None, None, [self.filename]))
+        return args
+
+    def test_read_yaml(self):
+        content = read_yaml(self.filename)
+        self.assertEqual(Include(os.path.join(self.folder.name, 'data', 'vocab.yml')), content['vocab'])
+
+    def test_lazy(self):
+        args = self.load()
+        self.assertIsInstance(args._map['vocab'], Include)
+
+        self.assertEqual(3, args.vocab.size)
+        self.assertIsInstance(args._map['vocab'], Arguments)
+        self.assertIsInstance(args.vocab._map['nested'], Include)
+        self.assertEqual([0.5, 0.25, 0.25], args.get_path('vocab.nested.weights'))
+
+    def test_placeholders(self):
+        args = self.load()
+        self.assertEqual('vocab-3', str(args.name))
+
+    def test_to_dict(self):
+        self.assertDictEqual({
+            'seed': 7,
+            'vocab': {'size': 3, 'words': ['a', 'b', 'c'], 'nested': {'weights': [0.5, 0.25, 0.25]}},
+            'name': 'vocab-${vocab.size}',
+        }, self.load().to_dict())
+
+    def test_override(self):
+        args = self.load()
+        args.update({'vocab': {'size': 4}})
+        self.assertEqual(4, args.vocab.size)
+        self.assertEqual(['a', 'b', 'c'], args.vocab.words)
+
+    def test_flat_items(self):
+        self.assertIn(('vocab.nested.weights', [0.5, 0.25, 0.25]), self.load().flat_items())
+
+    def test_pickle(self):
+        args = pickle.loads(pickle.dumps(self.load()))
+        self.assertIsInstance(args._map['vocab'], Include)
+        self.assertEqual(['a', 'b', 'c'], args.vocab.words)
+
+
+if __name__ == '__main__':
+    unittest.main()
+    sys.exit(0)
@@ -0,0 +1,66 @@
+import unittest
+import sys
+import os
+import io
+import tempfile
+import textwrap
+from pathlib import Path
+
+from mlsuite.experiments.launcher import ForkServer, read_runs
+from mlsuite.experiments.yaml_handlers import read_yaml
+
+from helpers import TemporaryCache
+
+MODULE = """
+import click
+from mlsuite import experiment
+
+@click.option('-x', type=int, required=True)
+@experiment(output_dir='results', verbose=False)
+def main(args):
+    print('x is', args.x)
+    if args.x < 0:
+        raise ValueError('negative')
+"""
+
+
+class TestForkServer(TemporaryCache, unittest.TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.folder = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.folder.name)
+        Path('launched_experiment.py').write_text(textwrap.dedent(MODULE))
+        sys.path.insert(0, self.folder.name)
+
+    def tearDown(self) -> None:
+        sys.path.remove(self.folder.name)
+        os.chdir(self.cwd)
+        self.folder.cleanup()
+        super().tearDown()
+
+    def test_runs(self):
+        runs = read_runs(io.StringIO('-x 1 --output-dir results/1\n\n# skipped\n-x -1 --output-dir "results/2"\n'))
+        self.assertListEqual([['-x', '1', '--output-dir', 'results/1'], ['-x', '-1', '--output-dir', 'results/2']], runs)
+
+        finished = []
+        with ForkServer('launched_experiment:main', preload=[]) as server:
+            self.assertIsNotNone(server.startup)
+            results = server.run(runs + [['--unknown']], jobs=2, callback=finished.append)
+
+        self.assertEqual(3, len(finished))
+        self.assertListEqual([0, 1, 2], [r.index for r in results])
+        self.assertListEqual([0, 1, 2], [r.exit_code for r in results])
+        self.assertTrue(all(r.startup is not None and r.startup <= r.duration for r in results))
+
+        self.assertEqual('x is 1\n', Path('results/1/stdout.txt').read_text())
+        self.assertIn('exception_thrown', read_yaml('results/2/config.yml'))
+
+    def test_missing_target(self):
+        self.assertRaises(RuntimeError, ForkServer('launched_experiment:missing', preload=[]).start)
+
+
+if __name__ == '__main__':
+    unittest.main()
+    sys.exit(0)
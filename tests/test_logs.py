@@ -0,0 +1,214 @@
+import unittest
+import sys
+import os
+import io
+import time
+import tempfile
+import itertools
+import threading
+import subprocess
+from pathlib import Path
+
+from mlsuite.experiments.logs import BackgroundWriter, LogReader, capture_fd, index_file, _RotatingFile
+from mlsuite.experiments.experiment import experiment_wrapper
+
+from helpers import TemporaryCache
+
+
+class CountingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, data):
+        self.writes += 1
+        return super().write(data)
+
+
+@experiment_wrapper(output_dir='results', verbose=False, max_log_size=1000, log_backups=2)
+def chatty(args):
+    for i in range(args.lines):
+        print(f'line {i:04d}')
+    raise RuntimeError('the end')
+
+
+@experiment_wrapper(output_dir='captured', verbose=False, capture_fds=True)
+def low_level(args):
+    print('from python')
+    os.write(1, b'from the file descriptor\n')
+    subprocess.run(['echo', 'from a subprocess'])
+    print('to stderr', file=sys.stderr)
+
+
+class TestBackgroundWriter(TemporaryCache, unittest.TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.folder = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.folder.name)
+
+    def tearDown(self) -> None:
+        os.chdir(self.cwd)
+        self.folder.cleanup()
+        super().tearDown()
+
+    def test_order(self):
+        with BackgroundWriter('out.txt') as writer:
+            for i in range(10000):
+                print(i, file=writer)
+            writer.flush()
+            self.assertEqual(10000, len(Path('out.txt').read_text().splitlines()))
+            print('last', file=writer)
+        self.assertListEqual([str(i) for i in range(10000)] + ['last'], Path('out.txt').read_text().splitlines())
+        self.assertRaises(ValueError, writer.write, 'closed')
+
+    def test_close_while_writing(self):
+        writer, written = BackgroundWriter('out.txt'), []
+
+        def write():
+            for i in itertools.count():
+                try:
+                    writer.write(f'{i}\n')
+                except ValueError:  # closed
+                    return
+                written.append(str(i))
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        time.sleep(0.05)
+        writer.close()
+        thread.join()
+        self.assertListEqual(written, Path('out.txt').read_text().splitlines())
+
+    def test_console(self):
+        console = CountingStream()
+        with BackgroundWriter('out.txt', console=console) as writer:
+            for i in range(1000):
+                print(i, file=writer)
+        self.assertEqual(Path('out.txt').read_text(), console.getvalue())
+        self.assertLess(console.writes, 100)
+
+    def test_rotation(self):
+        with BackgroundWriter('out.txt', max_size=100, backups=2) as writer:
+            for i in range(100):
+                writer.write(f'{i:09d}\n')
+                writer.flush()
+
+        self.assertFalse(Path('out.txt.3').exists())
+        self.assertEqual(100, Path('out.txt').stat().st_size)
+        self.assertEqual('000000099', Path('out.txt').read_text().split()[-1])
+        self.assertEqual('000000089', Path('out.txt.1').read_text().split()[-1])
+        self.assertEqual('000000079', Path('out.txt.2').read_text().split()[-1])
+
+    def test_experiment(self):
+        self.assertRaises(RuntimeError, chatty, {'lines': 250})  # it leaves us in the output directory
+        self.assertEqual('line 0249', Path(self.folder.name, 'results/stdout.txt').read_text().split('\n')[-2])
+        self.assertEqual(1000, Path(self.folder.name, 'results/stdout.txt.1').stat().st_size)
+        self.assertTrue(Path(self.folder.name, 'results/stdout.txt.2').exists())
+        self.assertFalse(Path(self.folder.name, 'results/stdout.txt.3').exists())
+
+
+class TestCaptureFd(TemporaryCache, unittest.TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.folder = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.folder.name)
+
+    def tearDown(self) -> None:
+        os.chdir(self.cwd)
+        self.folder.cleanup()
+        super().tearDown()
+
+    def test_capture(self):
+        with capture_fd(2, 'err.txt', max_size=20, backups=1):
+            os.write(2, b'first line\n')
+            subprocess.run(['sh', '-c', 'echo second line >&2'])
+        self.assertEqual('second line\n', Path('err.txt').read_text())
+        self.assertEqual('first line\n', Path('err.txt.1').read_text())
+
+    def test_failed_open(self):
+        before, descriptors = os.fstat(1), set(os.listdir('/proc/self/fd'))
+        with self.assertRaises(FileNotFoundError):
+            with capture_fd(1, 'missing/out.txt', tee=True):
+                pass
+        self.assertEqual(before, os.fstat(1))  # not redirected to the pipe
+        self.assertSetEqual(descriptors, set(os.listdir('/proc/self/fd')))
+
+    def test_experiment(self):
+        low_level({})
+        self.assertEqual('from python\nfrom the file descriptor\nfrom a subprocess\n',
+                         Path(self.folder.name, 'captured/stdout.txt').read_text())
+        self.assertEqual('to stderr\n', Path(self.folder.name, 'captured/stderr.txt').read_text())
+
+
+class TestLogReader(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.folder = tempfile.TemporaryDirectory()
+        self.filename = Path(self.folder.name, 'log.txt')
+        self.index_bytes = _RotatingFile.index_bytes
+        _RotatingFile.index_bytes = 1000
+
+        file = _RotatingFile(self.filename)
+        for step in range(10000):
+            file.write(f'step {step}: loss {1 / (step + 1):.6f}\n' + ('eval\n' if step % 100 == 0 else ''))
+        file.close()
+
+    def tearDown(self) -> None:
+        _RotatingFile.index_bytes = self.index_bytes
+        self.folder.cleanup()
+
+    def test_index(self):
+        with LogReader(self.filename) as reader:
+            self.assertGreater(len(reader._offsets), 100)
+            self.assertEqual(0, reader._offsets[0])
+            for line, offset in zip(reader._lines, reader._offsets):
+                self.assertEqual(b'step ' if line % 101 != 1 else b'eval\n', reader.data[offset:offset + 5])
+
+    def test_reads(self):
+        with LogReader(self.filename) as reader:
+            self.assertListEqual(['step 9998: loss 0.000100\n', 'step 9999: loss 0.000100\n'], reader.tail(2))
+            self.assertEqual('step 7000: loss 0.000143\n', next(reader.lines(reader.step_offset(7000))))
+            self.assertEqual('eval\n', next(reader.lines(reader.line_offset(1 + 101 * 3))))
+            self.assertIsNone(next(reader.lines(reader.step_offset(20000)), None))
+            self.assertEqual(10100, len(list(reader.between(0, time.time() + 1))))
+            self.assertListEqual([], list(reader.between(None, 0)))
+            self.assertLess(len(list(reader.between(time.time() + 10))), 100)  # only after the last entry
+
+    def test_append(self):
+        file = _RotatingFile(self.filename)
+        self.assertEqual(10100, file.lines)
+        file.write('partial')
+        file.write(' line\nlast line\n')
+        file.close()
+
+        with LogReader(self.filename) as reader:
+            self.assertEqual('last line\n', next(reader.lines(reader.line_offset(10101))))
+            self.assertListEqual(['partial line\n', 'last line\n'], reader.tail(2))
+
+    def test_append_without_index(self):
+        index_file(self.filename).unlink()
+        read_size, _RotatingFile.read_size = _RotatingFile.read_size, 1000
+        try:
+            file = _RotatingFile(self.filename)
+            self.assertEqual(10100, file.lines)
+            self.assertTrue(file.at_line_start)
+            file.close()
+        finally:
+            _RotatingFile.read_size = read_size
+
+    def test_cli(self):
+        from click.testing import CliRunner
+        from mlsuite.experiments.logs import main
+
+        result = CliRunner().invoke(main, [str(self.filename), '--step', '500', '-n', '2'])
+        self.assertEqual('step 500: loss 0.001996\neval\n', result.output)
+        self.assertTrue(index_file(self.filename).exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
+    sys.exit(0)
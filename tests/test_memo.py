@@ -0,0 +1,180 @@
+import unittest
+import sys
+import os
+import atexit
+import tempfile
+from pathlib import Path
+from functools import partial
+
+import numpy as np
+
+from mlsuite.failsafe.failsafe import GlobalOptions
+from mlsuite.failsafe.memo import Memo, key, memoize, get_memo
+from mlsuite.failsafe.checkpoints import chunk_folder
+from mlsuite.experiments.arguments import ArgumentsHeader
+
+calls = []
+
+
+def preprocess(data, scale=1, *, name='dataset'):
+    calls.append((name, scale))
+    return {'name': name, 'data': np.asarray(data) * scale}
+
+
+class TestMemo(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.folder = tempfile.TemporaryDirectory()
+        self.memo = Memo(self.folder.name, memory_items=2)
+        calls.clear()
+
+    def tearDown(self) -> None:
+        self.folder.cleanup()
+
+    def test_key(self):
+        self.assertEqual(key(preprocess, ([1, 2],)), key(preprocess, ([1, 2], 1), {'name': 'dataset'}))
+        self.assertEqual(key(preprocess, ({'a': 1, 'b': {2, 3}},)), key(preprocess, ({'b': {3, 2}, 'a': 1},)))
+        self.assertEqual(key(preprocess, (np.arange(5),)), key(preprocess, (np.arange(10)[:5],)))
+        self.assertEqual(key(preprocess, (Path('a/b'),)), key(preprocess, (Path('a') / 'b',)))
+
+        different = [key(preprocess, ([1, 2], 2)), key(preprocess, ([2, 1],)), key(preprocess, ((1, 2),)),
+                     key(preprocess, (np.arange(5.),)), key(preprocess, ([1, 2],), {'name': 'other'}),
+                     key(partial(preprocess, scale=2), ([1, 2],)), key(lambda data: data, ([1, 2],))]
+        self.assertEqual(len(different) + 1, len(set(different + [key(preprocess, ([1, 2],))])))
+
+    def test_placeholders(self):
+        args = ArgumentsHeader({'root': 'A', 'path': '${root}/x'})
+        self.memo.call(preprocess, ([1],), {'name': args.path})
+        args.root = 'B'
+        self.memo.call(preprocess, ([1],), {'name': args.path})
+        self.assertEqual(2, len(calls))  # it points to something else
+        self.memo.call(preprocess, ([1],), {'name': 'B/x'})
+        self.assertEqual(2, len(calls))
+
+    def test_function_changes(self):
+        def local(x):
+            return x + 1
+        first = key(local, (1,))
+
+        def local(x):
+            return x + 2
+        self.assertNotEqual(first, key(local, (1,)))
+
+    def test_call(self):
+        first = self.memo.call(preprocess, ([1, 2], 2))
+        self.assertIs(first, self.memo.call(preprocess, ([1, 2],), {'scale': 2}))  # from memory
+        self.memo.call(preprocess, ([1, 2], 3))
+        self.assertListEqual([('dataset', 2), ('dataset', 3)], calls)
+        self.assertDictEqual({'hits': 1, 'disk_hits': 0, 'misses': 2, 'evictions': 0, 'memory_items': 2},
+                             self.memo.stats())
+
+        memo = Memo(self.folder.name)  # as in another run
+        loaded = memo.call(preprocess, ([1, 2], 2))
+        np.testing.assert_array_equal([2, 4], loaded['data'])
+        self.assertEqual(2, len(calls))
+        self.assertEqual(1, memo.stats()['disk_hits'])
+
+        memo.clear()
+        memo.call(preprocess, ([1, 2], 2))
+        self.assertEqual(3, len(calls))
+
+    def test_memory_lru(self):
+        for scale in [1, 2, 3, 1]:
+            self.memo.call(preprocess, ([1],), {'scale': scale})
+        self.assertEqual(1, self.memo.stats()['disk_hits'])  # the first one was not in memory anymore
+        self.assertEqual(2, self.memo.stats()['memory_items'])
+
+    def test_budget(self):
+        data = np.zeros(1 << 16)  # 512 KiB
+        self.memo.max_size = 1200 << 10
+        for scale in [1, 2, 3]:
+            self.memo.call(preprocess, (data, scale))
+            os.utime(self.memo.path(key(preprocess, (data, scale))), ns=(scale * 10 ** 9, scale * 10 ** 9))
+        self.assertEqual(1, self.memo.stats()['evictions'])
+        self.assertFalse(self.memo.path(key(preprocess, (data, 1))).exists())  # the least recently used
+        self.assertTrue(self.memo.path(key(preprocess, (data, 3))).exists())
+
+        self.memo.max_size = 1
+        self.memo.call(preprocess, (data, 4))
+        self.assertListEqual([self.memo.path(key(preprocess, (data, 4)))], list(Path(self.folder.name).iterdir()))
+
+    def test_chunked(self):
+        data = np.zeros(1 << 16)  # 512 KiB, in the chunks
+        memo = Memo(self.folder.name, serializer='chunked')
+        memo.call(preprocess, (data, 1))
+        path = memo.path(key(preprocess, (data, 1)))
+        self.assertTrue(chunk_folder(path).exists())
+        loaded = Memo(self.folder.name, serializer='chunked').call(preprocess, (data, 1))  # as in another run
+        np.testing.assert_array_equal(data, loaded['data'])
+        self.assertEqual(1, len(calls))
+
+        memo.max_size = 1 << 19  # only the size of the manifests fits, not the one of their chunks
+        memo.call(preprocess, (data, 2))
+        self.assertEqual(1, memo.stats()['evictions'])
+        self.assertFalse(chunk_folder(path).exists())
+
+        memo.clear()
+        self.assertListEqual([], list(Path(self.folder.name).iterdir()))
+
+    def test_memoize(self):
+        previous = GlobalOptions.memo_dir.value()
+        GlobalOptions.memo_dir.value(self.folder.name)
+        try:
+            cached = memoize(preprocess)
+            cached([1], name='a')
+            cached([1], name='a')
+            self.assertListEqual([('a', 1)], calls)
+            self.assertEqual(1, get_memo().stats()['hits'])
+
+            GlobalOptions.memo_dir.value(False)
+            self.assertIsNone(get_memo())
+            cached([1], name='a')
+            self.assertEqual(2, len(calls))
+        finally:
+            GlobalOptions.memo_dir.value(previous)
+
+    def test_serializer(self):
+        previous = GlobalOptions.memo_dir.value()
+        GlobalOptions.memo_dir.value(self.folder.name)
+        try:
+            with GlobalOptions.serializer('chunked'):
+                memoize(preprocess)([1])
+            path = get_memo().path(key(preprocess, ([1],)))
+            self.assertTrue(chunk_folder(path).exists())
+            self.assertEqual('pickle5', get_memo().serializer)
+        finally:
+            GlobalOptions.memo_dir.value(previous)
+
+
+class TestWrapper(unittest.TestCase):
+    """The decorators of `mlsuite.failsafe`, which memoize the results of the functions."""
+
+    def setUp(self) -> None:
+        from mlsuite.failsafe import signals  # installed by the package on the first use of its decorators
+        atexit.unregister(signals.exit_assert)  # pytest does not exit through sys.exit
+
+        self.folder = tempfile.TemporaryDirectory()
+        self.previous = GlobalOptions.memo_dir.value()
+        GlobalOptions.memo_dir.value(self.folder.name)
+        calls.clear()
+
+    def tearDown(self) -> None:
+        GlobalOptions.memo_dir.value(self.previous)
+        self.folder.cleanup()
+
+    def test_decorators(self):
+        from mlsuite.failsafe import failsafe_result, execute_once
+
+        for decorator in [failsafe_result, execute_once]:
+            calls.clear()
+            get_memo().clear()
+            decorated = decorator(preprocess)
+            first = decorated([1, 2], 2)
+            self.assertIs(first, decorated([1, 2], scale=2))
+            np.testing.assert_array_equal([2, 4], first['data'])
+            self.assertListEqual([('dataset', 2)], calls)
+
+
+if __name__ == '__main__':
+    unittest.main()
+    sys.exit(0)
@@ -0,0 +1,87 @@
+import unittest
+import sys
+import os
+import tempfile
+from pathlib import Path
+
+import numpy
+import yaml
+
+from mlsuite.options import GlobalOptions
+from mlsuite.experiments.arguments import ArgumentsHeader
+from mlsuite.experiments.yaml_handlers import read_yaml, read_yaml_click, store_arrays, NpyArray
+
+
+class TestNpy(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.folder = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.folder.name)
+
+        self.cache = GlobalOptions.yaml_cache_dir(False)
+        self.cache.__enter__()
+
+        self.weights = numpy.arange(10, dtype=numpy.float32)
+        numpy.save('weights.npy', self.weights)
+        Path('config.yml').write_text('model:\n  class weights: !npy weights.npy\n')
+
+    def tearDown(self) -> None:
+        self.cache.__exit__(None, None, None)
+        os.chdir(self.cwd)
+        self.folder.cleanup()
+
+    def load(self):
+        args = ArgumentsHeader()
+        args.update(read_yaml_click(None, None, ['config.yml']))
+        return args
+
+    def test_memmap(self):
+        args = self.load()
+        self.assertIsInstance(args.model._map['class_weights'], NpyArray)
+
+        weights = args.model.class_weights
+        self.assertIsInstance(weights, numpy.memmap)
+        numpy.testing.assert_array_equal(self.weights, weights)
+
+    def test_store_arrays(self):
+        args = self.load()
+        args.update({'mask': numpy.ones(3, dtype=bool), 'nested': {'values': [numpy.zeros(2)]}})
+
+        content = store_arrays(args.to_dict(), 'run/arrays')
+        self.assertEqual(NpyArray('run/arrays/model.class_weights.npy'), content['model']['class_weights'])
+        self.assertEqual(NpyArray('run/arrays/nested.values.0.npy'), content['nested']['values'][0])
+
+        text = yaml.safe_dump(content)
+        self.assertIn("mask: !npy 'run/arrays/mask.npy'", text)
+        numpy.testing.assert_array_equal(self.weights, numpy.load('run/arrays/model.class_weights.npy'))
+
+    def test_roundtrip(self):
+        content = self.load().to_dict()
+        os.makedirs('run')
+        os.chdir('run')
+        try:
+            with open('config.yml', 'w') as file:
+                yaml.safe_dump(store_arrays(content), file)
+
+            args = ArgumentsHeader(read_yaml('config.yml'))
+            self.assertIsInstance(args.model._map['class_weights'], NpyArray)
+            numpy.testing.assert_array_equal(self.weights, args.model.class_weights)
+
+            # dumping it again in the same folder keeps the file that is memory-mapped
+            store_arrays(args.to_dict())
+            numpy.testing.assert_array_equal(self.weights, args.model.class_weights)
+        finally:
+            os.chdir('..')
+
+    def test_content_hash(self):
+        args, other = self.load(), ArgumentsHeader({'model': {'class weights': self.weights.copy()}})
+        self.assertEqual(other.content_hash(), args.content_hash())
+
+        other.model.class_weights = self.weights + 1
+        self.assertNotEqual(other.content_hash(), args.content_hash())
+
+
+if __name__ == '__main__':
+    unittest.main()
+    sys.exit(0)
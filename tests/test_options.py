@@ -0,0 +1,110 @@
+import unittest
+import sys
+import asyncio
+import threading
+
+from mlsuite.options import GlobalOptions
+from mlsuite.experiments.arguments import ArgumentsHeader, LazyString
+
+
+class TestOptions(unittest.TestCase):
+
+    def test_with_stmt(self):
+        self.assertTrue(GlobalOptions.replace_placeholders.value())
+        with GlobalOptions.replace_placeholders(False):
+            self.assertFalse(GlobalOptions.replace_placeholders.value())
+            with GlobalOptions.replace_placeholders(True):
+                self.assertTrue(GlobalOptions.replace_placeholders.value())
+            self.assertFalse(GlobalOptions.replace_placeholders.value())
+        self.assertTrue(GlobalOptions.replace_placeholders.value())
+
+    def test_global_value(self):
+        try:
+            GlobalOptions.replace_placeholders.value(False)
+            self.assertFalse(GlobalOptions.replace_placeholders.value())
+
+            values = []
+            thread = threading.Thread(target=lambda: values.append(GlobalOptions.replace_placeholders.value()))
+            thread.start(), thread.join()
+            self.assertListEqual([False], values)
+        finally:
+            GlobalOptions.replace_placeholders.value(True)
+
+    def test_value_within_with(self):
+        try:
+            with GlobalOptions.replace_placeholders(False):
+                GlobalOptions.replace_placeholders.value('set')
+                self.assertEqual('set', GlobalOptions.replace_placeholders.value())
+            self.assertEqual('set', GlobalOptions.replace_placeholders.value())
+        finally:
+            GlobalOptions.replace_placeholders.value(True)
+
+    def test_threads(self):
+        barrier, values = threading.Barrier(2), {}
+
+        def run(value):
+            with GlobalOptions.replace_placeholders(value):
+                barrier.wait()
+                values[value] = GlobalOptions.replace_placeholders.value()
+                barrier.wait()
+
+        threads = [threading.Thread(target=run, args=(value,)) for value in (False, 'other')]
+        [thread.start() for thread in threads]
+        [thread.join() for thread in threads]
+
+        self.assertDictEqual({False: False, 'other': 'other'}, values)
+        self.assertTrue(GlobalOptions.replace_placeholders.value())
+
+    def test_tasks(self):
+        async def read(value):
+            with GlobalOptions.replace_placeholders(value):
+                await asyncio.sleep(0.01)
+                return GlobalOptions.replace_placeholders.value()
+
+        async def main():
+            return await asyncio.gather(*[read(i) for i in range(5)])
+
+        self.assertListEqual(list(range(5)), asyncio.run(main()))
+        self.assertTrue(GlobalOptions.replace_placeholders.value())
+
+
+class TestRoot(unittest.TestCase):
+
+    def test_threads(self):
+        barrier, values = threading.Barrier(2), {}
+
+        def run(value):
+            args = ArgumentsHeader({'value': value, 'name': 'run-${value}'})
+            barrier.wait()
+            values[value] = str(args.name)
+
+        threads = [threading.Thread(target=run, args=(value,)) for value in (1, 2)]
+        [thread.start() for thread in threads]
+        [thread.join() for thread in threads]
+
+        self.assertDictEqual({1: 'run-1', 2: 'run-2'}, values)
+
+    def test_tasks(self):
+        async def run(value):
+            args = ArgumentsHeader({'value': value, 'name': 'run-${value}'})
+            await asyncio.sleep(0.01)
+            return str(args.name)
+
+        async def main():
+            return await asyncio.gather(*[run(i) for i in range(5)])
+
+        self.assertListEqual([f'run-{i}' for i in range(5)], asyncio.run(main()))
+
+    def test_as_root(self):
+        first = ArgumentsHeader({'value': 1, 'name': 'run-${value}'})
+        second = ArgumentsHeader({'value': 2})
+
+        self.assertIs(second, LazyString.root())
+        with first.as_root():
+            self.assertEqual('run-1', str(first.name))
+        self.assertIs(second, LazyString.root())
+
+
+if __name__ == '__main__':
+    unittest.main()
+    sys.exit(0)
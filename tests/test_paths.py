@@ -0,0 +1,83 @@
+import unittest
+import sys
+
+from mlsuite.experiments.arguments import ArgumentsHeader, Arguments
+
+
+class TestPaths(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.args = ArgumentsHeader({
+            'seed': 7,
+            'model': {'optimizer': {'lr': 1e-3, 'name': 'adam'}, 'num clusters': '${seed}'},
+        })
+
+    def check_index(self):
+        self.assertEqual({path for path, *_ in self.args._walk()}, set(self.args._index.keys()))
+
+    def test_get_path(self):
+        self.assertEqual(1e-3, self.args.get_path('model.optimizer.lr'))
+        self.assertEqual('7', str(self.args.get_path('model.num clusters')))
+        self.assertIsInstance(self.args.get_path('model.optimizer'), Arguments)
+        self.assertRaises(AttributeError, self.args.get_path, 'model.missing')
+
+    def test_set_paths(self):
+        self.args.set_paths({'model.optimizer.lr': 0.1, 'model.scheduler.gamma': 0.5, 'seed': 3})
+        self.assertEqual(0.1, self.args.model.optimizer.lr)
+        self.assertEqual(0.5, self.args.model.scheduler.gamma)
+        self.assertEqual('3', str(self.args.model.num_clusters))
+        self.assertRaises(AssertionError, self.args.set_paths, {'seed.value': 1})
+        self.check_index()
+
+    def test_flat_items(self):
+        self.assertDictEqual({
+            'seed': 7,
+            'model.optimizer.lr': 1e-3,
+            'model.optimizer.name': 'adam',
+            'model.num_clusters': '${seed}',
+        }, dict(self.args.flat_items()))
+        self.assertListEqual(self.args.flat_items(), Arguments(self.args.to_dict()).flat_items())
+
+    def test_index_maintenance(self):
+        self.args.model.optimizer = Arguments({'momentum': 0.9})
+        self.check_index()
+        self.assertRaises(AttributeError, self.args.get_path, 'model.optimizer.lr')
+
+        self.args.update({'model': {'dropout': 0.2}})
+        self.args.model.pop('num_clusters')
+        self.check_index()
+        self.assertEqual(0.2, self.args.get_path('model.dropout'))
+
+        del self.args.model
+        self.assertDictEqual({'seed': 7}, dict(self.args.flat_items()))
+
+
+    def test_detached(self):
+        optimizer, model = self.args.model.optimizer, self.args.model
+        del self.args.model
+        optimizer.lr = 100  # not part of the arguments anymore
+        self.assertRaises(AttributeError, self.args.get_path, 'model.optimizer.lr')
+        self.check_index()
+
+        self.args.model = model  # back in its place
+        self.assertEqual(100, self.args.get_path('model.optimizer.lr'))
+        self.check_index()
+
+        self.args.model = Arguments({'optimizer': {'lr': 1}})
+        model.optimizer.lr = 3
+        self.args.model.update({'scheduler': {'gamma': 0.5}})
+        self.assertEqual(1, self.args.get_path('model.optimizer.lr'))
+        self.check_index()
+
+    def test_moved(self):
+        other = ArgumentsHeader({'section': {'lr': 1}})
+        self.args.moved = other.section  # it is still in the other arguments
+        self.args.moved.lr = 2
+        self.assertEqual(1, other.get_path('section.lr'))
+        self.assertEqual(2, self.args.get_path('moved.lr'))
+        self.check_index()
+
+
+if __name__ == '__main__':
+    unittest.main()
+    sys.exit(0)
@@ -0,0 +1,65 @@
+import unittest
+import sys
+import pickle
+
+import dill
+
+from mlsuite.experiments.arguments import ArgumentsHeader, Arguments, LazyString
+
+
+class TestPickle(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.args = ArgumentsHeader({
+            'seed': 7,
+            'empty': {},
+            'model': {'num clusters': '${seed}', 'layers': [1, 2, {'size': 3}], 'dropout': None},
+        })
+        self.resolved = {'seed': 7, 'empty': {}, 'model': {'num_clusters': '7', 'layers': [1, 2, {'size': 3}], 'dropout': None}}
+
+    def test_roundtrip(self):
+        for module in (pickle, dill):
+            args = module.loads(module.dumps(self.args))
+            self.assertIsInstance(args, ArgumentsHeader)
+            self.assertDictEqual(self.resolved, args.to_dict())
+            self.assertIsInstance(args.model.num_clusters, LazyString)
+            self.assertIs(args, args.model._parent)
+
+    def test_own_root(self):
+        args = ArgumentsHeader({'k': 'v1', 'x': '${k}', 'dir': '${pwd}/results'})
+        ArgumentsHeader({'k': 'v2', 'x': '${k}'})  # the root of the current context now
+        copy = pickle.loads(pickle.dumps(args))
+        self.assertEqual('v1', str(copy.x))
+        self.assertEqual('${pwd}/results', str.__str__(copy.dir))  # not resolved yet, kept as it is
+        copy.pwd = '/tmp'
+        self.assertEqual('/tmp/results', str(copy.dir))
+
+    def test_lazy(self):
+        args = pickle.loads(pickle.dumps(self.args))
+        self.assertIn('_wire', args.__dict__)
+        self.assertIs(args, LazyString.root())
+
+        forwarded = pickle.loads(pickle.dumps(args))
+        self.assertIn('_wire', args.__dict__)
+
+        self.assertEqual('7', str(forwarded.get_path('model.num_clusters')))
+        self.assertNotIn('_wire', forwarded.__dict__)
+
+    def test_usable(self):
+        args = pickle.loads(pickle.dumps(self.args))
+        args.set_paths({'model.optimizer.lr': 0.1})
+        self.assertEqual(0.1, args.model.optimizer.lr)
+        self.assertEqual(ArgumentsHeader(args.to_dict()).content_hash(), args.content_hash())
+
+    def test_section(self):
+        model = pickle.loads(pickle.dumps(self.args.model))
+        self.assertIs(Arguments, type(model))
+        self.assertDictEqual(self.resolved['model'], model.to_dict())
+
+    def test_compact(self):
+        self.assertNotIn(b'LazyString', pickle.dumps(self.args))
+
+
+if __name__ == '__main__':
+    unittest.main()
+    sys.exit(0)
@@ -0,0 +1,66 @@
+import unittest
+import sys
+
+from mlsuite.experiments.arguments import ArgumentsHeader, Arguments
+
+
+class TestPlaceholders(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.args = ArgumentsHeader({
+            'variable': 4,
+            'model': {'num clusters': '${variable}'},
+            'name': 'clusters-${model.num_clusters}',
+            'other': 'unrelated ${device}',
+            'device': 'cpu',
+        })
+
+    def test_resolution(self):
+        self.assertEqual('clusters-4', str(self.args.name))
+        self.assertEqual('unrelated cpu', str(self.args.other))
+
+    def test_cached(self):
+        str(self.args.name)
+        self.assertIn('clusters-${model.num_clusters}', self.args._resolved)
+        self.assertEqual({'model.num_clusters', 'variable'},
+                         self.args._dependencies['clusters-${model.num_clusters}'])
+
+    def test_invalidation(self):
+        str(self.args.name), str(self.args.other)
+
+        self.args.variable = 5
+        self.assertNotIn('clusters-${model.num_clusters}', self.args._resolved)
+        self.assertIn('unrelated ${device}', self.args._resolved)
+        self.assertEqual('clusters-5', str(self.args.name))
+
+        self.args.update({'model': {'num clusters': 7}})
+        self.assertEqual('clusters-7', str(self.args.name))
+
+        self.args.model = Arguments({'num clusters': 8})
+        self.assertEqual('clusters-8', str(self.args.name))
+
+        self.args.model.num_clusters = 9
+        self.assertEqual('clusters-9', str(self.args.name))
+
+    def test_invalidation_in_place(self):
+        self.assertEqual('clusters-4', str(self.args.name))
+        content_hash = self.args.model.content_hash()
+
+        self.args.model.clear()
+        self.assertRaises(AttributeError, str, self.args.name)
+        self.assertRaises(AttributeError, self.args.get_path, 'model.num_clusters')
+        self.assertNotEqual(content_hash, self.args.model.content_hash())
+
+        self.args.model.setdefault('num_clusters', 6)
+        self.assertEqual('clusters-6', str(self.args.name))
+        self.assertEqual(('num_clusters', 6), self.args.model.popitem())
+        self.assertRaises(AttributeError, str, self.args.name)
+
+    def test_cycles(self):
+        self.args.update({'a': '${b}', 'b': 'x ${a}'})
+        self.assertRaises(ValueError, str, self.args.a)
+
+
+if __name__ == '__main__':
+    unittest.main()
+    sys.exit(0)
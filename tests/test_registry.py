@@ -0,0 +1,101 @@
+import unittest
+import sys
+import os
+import time
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from mlsuite.options import GlobalOptions
+from mlsuite.experiments.registry import Registry, get_registry
+from mlsuite.experiments.arguments import ArgumentsHeader
+from mlsuite.experiments.concurrent import run_concurrent
+from mlsuite.experiments.experiment import experiment_wrapper
+from mlsuite.experiments.yaml_handlers import Include
+
+
+@experiment_wrapper(output_dir='results/${name}', verbose=False)
+def train(args):
+    if args.value < 0:
+        raise ValueError('negative value')
+
+
+class TestRegistry(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.folder = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.folder.name)
+
+        self.previous = GlobalOptions.registry_file.value()
+        GlobalOptions.registry_file.value(os.path.join(self.folder.name, 'runs.sqlite'))
+        self.registry = get_registry()
+
+    def tearDown(self) -> None:
+        GlobalOptions.registry_file.value(self.previous)
+        os.chdir(self.cwd)
+        self.folder.cleanup()
+
+    def test_runs(self):
+        self.assertRaises(ValueError, train, {'name': 'failed', 'value': -1})
+        os.chdir(self.folder.name)
+        train({'name': 'finished', 'value': 1})
+
+        failed, finished = self.registry.runs()
+        self.assertEqual('failed', failed['status'])
+        self.assertEqual('ValueError: negative value', failed['exception'])
+        self.assertEqual(str(Path(self.folder.name, 'results/failed').absolute()), failed['output_dir'])
+
+        self.assertEqual('finished', finished['status'])
+        self.assertIsNone(finished['exception'])
+        self.assertGreaterEqual(finished['duration'], 0)
+        self.assertEqual(ArgumentsHeader({'name': 'finished', 'value': 1}).content_hash(), finished['config_hash'])
+        self.assertEqual(finished, self.registry.latest(Path(self.folder.name, 'results/finished')))
+
+    def test_lazy(self):
+        Path(self.folder.name, 'section.yml').write_text('size: 3\n')
+        seen = {}
+
+        @experiment_wrapper(output_dir='results/lazy', verbose=False)
+        def check(args):
+            seen['loads'] = load.call_count
+            seen['data'] = str(args.data)
+
+        with mock.patch.object(Include, 'load', autospec=True, side_effect=lambda include: {'size': 3}) as load:
+            check({'data': '${pwd}/data', 'section': Include(os.path.join(self.folder.name, 'section.yml'))})
+
+        # neither resolved nor loaded before the run (only once it finished, to hash them)
+        self.assertDictEqual({'loads': 0, 'data': os.path.join(self.folder.name, 'data')}, seen)
+        self.assertIsNotNone(self.registry.runs()[0]['config_hash'])
+
+    def test_concurrent(self):
+        errors = run_concurrent(train, [{'name': f'run{i}', 'value': i - 5} for i in range(20)], jobs=8)
+        self.assertEqual(5, sum(e is not None for e in errors))
+        self.assertEqual(20, self.registry.count())
+        self.assertEqual(5, self.registry.count(status='failed'))
+        self.assertEqual(15, self.registry.count(status=['finished', 'running']))
+
+    def test_queries(self):
+        registry = Registry(os.path.join(self.folder.name, 'other.sqlite'))
+        now = time.time()
+        for i in range(10):
+            run_id = registry.start(f'results/{i}', started=now + i, timestamp=str(i))
+            registry.finish(run_id, status='finished' if i % 2 else 'failed', git_hash='abc' if i < 5 else 'def')
+        registry.flush()
+
+        self.assertEqual(10, registry.count())
+        self.assertEqual(3, registry.count(status='failed', git_hash='abc'))
+        self.assertListEqual(['9', '8'], [r['timestamp'] for r in registry.runs(order='-started', limit=2)])
+        self.assertListEqual(['2', '3'], [r['timestamp'] for r in registry.runs(since=now + 2, until=now + 3)])
+        self.assertEqual(0, registry.count(exception='error'))
+        self.assertEqual(10, registry.count(exception=None))
+        self.assertRaises(AssertionError, registry.runs, unknown=1)
+
+    def test_disabled(self):
+        with GlobalOptions.registry_file(False):
+            self.assertIsNone(get_registry())
+
+
+if __name__ == '__main__':
+    unittest.main()
+    sys.exit(0)
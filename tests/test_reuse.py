@@ -0,0 +1,144 @@
+import unittest
+import sys
+import os
+import tempfile
+from pathlib import Path
+
+import yaml
+
+from mlsuite.experiments.experiment import experiment_wrapper
+
+from helpers import TemporaryCache
+
+calls_file = None  # written by the runs, also from other processes
+
+
+def train(args):
+    with open(calls_file, 'a') as file:
+        file.write(f'{args.value}\n')
+    if args.value < 0:
+        raise ValueError('negative value')
+
+
+def evaluate(args):  # another experiment, with the same configurations
+    train(args)
+
+
+class TestReuse(TemporaryCache, unittest.TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.folder = tempfile.TemporaryDirectory()
+        self.root = Path(self.folder.name)
+        self.cwd = os.getcwd()
+        os.chdir(self.root)
+
+        global calls_file
+        calls_file = self.root / 'calls.txt'
+        calls_file.touch()
+
+    def tearDown(self) -> None:
+        os.chdir(self.cwd)
+        self.folder.cleanup()
+        super().tearDown()
+
+    def store(self):
+        return [path for path in (self.root / 'store').iterdir() if not path.name.startswith('.')]  # not the locks
+
+    def calls(self):
+        return [int(value) for value in calls_file.read_text().split()]
+
+    def run_train(self, output_dir, value, func=train, **options):
+        os.chdir(self.root)
+        options = {'git_hash': '1a2b3c4', **options}  # not in a repository
+        experiment_wrapper(output_dir=str(self.root / output_dir), verbose=False, **options)(func)({'value': value})
+
+    def test_reuse(self):
+        self.run_train('a', 1, reuse=True)
+        self.run_train('b', 1, reuse=True)
+        self.run_train('c', 2, reuse=True)
+        self.run_train('a', 1, reuse=True)  # its own results
+        self.assertListEqual([1, 2], self.calls())
+
+        self.assertTrue((self.root / 'b').is_symlink())
+        self.assertEqual((self.root / 'a').resolve(), (self.root / 'b').resolve())
+        self.assertFalse((self.root / 'c').is_symlink())
+
+        self.run_train('d', 1)  # not unless asked
+        self.assertListEqual([1, 2, 1], self.calls())
+
+    def test_failed(self):
+        self.assertRaises(ValueError, self.run_train, 'a', -1, reuse=True)
+        self.assertRaises(ValueError, self.run_train, 'b', -1, reuse=True)
+        self.assertListEqual([-1, -1], self.calls())
+
+    def test_revision(self):
+        for output_dir in 'ab':
+            self.run_train(output_dir, 1, reuse=True, git_hash='1a2b3c4-dirty')
+        for output_dir in 'cd':
+            self.run_train(output_dir, 1, reuse=True)
+        self.run_train('e', 1, reuse=True, git_hash='5d6e7f8')
+        self.run_train('f', 1, reuse=True, git_hash='no-git')
+        self.assertListEqual([1, 1, 1, 1, 1], self.calls())
+
+    def test_content_addressed(self):
+        self.run_train('a', 1, content_addressed=str(self.root / 'store'))
+        self.run_train('b', 1, content_addressed=str(self.root / 'store'))
+        self.assertListEqual([1], self.calls())
+
+        runs = self.store()
+        self.assertEqual(1, len(runs))
+        self.assertTrue((runs[0] / 'config.yml').is_file())
+        for output_dir in 'ab':
+            self.assertTrue((self.root / output_dir).is_symlink())
+            self.assertEqual(runs[0], (self.root / output_dir).resolve())
+
+        (self.root / 'c').mkdir()
+        self.assertRaises(FileExistsError, self.run_train, 'c', 2, content_addressed=str(self.root / 'store'))
+
+    def test_experiments(self):
+        self.run_train('a', 1, reuse=True)
+        self.run_train('b', 1, func=evaluate, reuse=True)
+        self.assertListEqual([1, 1], self.calls())
+        self.assertFalse((self.root / 'b').is_symlink())
+
+        self.run_train('c', 2, content_addressed=str(self.root / 'store'))
+        self.run_train('d', 2, func=evaluate, content_addressed=str(self.root / 'store'))
+        self.run_train('e', 2, func=evaluate, content_addressed=str(self.root / 'store'))
+        self.assertListEqual([1, 1, 2, 2], self.calls())
+        self.assertEqual(2, len(self.store()))
+        self.assertTrue((self.root / 'd').resolve().name.startswith(f'{__name__}.evaluate-'))
+        self.assertEqual((self.root / 'd').resolve(), (self.root / 'e').resolve())
+
+    def test_sweep(self):
+        (self.root / 'sweep.yml').write_text(yaml.safe_dump({'grid': {'value': [1, 2, 1, 2, 3]}}))
+        self.run_train('sweep/runs', 0, sweep=str(self.root / 'sweep.yml'), content_addressed=str(self.root / 'store'))
+
+        self.assertListEqual([1, 2, 3], self.calls())
+        self.assertEqual(3, len(self.store()))
+        self.assertEqual((self.root / 'sweep/runs/0').resolve(), (self.root / 'sweep/runs/2').resolve())
+
+    def test_concurrent_sweep(self):
+        (self.root / 'sweep.yml').write_text(yaml.safe_dump({'grid': {'value': [1, 1, 1, 1]}}))
+        self.run_train('sweep/runs', 0, sweep=str(self.root / 'sweep.yml'), jobs=4,
+                       content_addressed=str(self.root / 'store'))
+
+        self.assertListEqual([1], self.calls())  # the rest waited for it and reused it
+        self.assertEqual(1, len(self.store()))
+        for i in range(4):
+            self.assertEqual(self.store()[0], (self.root / f'sweep/runs/{i}').resolve())
+
+    def test_unfinished(self):
+        self.assertRaises(ValueError, self.run_train, 'a', -1, content_addressed=str(self.root / 'store'))
+        (self.root / 'a' / 'partial.txt').write_text('')
+
+        # started over instead of failing because the folder exists
+        self.assertRaises(ValueError, self.run_train, 'b', -1, content_addressed=str(self.root / 'store'))
+        self.assertListEqual([-1, -1], self.calls())
+        self.assertTrue((self.root / 'b' / 'config.yml').is_file())
+        self.assertFalse((self.root / 'b' / 'partial.txt').exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
+    sys.exit(0)
@@ -0,0 +1,129 @@
+import unittest
+import sys
+import tempfile
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+
+from mlsuite.failsafe import serializers
+from mlsuite.failsafe.serializers import dump, load, register_serializer, MAGIC, ALIGNMENT
+
+
+class State:
+    def __init__(self):
+        self.weights = np.arange(1 << 16, dtype=np.float32).reshape(256, 256)
+        self.small = np.ones(3)
+        self.strided = self.weights[:, ::2]
+        self.step = 7
+
+
+class Unpicklable:
+    def __reduce__(self):
+        raise TypeError('cannot pickle it')
+
+
+class TestSerializers(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = Path(self.folder.name, 'state.pickle')
+
+    def tearDown(self) -> None:
+        self.folder.cleanup()
+
+    def assertState(self, state):
+        self.assertIsInstance(state, State)
+        np.testing.assert_array_equal(State().weights, state.weights)
+        np.testing.assert_array_equal(State().strided, state.strided)
+        np.testing.assert_array_equal(np.ones(3), state.small)
+        self.assertEqual(7, state.step)
+
+    def test_out_of_band(self):
+        state = State()
+        dump(state, self.path)
+
+        content = self.path.read_bytes()
+        self.assertTrue(content.startswith(MAGIC))
+        offset = content.find(state.weights.tobytes())
+        self.assertGreater(offset, 0)
+        self.assertEqual(0, offset % ALIGNMENT)
+        self.assertEqual(-1, content.find(state.weights.tobytes(), offset + 1))  # not in the pickle stream as well
+
+        loaded = load(self.path)
+        self.assertState(loaded)
+        loaded.weights[0, 0] = -1  # writable
+
+    def test_mmap(self):
+        dump(State(), self.path)
+        state = load(self.path, mmap_mode=True)
+        self.assertState(state)
+
+        state.weights[0, 0] = -1  # copy on write, the file is not modified
+        self.assertState(load(self.path))
+
+    def test_dill_fallback(self):
+        weights = np.arange(1 << 12, dtype=np.float64)
+        dump({'function': lambda x: x + 1, 'weights': weights}, self.path)
+        loaded = load(self.path)
+        self.assertEqual(2, loaded['function'](1))
+        np.testing.assert_array_equal(weights, loaded['weights'])
+        self.assertGreater(self.path.read_bytes().find(weights.tobytes()), 0)
+
+    def test_dill(self):
+        dump(State(), self.path, serializer='dill')
+        self.assertFalse(self.path.read_bytes().startswith(MAGIC))
+        self.assertState(load(self.path, serializer='dill'))
+        self.assertState(load(self.path))  # files of the original format can still be loaded
+
+        dump(State(), self.path)
+        self.assertState(load(self.path, serializer='dill'))
+
+    def test_atomic(self):
+        dump(State(), self.path)
+        self.assertRaises(TypeError, dump, {'broken': Unpicklable()}, self.path)
+        self.assertState(load(self.path))
+        self.assertListEqual([self.path], list(self.path.parent.iterdir()))
+
+    def test_register(self):
+        register_serializer('text', lambda obj, path: Path(path).write_text(repr(obj)),
+                            lambda path: eval(Path(path).read_text()))
+        try:
+            dump([1, 2], self.path, serializer='text')
+            self.assertListEqual([1, 2], load(self.path, serializer='text'))
+        finally:
+            del serializers.serializers['text']
+        self.assertRaises(AssertionError, dump, [1, 2], self.path, serializer='text')
+
+
+
+@unittest.skipIf(importlib.util.find_spec('torch') is None, 'torch is not installed')
+class TestTensors(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = Path(self.folder.name, 'tensors.pickle')
+
+    def tearDown(self) -> None:
+        self.folder.cleanup()
+
+    def test_storages(self):
+        import torch
+        weights = torch.arange(1 << 12, dtype=torch.float32)
+        state = {'weights': weights, 'matrix': weights.view(64, 64)[:, 1:], 'half': torch.ones(3, dtype=torch.bfloat16),
+                 'grad': torch.ones(1 << 10, requires_grad=True) * 2}  # .numpy() rejects the last two
+        dump(state, self.path)
+        self.assertGreater(self.path.read_bytes().find(weights.numpy().tobytes()), 0)  # out of band
+
+        loaded = load(self.path)
+        for key, tensor in state.items():
+            torch.testing.assert_close(tensor.detach(), loaded[key].detach())
+        self.assertTrue(loaded['grad'].requires_grad)
+
+        loaded['weights'][1] = -1  # the views of the same storage are still shared
+        self.assertEqual(-1, loaded['matrix'][0, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
+    sys.exit(0)
@@ -0,0 +1,87 @@
+import unittest
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from mlsuite.failsafe import snapshots, serializers
+from mlsuite.failsafe.snapshots import snapshot, track, untrack
+
+
+class Counter:
+    def __init__(self, path):
+        self.path = str(path)
+        self.step = 0
+        self.data = np.zeros(1 << 16)
+
+    @property
+    def __path__(self):
+        return self.path
+
+    def save(self, path):
+        serializers.dump(self, path)
+
+
+class TestSnapshots(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.folder = tempfile.TemporaryDirectory()
+        self.counter = Counter(Path(self.folder.name, 'counter.pickle'))
+
+    def tearDown(self) -> None:
+        snapshots.stop()
+        untrack(self.counter)
+        self.folder.cleanup()
+
+    def load(self):
+        return serializers.load(self.counter.path)
+
+    def check_snapshot(self, mode):
+        self.counter.step = 1
+        future = snapshot([self.counter], mode=mode)
+        self.counter.step, self.counter.data[0] = 2, 2  # after the snapshot
+
+        future.result()
+        loaded = self.load()
+        self.assertEqual(1, loaded.step)
+        self.assertEqual(0, loaded.data[0])
+
+    def test_thread(self):
+        self.check_snapshot('thread')
+
+    def test_fork(self):
+        self.check_snapshot('fork')
+
+    def test_tracked(self):
+        track(self.counter)
+        snapshot()
+        snapshots.wait()
+        self.assertEqual(0, self.load().step)
+
+    def test_periodic(self):
+        track(self.counter)
+        snapshots.start(0.01)
+        for step in range(1, 100):
+            self.counter.step = step
+            time.sleep(0.005)
+            if step > 20 and Path(self.counter.path).exists() and self.load().step > 10:
+                break
+        snapshots.stop()
+        self.assertFalse(snapshots.running())
+        self.assertGreater(self.load().step, 10)
+
+    def test_failed(self):
+        snapshot([self.counter]).result()
+        self.counter.step, self.counter.values = 3, (i for i in range(3))  # it cannot be pickled
+
+        self.assertRaises(TypeError, snapshot, [self.counter])
+        self.assertRaises(RuntimeError, snapshot([self.counter], mode='fork').result)
+        self.assertEqual(0, self.load().step)
+        self.assertListEqual([Path(self.counter.path)], list(Path(self.folder.name).iterdir()))
+
+
+if __name__ == '__main__':
+    unittest.main()
+    sys.exit(0)
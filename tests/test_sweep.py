@@ -0,0 +1,80 @@
+import unittest
+import sys
+import os
+import tempfile
+from pathlib import Path
+
+from mlsuite.experiments.experiment import experiment_wrapper
+from mlsuite.experiments.sweep import expand_sweep
+from mlsuite.experiments.yaml_handlers import read_yaml
+
+from helpers import TemporaryCache
+
+
+@experiment_wrapper(output_dir='results', jobs=2)
+def train(args):
+    print(f'lr={args.lr} name={args.name}')
+    if args.lr > 0.5:
+        raise ValueError('lr too large')
+
+
+class TestExpand(unittest.TestCase):
+
+    def test_grid(self):
+        points = expand_sweep({'grid': {'a': [1, 2], 'b.c': ['x', 'y', 'z']}})
+        self.assertEqual(6, len(points))
+        self.assertDictEqual({'a': 2, 'b.c': 'z'}, points[-1])
+
+    def test_zip(self):
+        points = expand_sweep({'zip': {'a': [1, 2], 'b': [3, 4]}, 'grid': {'c': [5, 6]}})
+        self.assertListEqual([{'c': 5, 'a': 1, 'b': 3}, {'c': 5, 'a': 2, 'b': 4},
+                              {'c': 6, 'a': 1, 'b': 3}, {'c': 6, 'a': 2, 'b': 4}], points)
+        self.assertRaises(AssertionError, expand_sweep, {'zip': {'a': [1, 2], 'b': [3]}})
+
+    def test_random(self):
+        spec = {'random': {'samples': 20, 'seed': 3, 'axes': {
+            'u': {'uniform': [0, 1]}, 'l': {'loguniform': [1e-4, 1e-1]}, 'c': {'choice': ['x', 'y']},
+            'i': {'randint': [1, 3]}, 'plain': [True, False]
+        }}}
+        points = expand_sweep(spec)
+        self.assertEqual(20, len(points))
+        self.assertListEqual(points, expand_sweep(spec))
+        self.assertTrue(all(0 <= p['u'] <= 1 and 1e-4 <= p['l'] <= 1e-1 and p['i'] in (1, 2, 3) for p in points))
+        self.assertRaises(ValueError, expand_sweep, {'random': {'axes': {'a': {'normal': [0, 1]}}}})
+
+    def test_empty(self):
+        self.assertListEqual([{}], expand_sweep({}))
+
+
+class TestRunSweep(TemporaryCache, unittest.TestCase):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.folder = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.folder.name)
+        Path('sweep.yml').write_text('grid:\n  lr: [0.1, 0.01]\nzip:\n  seed: [1, 2]\n')
+
+    def tearDown(self) -> None:
+        os.chdir(self.cwd)
+        self.folder.cleanup()
+        super().tearDown()
+
+    def test_runs(self):
+        train({'lr': 1.0, 'seed': 0, 'name': 'run-${seed}'}, options={'sweep': 'sweep.yml'})
+        self.assertEqual(self.folder.name, os.path.realpath(os.getcwd()))
+
+        runs = read_yaml('results/sweep.yml')['runs']
+        self.assertListEqual([f'results/{i}' for i in range(4)], [run['output_dir'] for run in runs])
+        self.assertEqual('lr=0.01 name=run-2\n', Path('results/3/stdout.txt').read_text())
+        self.assertEqual(2, read_yaml('results/3/config.yml')['seed'])
+
+    def test_failures(self):
+        Path('sweep.yml').write_text('grid:\n  lr: [0.1, 1.0]\n')
+        self.assertRaises(RuntimeError, train, {'lr': 1.0, 'seed': 0, 'name': 'run'}, options={'sweep': 'sweep.yml'})
+        self.assertIn('exception_thrown', read_yaml('results/1/config.yml'))
+
+
+if __name__ == '__main__':
+    unittest.main()
+    sys.exit(0)
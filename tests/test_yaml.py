@@ -0,0 +1,94 @@
+import unittest
+import sys
+import os
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from mlsuite.options import GlobalOptions
+from mlsuite.experiments import yaml_handlers
+from mlsuite.experiments.yaml_handlers import read_yaml, read_yaml_click
+
+
+class TestReadYAML(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.folder = tempfile.TemporaryDirectory()
+        self.cache = GlobalOptions.yaml_cache_dir(os.path.join(self.folder.name, 'cache'))
+        self.cache.__enter__()
+
+        self.filename = os.path.join(self.folder.name, 'config.yml')
+        with open(self.filename, 'w') as file:
+            file.write('seed: 7\nmodel:\n  layers: [1, 2, 3]\n')
+
+        yaml_handlers._parsed.clear()
+
+    def tearDown(self) -> None:
+        self.cache.__exit__(None, None, None)
+        self.folder.cleanup()
+
+    def count_parses(self, func):
+        with mock.patch.object(yaml_handlers, '_parse_yaml', wraps=yaml_handlers._parse_yaml) as parse:
+            func()
+            return parse.call_count
+
+    def test_content(self):
+        self.assertDictEqual({'seed': 7, 'model': {'layers': [1, 2, 3]}}, read_yaml(self.filename))
+        self.assertDictEqual(read_yaml(self.filename, cache=False), read_yaml(self.filename))
+
+    def test_memory_cache(self):
+        self.assertEqual(1, self.count_parses(lambda: [read_yaml(self.filename) for _ in range(3)]))
+
+        content = read_yaml(self.filename)
+        content['model']['layers'].append(4)
+        self.assertListEqual([1, 2, 3], read_yaml(self.filename)['model']['layers'])
+
+    def test_disk_cache(self):
+        read_yaml(self.filename)
+        self.assertEqual(1, len(os.listdir(os.path.join(self.folder.name, 'cache'))))
+
+        yaml_handlers._parsed.clear()
+        self.assertEqual(0, self.count_parses(lambda: read_yaml(self.filename)))
+
+        with GlobalOptions.yaml_cache_dir(False):
+            yaml_handlers._parsed.clear()
+            self.assertEqual(1, self.count_parses(lambda: read_yaml(self.filename)))
+
+    def test_bounded(self):
+        for i in range(5):
+            Path(self.folder.name, f'{i}.yml').write_text(f'value: {"x" * 1000}{i}\n')
+        with GlobalOptions.yaml_cache_size(2500), mock.patch.object(yaml_handlers, '_PARSED_ITEMS', 2):
+            for i in range(5):
+                read_yaml(os.path.join(self.folder.name, f'{i}.yml'))
+
+            self.assertEqual(2, len(yaml_handlers._parsed))
+            self.assertEqual(2, len(os.listdir(os.path.join(self.folder.name, 'cache'))))
+            yaml_handlers._parsed.clear()
+            self.assertEqual(0, self.count_parses(lambda: read_yaml(os.path.join(self.folder.name, '4.yml'))))
+
+    def test_safe_load_untouched(self):
+        import yaml
+        self.assertRaises(yaml.constructor.ConstructorError, yaml.safe_load, '!include other.yml')
+
+    def test_modified(self):
+        read_yaml(self.filename)
+        with open(self.filename, 'a') as file:
+            file.write('device: cpu\n')
+
+        self.assertEqual('cpu', read_yaml(self.filename)['device'])
+
+    def test_merge(self):
+        other = Path(self.folder.name, 'other.yml')
+        other.write_text('seed: 8\n')
+
+        config = read_yaml_click(None, None, [self.filename, f'={other}'])
+        self.assertEqual(8, config.seed)
+        self.assertEqual(0, self.count_parses(lambda: read_yaml_click(None, None, [self.filename, str(other)])))
+
+    def test_missing(self):
+        self.assertRaises(FileExistsError, read_yaml, os.path.join(self.folder.name, 'missing.yml'))
+
+
+if __name__ == '__main__':
+    unittest.main()
+    sys.exit(0)